@@ -0,0 +1,65 @@
+"""
+Compares the time to decode a ComponentUpdateEvent for each common type of value with the union decoder used throughout
+pybehave and with a tag-dispatch table that reads the tag from the message and decodes it with a Decoder for that type
+alone. The best of several runs is reported.
+
+    python benchmarks/component_updates.py
+"""
+import time
+from typing import Any, Callable, Dict
+
+import msgspec
+import numpy as np
+
+from pybehave.Events import PybEvents
+
+VALUES = {"bool": True, "int": 7, "float": 1.5, "bytes": b"\x00" * 32, "array": np.zeros(16)}
+REPEATS = 100000
+RUNS = 5
+
+
+class TagDispatchDecoder:
+    """Decodes single array_like PybEvents by looking up a Decoder for the tag at the start of the message."""
+
+    def __init__(self):
+        union = PybEvents.subclass_union(PybEvents.PybEvent)
+        self.fallback = msgspec.msgpack.Decoder(type=union, dec_hook=PybEvents.dec_hook, ext_hook=PybEvents.ext_hook)
+        self.decoders = {}
+        for cls in union.__args__:
+            self.decoders[cls.__struct_config__.tag.encode()] = msgspec.msgpack.Decoder(
+                type=cls, dec_hook=PybEvents.dec_hook, ext_hook=PybEvents.ext_hook)
+
+    def decode(self, msg: bytes) -> Any:
+        # Messages start with a fixarray header followed by the tag as a fixstr
+        length = msg[1] - 0xa0
+        if 0 <= length < 32:
+            return self.decoders[msg[2:2 + length]].decode(msg)
+        return self.fallback.decode(msg)
+
+
+def measure(decode: Callable[[bytes], Any], msg: bytes) -> float:
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            decode(msg)
+        best = min(best, time.perf_counter() - start)
+    return best / REPEATS * 1e9
+
+
+def main() -> None:
+    encoder = msgspec.msgpack.Encoder(enc_hook=PybEvents.enc_hook)
+    decoders: Dict[str, Callable[[bytes], Any]] = {
+        "union": msgspec.msgpack.Decoder(type=PybEvents.subclass_union(PybEvents.PybEvent), dec_hook=PybEvents.dec_hook,
+                                         ext_hook=PybEvents.ext_hook).decode,
+        "tag": TagDispatchDecoder().decode
+    }
+    print("{:>8} {:>8} {:>8}".format("value", "decoder", "ns"))
+    for name, value in VALUES.items():
+        msg = encoder.encode(PybEvents.ComponentUpdateEvent(0, "lever-0-0", value, acquisition_time=1.0))
+        for decoder, decode in decoders.items():
+            print("{:>8} {:>8} {:>8.0f}".format(name, decoder, measure(decode, msg)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Measures the time to draw every Element of a 16 chamber GUI with the SDL dummy driver, comparing the Elements as they were
+before the SpriteCache (copied here as the baseline) to the current cached Elements. Toggles, inputs and buttons change
+state every frame so both states of each sprite are used.
+
+    python benchmarks/element_drawing.py
+"""
+import contextlib
+import math
+import os
+import time
+import types
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from pybehave.Components.BinaryInput import BinaryInput
+from pybehave.Components.Toggle import Toggle
+from pybehave.Elements import CircleLightElement as circle_light_module, FoodLightElement as food_light_module
+from pybehave.Elements.ButtonElement import ButtonElement
+from pybehave.Elements.CircleLightElement import CircleLightElement
+from pybehave.Elements.FoodLightElement import FoodLightElement
+from pybehave.Elements.InfoBoxElement import InfoBoxElement
+from pybehave.Elements.LabelElement import LabelElement
+from pybehave.Elements.NosePokeElement import NosePokeElement
+from pybehave.Elements.draw_light import draw_light
+from pybehave.GUIs import Colors
+
+N_CHAMBERS = 16
+N_COL = 8
+W, H = 250, 500
+N_FRAMES = 300
+
+
+def baseline_draw_light(screen, color, line_color, rect, cx, cy, radius) -> None:
+    pygame.draw.circle(screen, color, (cx, cy), radius, 0)
+    pygame.draw.circle(screen, (200, 200, 200), (cx + int(.5 * radius), cy - int(.5 * radius)), int(.1 * radius), 0)
+    shadow_color = (int(color[0] * .8), int(color[1] * .8), int(color[2] * .8))
+    shadow_w = min(int(0.5 * radius), 15)
+    pygame.draw.arc(screen, shadow_color, rect, 190 * math.pi / 180, 270 * math.pi / 180, shadow_w)
+    pygame.draw.circle(screen, line_color, (cx, cy), radius, 2)
+
+
+class BaselineButtonElement(ButtonElement):
+
+    def draw(self) -> None:
+        self.draw_state = self.clicked
+        pygame.draw.rect(self.screen, Colors.black, self.rect)
+        if self.draw_state:
+            pygame.draw.rect(self.screen, (100, 100, 100), self.face)
+        else:
+            pygame.draw.rect(self.screen, self.face_color, self.face)
+            pygame.draw.line(self.screen, (255, 255, 255), self.pt1, self.pt2)
+            pygame.draw.line(self.screen, (255, 255, 255), self.pt2, self.pt3)
+        pygame.draw.line(self.screen, (100, 100, 100), self.pt1, self.pt2)
+        pygame.draw.line(self.screen, (100, 100, 100), self.pt2, self.pt3)
+        msg_x = (self.rect.width - self._msg.get_width()) / 2
+        msg_y = (self.rect.height - self._msg.get_height()) / 2
+        self.screen.blit(self._msg, self.rect.move(msg_x, msg_y))
+
+
+class BaselineInfoBoxElement(InfoBoxElement):
+
+    def draw(self) -> None:
+        self.buffer_text = self.text
+        pygame.draw.rect(self.screen, (0, 0, 0), self.border)
+        pygame.draw.rect(self.screen, (255, 255, 255), self.rect)
+        lbl_x = (self.rect.width - self._lbl.get_width()) / 2
+        self.screen.blit(self._lbl, self.rect.move(lbl_x, self.rect.height + 1))
+        if len(self.buffer_text) > 0:
+            msg_ht = self.font.render(self.buffer_text[0], True, (0, 0, 0)).get_height()
+            for i, line in enumerate(self.text):
+                msg_in_font = self.font.render(line, True, (0, 0, 0))
+                self.screen.blit(msg_in_font, self.rect.move(5 * self.SF, i * msg_ht - 2 * self.SF + 1))
+
+
+class BaselineLabelElement(LabelElement):
+
+    def draw(self) -> None:
+        self.shown_text = self.text
+        _msg = self.font.render(self.text, True, self.txt_color)
+        self.screen.blit(_msg, self.rect.move(0, (self.rect.height - _msg.get_height()) / 2 + 1))
+
+
+class BaselineNosePokeElement(NosePokeElement):
+
+    def draw(self) -> None:
+        cx = self.x + self.radius
+        cy = self.y + self.radius
+        self.entered = self.comp.get_state()
+        pygame.draw.circle(self.screen, Colors.lightgray, (cx, cy), self.radius, 0)
+        self.screen.blit(self.render_shadow(), (cx - self.radius, cy - self.radius))
+        pygame.draw.circle(self.screen, Colors.black, (cx, cy), self.radius + 2, 3)
+        if self.entered:
+            pygame.draw.polygon(self.screen, Colors.black, [(cx, cy), (cx - self.radius / 2, cy + self.radius),
+                                                            (cx + self.radius / 2, cy + self.radius)])
+
+
+@contextlib.contextmanager
+def light_function(function):
+    # The light Elements import draw_light by name so it is swapped in their modules
+    circle_light_module.draw_light = food_light_module.draw_light = function
+    try:
+        yield
+    finally:
+        circle_light_module.draw_light = food_light_module.draw_light = draw_light
+
+
+def make_chamber(screen: pygame.Surface, chamber: int, baseline: bool) -> tuple:
+    col, row = chamber % N_COL, chamber // N_COL
+    gui = types.SimpleNamespace(task_gui=screen.subsurface(pygame.Rect(col * W, row * H, W, H)), SF=W / 500,
+                                chamber=chamber, ws=types.SimpleNamespace(mark_dirty=lambda *args: None))
+    button, info_box, label, nose_poke = (BaselineButtonElement, BaselineInfoBoxElement, BaselineLabelElement,
+                                          BaselineNosePokeElement) if baseline else (ButtonElement, InfoBoxElement,
+                                                                                     LabelElement, NosePokeElement)
+    toggles = [Toggle(None, "light-{}-{}".format(chamber, i), str(i)) for i in range(5)]
+    inputs = [BinaryInput(None, "poke-{}-{}".format(chamber, i), str(i)) for i in range(3)]
+    elements = [FoodLightElement(gui, 50 + 220 * i, 100, 180, 60, comp=toggles[i]) for i in range(2)]
+    elements += [CircleLightElement(gui, 60 + 150 * i, 250, 40, on_color=Colors.yellow, comp=toggles[2 + i])
+                 for i in range(3)]
+    elements += [nose_poke(gui, 60 + 150 * i, 400, 40, comp=inputs[i]) for i in range(3)]
+    buttons = [button(gui, 40 + 110 * i, 550, 90, 40, "BTN{}".format(i)) for i in range(4)]
+    elements += buttons
+    elements += [info_box(gui, 50, 700, 400, 90, "INFO", "BOTTOM", ["trial: {}".format(chamber), "state: WAIT", "rewards: 0"]),
+                 info_box(gui, 50, 850, 400, 40, "TIME", "BOTTOM", ["0:00"]),
+                 label(gui, 10, 960, 480, 30, "subject {}".format(chamber))]
+    return elements, toggles, inputs, buttons
+
+
+def measure(screen: pygame.Surface, baseline: bool) -> np.ndarray:
+    chambers = [make_chamber(screen, chamber, baseline) for chamber in range(N_CHAMBERS)]
+    frame_times = []
+    for frame in range(N_FRAMES):
+        for _, toggles, inputs, buttons in chambers:
+            for component in (*toggles, *inputs):
+                component.state = frame % 2 == 0
+            for button in buttons:
+                button.clicked = frame % 2 == 0
+        start = time.perf_counter()
+        for elements, *_ in chambers:
+            for element in elements:
+                element.draw()
+        frame_times.append(time.perf_counter() - start)
+    return np.array(frame_times) * 1e3
+
+
+def main() -> None:
+    pygame.init()
+    screen = pygame.display.set_mode((W * N_COL, H * math.ceil(N_CHAMBERS / N_COL)))
+    print("{:>10} {:>10} {:>10}".format("elements", "p50 ms", "p99 ms"))
+    with light_function(baseline_draw_light):
+        frame_times = measure(screen, True)
+    print("{:>10} {:>10.2f} {:>10.2f}".format("baseline", *np.percentile(frame_times, [50, 99])))
+    frame_times = measure(screen, False)
+    print("{:>10} {:>10.2f} {:>10.2f}".format("cached", *np.percentile(frame_times, [50, 99])))
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
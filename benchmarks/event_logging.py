@@ -0,0 +1,73 @@
+"""
+Compares the cost of logging events through the TaskProcess to a BinaryEventLogger receiving formatted LoggerEvents (as
+before raw events were supported) and raw Loggable events.
+
+    python benchmarks/event_logging.py
+"""
+import collections
+import math
+import tempfile
+import time
+import types
+
+from pybehave.Components.BinaryInput import BinaryInput
+from pybehave.Events import PybEvents
+from pybehave.Events.BinaryEventLogger import BinaryEventLogger, EVENT_RECORD
+from pybehave.Tasks.TaskProcess import TaskProcess
+
+N_CASCADES = 20000
+
+
+class FormattedBinaryEventLogger(BinaryEventLogger):
+    """BinaryEventLogger as it was before raw events, kept here as the baseline."""
+    raw_events = False
+
+    def log_events(self, events) -> None:
+        records = []
+        for le in events:
+            self.event_count += 1
+            metadata = self.encoder.encode(le.event.metadata)
+            self.write(metadata, self.metadata_file)
+            records.append(EVENT_RECORD.pack(self.event_count, math.nan if le.entry_time is None else le.entry_time,
+                                             self.intern(type(le.event).__name__), int(le.eid), self.intern(str(le.name)),
+                                             self.metadata_offset, len(metadata)))
+            self.metadata_offset += len(metadata)
+        if len(records) > 0:
+            self.write(b"".join(records))
+        self.check_flush()
+
+
+def measure(logger_type: type, folder: str) -> float:
+    task = types.SimpleNamespace(metadata={"subject": "bench", "chamber": 0, "protocol": "", "address_file": ""},
+                                 initial_constants={})
+    logger = logger_type("bench", 0, 0)
+    logger.output_folder = folder + "/"
+    logger.set_task(task)
+    logger.start_()
+    tp = TaskProcess(None, None, {})
+    tp.logger_q = collections.deque()
+    tp.raw_logger_q = collections.deque()
+    tp.task_event_loggers[0] = {"bench": logger}
+    tp.update_logger_formats(0)
+    lever = BinaryInput(None, "lever-0-0", "0")
+    start = time.perf_counter()
+    for i in range(N_CASCADES):
+        # A typical cascade: an input, the resulting state change and a timeout
+        tp.log_event(PybEvents.ComponentChangedEvent(0, lever, 0, timestamp=i, metadata={"value": True}))
+        tp.log_event(PybEvents.StateExitEvent(0, "WAIT", 0, timestamp=i))
+        tp.log_event(PybEvents.StateEnterEvent(0, "REWARD", 1, timestamp=i))
+        tp.log_event(PybEvents.TimeoutEvent(0, "reward", timestamp=i))
+        tp.log_events(0)
+    elapsed = time.perf_counter() - start
+    logger.stop()
+    return elapsed / (N_CASCADES * 4) * 1e6
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as folder:
+        for name, logger_type in (("formatted", FormattedBinaryEventLogger), ("raw", BinaryEventLogger)):
+            print("{:>10} {:>8.2f} us/event".format(name, min(measure(logger_type, folder) for _ in range(3))))
+
+
+if __name__ == "__main__":
+    main()
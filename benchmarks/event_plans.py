@@ -0,0 +1,104 @@
+"""
+Compares the cost of dispatching events through TaskProcess.handle_event and Task.main_loop when the handling of each
+event type is resolved with isinstance checks for every event (as before event plans were cached) and with the cached
+plans. Logging and GUI forwarding are replaced with no-ops so only the dispatch itself is measured.
+
+    python benchmarks/event_plans.py
+"""
+import time
+from enum import Enum
+from types import SimpleNamespace
+
+from pybehave.Events import PybEvents
+from pybehave.Tasks.Task import Task
+from pybehave.Tasks.TaskProcess import TaskProcess
+
+N_CASCADES = 50000
+
+
+class BenchTask(Task):
+    class States(Enum):
+        WAIT = 0
+        REWARD = 1
+
+    def init_state(self):
+        return self.States.WAIT
+
+    def WAIT(self, event):
+        pass
+
+    def REWARD(self, event):
+        pass
+
+
+class BaselineBenchTask(BenchTask):
+    """BenchTask with Task.main_loop as it was before event plans, kept here as the baseline."""
+
+    def main_loop(self, event: PybEvents.PybEvent) -> None:
+        if isinstance(event, PybEvents.StateEnterEvent):
+            self.state = self.States(event.value)
+        elif isinstance(event, PybEvents.StateExitEvent):
+            if self.state in self.state_timeouts:
+                for tm in self.state_timeouts[self.state].values():
+                    if tm[1]:
+                        self.cancel_timeout(tm[0].name)
+        elif isinstance(event, PybEvents.TimeoutEvent):
+            del self.timeouts[event.name]
+        all_handled = self.all_states(event)
+        if not all_handled and not self.route_event(event):
+            if self.state.name in self.state_methods:
+                self.state_methods[self.state.name](event)
+        if self.is_complete_():
+            self.task_complete()
+
+
+class BaselineTaskProcess(TaskProcess):
+    """TaskProcess.handle_event as it was before event plans, kept here as the baseline."""
+
+    def handle_event(self, event):
+        event_type = type(event)
+        self.log_gui_event(event)
+        if event_type in self.event_responses:
+            self.event_responses[type(event)](event)
+        elif isinstance(event, PybEvents.StatefulEvent):
+            task = self.tasks[event.chamber]
+            if task.started and not task.paused:
+                self.tasks[task.metadata["chamber"]].main_loop(event)
+        if isinstance(event, PybEvents.Loggable):
+            task = self.tasks[event.chamber]
+            if task.started and not task.paused:
+                self.log_event(event)
+
+
+def measure(tp_type: type, task_type: type) -> float:
+    tp = tp_type(None, object(), {})
+    tp.log_gui_event = tp.log_event = lambda event: None
+    tp.event_responses = {PybEvents.ComponentUpdateEvent: lambda event: None}
+    task = task_type()
+    task.initialize(tp, {"protocol": None, "address_file": None, "chamber": 0})
+    task.start__()
+    tp.tasks[0] = task
+    cascade = [PybEvents.ComponentUpdateEvent(0, "lever-0-0", True),
+               PybEvents.GUIEvent(0, "button", 1),
+               PybEvents.StateExitEvent(0, "WAIT", 0),
+               PybEvents.StateEnterEvent(0, "REWARD", 1),
+               PybEvents.TimeoutEvent(0, "reward"),
+               PybEvents.StateExitEvent(0, "REWARD", 1),
+               PybEvents.StateEnterEvent(0, "WAIT", 0)]
+    start = time.perf_counter()
+    for _ in range(N_CASCADES):
+        task.timeouts["reward"] = None
+        for event in cascade:
+            tp.handle_event(event)
+    return (time.perf_counter() - start) / (N_CASCADES * len(cascade)) * 1e9
+
+
+def main() -> None:
+    baseline = measure(BaselineTaskProcess, BaselineBenchTask)
+    cached = measure(TaskProcess, BenchTask)
+    print("isinstance checks: {:.0f} ns per event".format(baseline))
+    print("cached plans:      {:.0f} ns per event".format(cached))
+
+
+if __name__ == "__main__":
+    main()
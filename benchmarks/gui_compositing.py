@@ -0,0 +1,149 @@
+"""
+Replays one simulated minute of GUI traffic for N chambers with the SDL dummy driver through the Workstation as it was
+before dirty-region compositing (copied here as the baseline) and through Workstation.mark_dirty/composite. Each chamber
+receives component updates at a fixed rate and the TaskProcess sends heartbeats at 10 Hz. Events are replayed on a
+simulated clock so both paths flush the display at the same frame deadlines. Reports the time spent on the GUI thread
+per simulated second and the number of rects pushed to the display.
+
+    python benchmarks/gui_compositing.py
+"""
+import math
+import os
+import random
+import time
+import types
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pygame
+
+from pybehave.Components.BinaryInput import BinaryInput
+from pybehave.Components.Toggle import Toggle
+from pybehave.Elements.CircleLightElement import CircleLightElement
+from pybehave.Elements.FoodLightElement import FoodLightElement
+from pybehave.Elements.InfoBoxElement import InfoBoxElement
+from pybehave.Elements.LabelElement import LabelElement
+from pybehave.Elements.NosePokeElement import NosePokeElement
+from pybehave.GUIs import Colors
+from pybehave.Workstation.Workstation import Workstation
+
+N_COL = 8
+W, H = 125, 250
+FRAME_RATE = 10
+HEARTBEAT_RATE = 10
+EVENT_RATES = (5, 50)
+DURATION = 60
+
+
+def make_workstation(n_chambers: int) -> Workstation:
+    ws = Workstation.__new__(Workstation)
+    ws.n_col, ws.w, ws.h, ws.fr = N_COL, W, H, FRAME_RATE
+    ws.guis, ws.gui_updates, ws.dirty_chambers, ws.dirty_elements, ws.last_frame = {}, [], set(), {}, 0
+    screen = pygame.display.set_mode((W * N_COL, H * math.ceil(n_chambers / N_COL)))
+    for chamber in range(n_chambers):
+        col, row = chamber % N_COL, chamber // N_COL
+        gui = types.SimpleNamespace(task_gui=screen.subsurface(pygame.Rect(col * W, row * H, W, H)), SF=W / 500,
+                                    chamber=chamber, ws=ws, started=True, paused=False)
+        toggles = [Toggle(None, "light-{}-{}".format(chamber, i), str(i)) for i in range(5)]
+        inputs = [BinaryInput(None, "poke-{}-{}".format(chamber, i), str(i)) for i in range(3)]
+        gui.components = toggles + inputs
+        gui.elements = [FoodLightElement(gui, 50 + 220 * i, 100, 180, 60, comp=toggles[i]) for i in range(2)]
+        gui.elements += [CircleLightElement(gui, 60 + 150 * i, 250, 40, on_color=Colors.yellow, comp=toggles[2 + i])
+                         for i in range(3)]
+        gui.elements += [NosePokeElement(gui, 60 + 150 * i, 400, 40, comp=inputs[i]) for i in range(3)]
+        gui.elements += [InfoBoxElement(gui, 50, 700, 400, 90, "INFO", "BOTTOM", ["trial: 0", "state: WAIT"]),
+                         LabelElement(gui, 10, 960, 480, 30, "subject {}".format(chamber))]
+        for element in gui.elements:
+            element.draw()
+        ws.guis[chamber] = gui
+    pygame.display.update()
+    return ws
+
+
+def schedule(n_chambers: int, event_rate: int) -> list:
+    rng = random.Random(0)
+    events = [(i / HEARTBEAT_RATE, None) for i in range(DURATION * HEARTBEAT_RATE)]
+    for chamber in range(n_chambers):
+        events += [(rng.uniform(0, DURATION), chamber) for _ in range(DURATION * event_rate)]
+    events.sort()
+    return events
+
+
+def change_component(ws: Workstation, chamber: int, rng: random.Random) -> None:
+    component = rng.choice(ws.guis[chamber].components)
+    component.state = not component.state
+
+
+def baseline(ws: Workstation, events: list) -> tuple:
+    rng = random.Random(1)
+    rects = 0
+    last_frame = 0
+    start = time.perf_counter()
+    for timestamp, chamber in events:
+        chambers = ws.guis.keys() if chamber is None else (chamber,)
+        if chamber is not None:
+            change_component(ws, chamber, rng)
+        for key in chambers:
+            col = key % ws.n_col
+            row = math.floor(key / ws.n_col)
+            for element in ws.guis[key].elements:
+                if element.has_updated():
+                    element.draw()
+                    ws.gui_updates.append(element.rect.move(col * ws.w, row * ws.h))
+        if timestamp - last_frame > 1 / ws.fr:
+            if len(ws.gui_updates) > 0:
+                rects += len(ws.gui_updates)
+                pygame.display.update(ws.gui_updates)
+                ws.gui_updates = []
+            last_frame = timestamp
+    return time.perf_counter() - start, rects
+
+
+def composited(ws: Workstation, events: list) -> tuple:
+    rng = random.Random(1)
+    rects = 0
+    next_frame = 1 / ws.fr
+    update = pygame.display.update
+
+    def counted_update(merged):
+        nonlocal rects
+        rects += len(merged)
+        update(merged)
+
+    pygame.display.update = counted_update
+    try:
+        start = time.perf_counter()
+        for timestamp, chamber in events:
+            # The update_gui wait times out at the frame deadline so pending changes are flushed before later events
+            while timestamp >= next_frame:
+                ws.composite()
+                next_frame += 1 / ws.fr
+            if chamber is None:
+                for key in ws.guis.keys():
+                    if ws.guis[key].started and not ws.guis[key].paused:
+                        ws.mark_dirty(key)
+            else:
+                change_component(ws, chamber, rng)
+                ws.mark_dirty(chamber)
+        ws.composite()
+        return time.perf_counter() - start, rects
+    finally:
+        pygame.display.update = update
+
+
+def main() -> None:
+    pygame.init()
+    print("{:>9} {:>8} {:>8} {:>18} {:>10}".format("chambers", "events/s", "path", "GUI thread ms/s", "rects/s"))
+    for event_rate in EVENT_RATES:
+        for n_chambers in (4, 12, 24):
+            events = schedule(n_chambers, event_rate)
+            for name, path in (("baseline", baseline), ("dirty", composited)):
+                elapsed, rects = path(make_workstation(n_chambers), events)
+                print("{:>9} {:>8} {:>8} {:>18.2f} {:>10.1f}".format(n_chambers, event_rate, name,
+                                                                     elapsed / DURATION * 1e3, rects / DURATION))
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
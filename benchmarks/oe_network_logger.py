@@ -0,0 +1,91 @@
+"""
+Compares sending log lines to a local stand-in for the OpenEphys NetworkEvents plugin with the previous OENetworkLogger,
+which sent each message on a relaxed REQ socket from the Task thread, and the pipelined DEALER I/O thread. Reports the
+time the Task thread spends per message and the time until every message has reached the server. The DEALER is measured
+with the default limit on requests awaiting a reply and without one (max_in_flight=0).
+
+    python benchmarks/oe_network_logger.py
+"""
+import threading
+import time
+
+import zmq
+
+from pybehave.Events.OENetworkLogger import OENetworkLogger
+
+N_MESSAGES = 5000
+
+
+class StubNetworkEvents:
+
+    def __init__(self):
+        self.context = zmq.Context()
+        self.socket = self.context.socket(zmq.REP)
+        self.port = self.socket.bind_to_random_port("tcp://127.0.0.1")
+        self.received = 0
+        self.running = True
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self) -> None:
+        while self.running:
+            if self.socket.poll(50):
+                self.socket.recv()
+                self.received += 1
+                self.socket.send(b"ok")
+
+    def close(self) -> None:
+        self.running = False
+        self.thread.join()
+        self.socket.close(0)
+        self.context.term()
+
+
+class REQLogger:
+    """The send path of OENetworkLogger prior to the I/O thread, kept here as the baseline."""
+
+    def __init__(self, port: int):
+        self.context = zmq.Context()
+        self.socket = self.context.socket(zmq.REQ)
+        self.socket.set(zmq.REQ_RELAXED, True)
+        self.socket.connect("tcp://127.0.0.1:" + str(port))
+
+    def send_string(self, msg: str) -> None:
+        self.socket.send(msg.encode("utf-8"))
+        try:
+            self.socket.recv(flags=zmq.NOBLOCK)
+        except zmq.ZMQError:
+            pass
+
+    def close(self) -> None:
+        self.socket.close()
+        self.context.term()
+
+
+def measure(make_logger) -> tuple:
+    server = StubNetworkEvents()
+    logger = make_logger(server.port)
+    msg = "1,12.5,ComponentChangedEvent,0,lever-0-0,\"{'value': True}\""
+    start = time.perf_counter()
+    for _ in range(N_MESSAGES):
+        logger.send_string(msg)
+    sent = time.perf_counter()
+    while server.received < N_MESSAGES and time.perf_counter() - sent < 30:
+        time.sleep(0.001)
+    received = time.perf_counter()
+    delivered = server.received
+    logger.close()
+    server.close()
+    return (sent - start) / N_MESSAGES * 1e6, received - start, delivered
+
+
+def main() -> None:
+    print("{:>12} {:>16} {:>14} {:>10}".format("logger", "task us/message", "delivery s", "delivered"))
+    for name, make_logger in (("REQ", REQLogger),
+                              ("DEALER", lambda port: OENetworkLogger("bench", "127.0.0.1", port)),
+                              ("DEALER/0", lambda port: OENetworkLogger("bench", "127.0.0.1", port, max_in_flight=0))):
+        print("{:>12} {:>16.2f} {:>14.3f} {:>10}".format(name, *measure(make_logger)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compares the throughput of sending ComponentUpdateEvents carrying NumPy arrays from one process to another through a
+Pipe with the copying msgpack Ext path and with a SharedArrayRing, where the reader either copies each array out (the
+default) or keeps a read-only view. The reader sums each array so every byte is touched.
+
+    python benchmarks/shared_arrays.py
+"""
+import multiprocessing
+import os
+import time
+from multiprocessing import resource_tracker
+from typing import List
+
+import msgspec
+import numpy as np
+
+from pybehave.Events import PybEvents
+from pybehave.Utilities.SharedArrayRing import SharedArrayRing
+
+SIZES = (64 * 1024, 1024 * 1024, 8 * 1024 * 1024)
+DURATION = 2
+
+
+def reader(conn, hook: str) -> None:
+    ext_hook = PybEvents.view_ext_hook if hook == "view" else PybEvents.ext_hook
+    decoder = msgspec.msgpack.Decoder(type=List[PybEvents.subclass_union(PybEvents.PybEvent)], dec_hook=PybEvents.dec_hook,
+                                      ext_hook=ext_hook)
+    while True:
+        msg = conn.recv_bytes()
+        if len(msg) == 0:
+            break
+        for event in decoder.decode(msg):
+            event.value.sum()
+        conn.send_bytes(b"")
+    conn.close()
+
+
+def measure(nbytes: int, path: str) -> float:
+    conn, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=reader, args=(child, path), daemon=True)
+    process.start()
+    ring = SharedArrayRing(capacity=max(64 * 1024 * 1024, 4 * nbytes))
+    if path == "ext":
+        encoder = msgspec.msgpack.Encoder(enc_hook=PybEvents.enc_hook)
+    else:
+        encoder = msgspec.msgpack.Encoder(enc_hook=PybEvents.shared_enc_hook(ring))
+    array = np.random.default_rng(0).random(nbytes // 8)
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        conn.send_bytes(encoder.encode([PybEvents.ComponentUpdateEvent(0, "camera-0-0", array)]))
+        conn.recv_bytes()
+        count += 1
+    elapsed = time.perf_counter() - start
+    conn.send_bytes(b"")
+    process.join()
+    ring.close()
+    return count * nbytes / elapsed / 1e6
+
+
+def main() -> None:
+    if os.name != "nt":
+        # As in the Workstation, the readers share the resource tracker so the segments stay owned by the writer
+        resource_tracker.ensure_running()
+    print("{:>10} {:>8} {:>10}".format("array", "path", "MB/s"))
+    for nbytes in SIZES:
+        for path in ("ext", "copy", "view"):
+            print("{:>10} {:>8} {:>10.0f}".format("{} KiB".format(nbytes // 1024), path, measure(nbytes, path)))
+
+
+if __name__ == "__main__":
+    main()
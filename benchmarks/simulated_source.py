@@ -0,0 +1,175 @@
+"""
+Measures end-to-end latency without hardware by running a TaskProcess with N chambers against a SimulatedSource. Each
+chamber has a nose poke driven by a Poisson process and a light the task turns on when the poke is entered and off when
+it is released, so every input causes a state change and an output. Latency tracing is enabled and the p50 and p99 of
+the input (acquisition to main_loop exit) and round trip (acquisition to the light being written by the Source) times
+are read from the histograms the LatencyTracer exports. CPU time of the TaskProcess and the Source is reported per
+chamber.
+
+    python benchmarks/simulated_source.py
+"""
+import glob
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import resource_tracker
+
+import msgspec
+import numpy as np
+import psutil
+
+from pybehave.Events import PybEvents
+from pybehave.Sources.SimulatedSource import SimulatedSource
+from pybehave.Tasks.TaskProcess import TaskProcess
+from pybehave.Utilities.LatencyTracer import BINS_PER_DECADE, MIN_EXPONENT, N_BINS, LatencyTracer
+
+CHAMBERS = (1, 4, 16)
+RATE = 10
+DURATION = 10
+TIMEOUT = 10
+
+TASK_SOURCE = '''
+from enum import Enum
+
+from pybehave.Components.BinaryInput import BinaryInput
+from pybehave.Components.Toggle import Toggle
+from pybehave.Events import PybEvents
+from pybehave.Tasks.Task import Task
+
+
+class LatencyBenchTask(Task):
+    class States(Enum):
+        WAIT = 0
+        RESPOND = 1
+
+    @staticmethod
+    def get_components():
+        return {"poke": [BinaryInput], "light": [Toggle]}
+
+    def init_state(self):
+        return self.States.WAIT
+
+    def WAIT(self, event):
+        if isinstance(event, PybEvents.ComponentChangedEvent) and event.comp is self.poke and self.poke.state:
+            self.change_state(self.States.RESPOND)
+            self.light.toggle(True)
+
+    def RESPOND(self, event):
+        if isinstance(event, PybEvents.ComponentChangedEvent) and event.comp is self.poke and not self.poke.state:
+            self.change_state(self.States.WAIT)
+            self.light.toggle(False)
+'''
+
+ADDRESS_SOURCE = '''
+addresses = AddressFile()
+addresses.add_component("poke", "BinaryInput", "sim", "poke", None, {{"process": "poisson", "rate": {}, "duration": 0.05}})
+addresses.add_component("light", "Toggle", "sim", "light")
+'''
+
+
+def write_files(folder: str) -> str:
+    """Writes the task where the TaskProcess can import it and returns the path of the address file."""
+    os.makedirs(os.path.join(folder, "Local", "Tasks"))
+    for package in ("Local", os.path.join("Local", "Tasks")):
+        open(os.path.join(folder, package, "__init__.py"), "w").close()
+    with open(os.path.join(folder, "Local", "Tasks", "LatencyBenchTask.py"), "w") as f:
+        f.write(TASK_SOURCE)
+    address_file = os.path.join(folder, "addresses.py")
+    with open(address_file, "w") as f:
+        f.write(ADDRESS_SOURCE.format(RATE))
+    return address_file
+
+
+def await_acknowledgements(mainq, decoder, event_type: type, n: int) -> None:
+    remaining = n
+    deadline = time.perf_counter() + TIMEOUT
+    while remaining > 0:
+        if not mainq.poll(max(deadline - time.perf_counter(), 0)):
+            raise TimeoutError("TaskProcess did not acknowledge {}".format(event_type.__name__))
+        event = decoder.decode(mainq.recv_bytes())
+        if isinstance(event, PybEvents.ErrorEvent):
+            raise RuntimeError(event.traceback)
+        if isinstance(event, event_type):
+            remaining -= 1
+
+
+def cpu_time(process: psutil.Process) -> float:
+    times = process.cpu_times()
+    return times.user + times.system
+
+
+def load_histograms(folder: str) -> LatencyTracer:
+    """Reads the histograms exported for every chamber into a single LatencyTracer chamber."""
+    tracer = LatencyTracer(folder)
+    histograms = tracer.histograms.setdefault(0, {})
+    for path in glob.glob(os.path.join(folder, "latency_*.csv")):
+        with open(path) as f:
+            next(f)
+            for line in f:
+                name, start, _, count = line.strip().split(",")
+                index = min(round((np.log10(float(start)) - MIN_EXPONENT) * BINS_PER_DECADE), N_BINS - 1)
+                histograms.setdefault(name, np.zeros(N_BINS, dtype=np.int64))[index] += int(count)
+    return tracer
+
+
+def measure(n_chambers: int, folder: str, address_file: str) -> str:
+    trace_folder = tempfile.mkdtemp(dir=folder)
+    mainq, tpq = multiprocessing.Pipe()
+    tp_source, source_tp = multiprocessing.Pipe()
+    source = SimulatedSource(seed="0")
+    source.sid = "sim"
+    source.queues = [source_tp]
+    source.trace = True
+    source.start()
+    tp = TaskProcess(tpq, None, {"sim": tp_source}, 0, 0.1, trace_folder)
+    tp.start()
+    encoder = msgspec.msgpack.Encoder(enc_hook=PybEvents.enc_hook)
+    decoder = msgspec.msgpack.Decoder(type=PybEvents.subclass_union(PybEvents.PybEvent), dec_hook=PybEvents.dec_hook)
+    for chamber in range(n_chambers):
+        metadata = {"chamber": chamber, "subject": "bench", "protocol": "", "address_file": address_file}
+        mainq.send_bytes(encoder.encode(PybEvents.AddTaskEvent(chamber, "LatencyBenchTask", "", metadata=metadata)))
+    await_acknowledgements(mainq, decoder, PybEvents.InitEvent, n_chambers)
+    processes = (psutil.Process(tp.pid), psutil.Process(source.pid))
+    start_cpu = [cpu_time(process) for process in processes]
+    start = time.perf_counter()
+    for chamber in range(n_chambers):
+        mainq.send_bytes(encoder.encode(PybEvents.StartEvent(chamber)))
+    await_acknowledgements(mainq, decoder, PybEvents.StartEvent, n_chambers)
+    time.sleep(DURATION)
+    cpu = [cpu_time(process) - t for process, t in zip(processes, start_cpu)]
+    elapsed = time.perf_counter() - start
+    for chamber in range(n_chambers):
+        mainq.send_bytes(encoder.encode(PybEvents.StopEvent(chamber)))
+    await_acknowledgements(mainq, decoder, PybEvents.StopEvent, n_chambers)
+    mainq.send_bytes(encoder.encode(PybEvents.ExitEvent()))
+    tp.join()
+    source.join()
+    tracer = load_histograms(trace_folder)
+    counts = tracer.histograms[0]["input"].sum()
+    return "{:>8} {:>8} {:>8.2f} {:>8.2f} {:>8.2f} {:>8.2f} {:>8.2f} {:>8.2f}".format(
+        n_chambers, counts,
+        tracer.percentile(0, "input", 50) * 1e3, tracer.percentile(0, "input", 99) * 1e3,
+        tracer.percentile(0, "round_trip", 50) * 1e3, tracer.percentile(0, "round_trip", 99) * 1e3,
+        cpu[0] / elapsed / n_chambers * 100, cpu[1] / elapsed / n_chambers * 100)
+
+
+def main() -> None:
+    if os.name != "nt":
+        # As in the Workstation, every process shares one resource tracker so shared memory stays owned by its writer
+        resource_tracker.ensure_running()
+    with tempfile.TemporaryDirectory() as folder:
+        address_file = write_files(folder)
+        # Child processes inherit the path so the TaskProcess can import Local.Tasks.LatencyBenchTask
+        sys.path.insert(0, folder)
+        print("{:>8} {:>8} {:>8} {:>8} {:>8} {:>8} {:>8} {:>8}".format(
+            "chambers", "inputs", "in p50", "in p99", "rt p50", "rt p99", "tp cpu%", "src cpu%"))
+        print("{:>8} {:>8} {:>8} {:>8} {:>8} {:>8} {:>8} {:>8}".format("", "", "ms", "ms", "ms", "ms", "/chamber",
+                                                                        "/chamber"))
+        for n_chambers in CHAMBERS:
+            print(measure(n_chambers, folder, address_file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Compares the time StimJim.update takes to parse responses from the StimJim with the parser that split and rebuilt every
+line (as before responses were parsed incrementally) and the incremental parser. A transcript defining several pulse
+trains and reporting many of them completing is fed to each in chunks of a fixed size, as serial reads would deliver it.
+The best of several alternating runs is reported.
+
+    python benchmarks/stimjim_parsing.py
+"""
+import re
+import time
+
+import numpy as np
+
+from pybehave.Components.StimJim import StimJim
+
+CHUNK_SIZES = (16, 64, 256, 4096)
+REPEATS = 15
+
+
+class BaselineStimJim(StimJim):
+    """StimJim with the response parser used before records were parsed incrementally, kept here as the baseline."""
+
+    def __init__(self, task, component_id: str, component_address: str):
+        super().__init__(task, component_id, component_address)
+        self.in_buffer = ""
+
+    def update(self, value) -> bool:
+        if value is not None:
+            if isinstance(value, int):
+                self.state = value
+            else:
+                if isinstance(value, str):
+                    pass
+                else:
+                    dec_val = value.decode('utf-8')
+                    segs = dec_val.split('\n')
+                    segs[0] = self.in_buffer + segs[0]
+                    self.in_buffer = ''
+                    if not dec_val.endswith('\n'):
+                        self.in_buffer = segs[-1]
+                        del segs[-1]
+                    self.commands = []
+                    for line in segs:
+                        if len(line) > 0:
+                            if 'Parameters' in line:
+                                if self.cur_command is not None:
+                                    self.commands.append(self.cur_command)
+                                self.cur_command = {"command": "P", "id": int(line.split("[")[1].split("]")[0])}
+                            elif self.cur_command is not None and self.cur_command["command"] == "P":
+                                l_segs = re.split(" +", line)
+                                if "mode" in line:
+                                    if "mode" in self.cur_command:
+                                        self.cur_command["mode"].append(int(l_segs[2]))
+                                    else:
+                                        self.cur_command["mode"] = [int(l_segs[2])]
+                                elif "period:" in line:
+                                    self.cur_command["period"] = int(l_segs[2])
+                                elif "duration:" in line:
+                                    self.cur_command["duration"] = int(l_segs[2])
+                                elif len(l_segs) > 1 and l_segs[1].isnumeric():
+                                    if "stages" in self.cur_command:
+                                        self.cur_command["stages"].append([l_segs[2], l_segs[4], l_segs[5][:-1]])
+                                    else:
+                                        self.cur_command["stages"] = [[l_segs[2], l_segs[4], l_segs[5][:-1]]]
+                                elif line[0] == '-':
+                                    self.commands.append(self.cur_command)
+                                    self.configs[self.cur_command["id"]] = self.cur_command
+                                    self.cur_command = None
+                            elif 'Started' in line:
+                                self.state = int(line[line.rindex(' ')+1:-1])
+                                if self.cur_command is not None:
+                                    self.commands.append(self.cur_command)
+                                self.cur_command = None
+                            elif 'complete' in line:
+                                if self.cur_command is not None:
+                                    self.commands.append(self.cur_command)
+                                self.cur_command = {"command": "C", "id": self.state}
+                                self.state = None
+                                l_segs = line.split(" ")
+                                self.cur_command["n_pulse"] = int(l_segs[3])
+                            elif self.cur_command is not None and self.cur_command["command"] == "C" and "Stage" in line:
+                                l_segs = re.split(" +", line)
+                                if "stages" in self.cur_command:
+                                    self.cur_command["stages"].append([l_segs[2][:-1], l_segs[3][:-1]])
+                                else:
+                                    self.cur_command["stages"] = [[l_segs[2][:-1], l_segs[3][:-1]]]
+                                if len(self.cur_command["stages"]) == len(self.configs[self.cur_command["id"]]["stages"]):
+                                    self.commands.append(self.cur_command)
+                                    self.cur_command = None
+        return len(self.commands) > 0
+
+
+def transcript(n_trains: int, n_runs: int, seed: int = 0) -> bytes:
+    """Builds StimJim output defining n_trains pulse trains and reporting n_runs of them being started and completed."""
+    rng = np.random.default_rng(seed)
+    lines = []
+    n_stages = {}
+    for train in range(n_trains):
+        n_stages[train] = int(rng.integers(1, 5))
+        lines += ["Parameters [{}]:".format(train), "  mode: {}".format(rng.integers(0, 3)),
+                  "  mode: {}".format(rng.integers(0, 3)), "  period: {}".format(rng.integers(1000, 100000)),
+                  "  duration: {}".format(rng.integers(100000, 1000000))]
+        for stage in range(n_stages[train]):
+            lines.append("  {}  {}mV  x  {}mV  {}us".format(stage, rng.integers(-5000, 5000), rng.integers(-5000, 5000),
+                                                            rng.integers(10, 1000)))
+        lines.append("-----")
+    for _ in range(n_runs):
+        train = int(rng.integers(0, n_trains))
+        lines += ["Started train {}.".format(train), "Train {} complete {} pulses".format(train, rng.integers(1, 100))]
+        for stage in range(n_stages[train]):
+            lines.append("  Stage {}: {}, {},".format(stage, rng.integers(0, 100000), rng.integers(0, 100000)))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def parse(stim_type: type, chunks: list) -> float:
+    stim = stim_type(None, "stim-0-0", "0")
+    start = time.perf_counter()
+    for chunk in chunks:
+        stim.update(chunk)
+    return time.perf_counter() - start
+
+
+def measure(data: bytes, chunk_size: int) -> tuple:
+    """Returns the best time for each parser, alternating between them so drift in the machine affects both alike."""
+    chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+    baseline = parser = float("inf")
+    for _ in range(REPEATS):
+        baseline = min(baseline, parse(BaselineStimJim, chunks))
+        parser = min(parser, parse(StimJim, chunks))
+    return baseline, parser
+
+
+def main() -> None:
+    data = transcript(8, 5000)
+    n_lines = data.count(b"\n")
+    print("{} lines, {} KiB".format(n_lines, len(data) // 1024))
+    print("{:>8} {:>12} {:>12}".format("chunk", "baseline", "parser"))
+    print("{:>8} {:>12} {:>12}".format("bytes", "us/line", "us/line"))
+    for chunk_size in CHUNK_SIZES:
+        baseline, parser = measure(data, chunk_size)
+        print("{:>8} {:>12.2f} {:>12.2f}".format(chunk_size, baseline / n_lines * 1e6, parser / n_lines * 1e6))
+
+
+if __name__ == "__main__":
+    main()
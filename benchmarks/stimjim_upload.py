@@ -0,0 +1,73 @@
+"""
+Compares the time to send a batch of StimJim pulse train definitions when each is formatted by string concatenation and
+written as its own command (as before StimJim.upload) and when the stages are formatted in one pass and every definition
+is sent in a single write with StimJim.upload. Each write is encoded as a ComponentUpdateEvent like the TaskProcess does
+when flushing writes to a Source. The best of several alternating runs is reported.
+
+    python benchmarks/stimjim_upload.py
+"""
+import time
+
+import msgspec
+import numpy as np
+
+from pybehave.Components.StimJim import StimJim
+from pybehave.Events import PybEvents
+
+N_PROGRAMS = 10
+STAGES = (1, 4, 16, 64)
+REPEATS = 200
+
+
+class BaselineStimJim(StimJim):
+    """StimJim with parametrize as it was before stages were formatted in one pass, kept here as the baseline."""
+
+    def parametrize(self, pnum: int, outs: list[int], per: int, dur: int, amps: np.ndarray, durs: list[int]) -> None:
+        stimulus = "S{},{},{},{},{}".format(pnum, outs[0], outs[1], per, dur)
+        for i in range(amps.shape[1]):
+            stimulus += "; "
+            for j in range(amps.shape[0]):
+                stimulus += "{},".format(amps[j, i])
+            stimulus += "{}".format(durs[i])
+        self.write(stimulus)
+
+    def upload(self, programs: list[tuple]) -> None:
+        for program in programs:
+            self.parametrize(*program)
+
+
+def make_stim(stim_type: type) -> StimJim:
+    encoder = msgspec.msgpack.Encoder(enc_hook=PybEvents.enc_hook)
+    stim = stim_type(None, "stim-0-0", "0")
+    stim.write = lambda msg: encoder.encode([PybEvents.ComponentUpdateEvent(0, stim.id, msg)])
+    return stim
+
+
+def upload(stim: StimJim, programs: list) -> float:
+    start = time.perf_counter()
+    stim.upload(programs)
+    return time.perf_counter() - start
+
+
+def measure(programs: list) -> tuple:
+    """Returns the best time for each, alternating between them so drift in the machine affects both alike."""
+    baseline_stim, stim = make_stim(BaselineStimJim), make_stim(StimJim)
+    baseline = batched = float("inf")
+    for _ in range(REPEATS):
+        baseline = min(baseline, upload(baseline_stim, programs))
+        batched = min(batched, upload(stim, programs))
+    return baseline * 1e6, batched * 1e6
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    print("{} programs on 2 channels".format(N_PROGRAMS))
+    print("{:>8} {:>12} {:>12}".format("stages", "baseline us", "upload us"))
+    for n_stages in STAGES:
+        programs = [(pnum, [0, 1], 1000, 50000, rng.integers(-10000, 10000, size=(2, n_stages)),
+                     [int(d) for d in rng.integers(10, 1000, size=n_stages)]) for pnum in range(N_PROGRAMS)]
+        print("{:>8} {:>12.1f} {:>12.1f}".format(n_stages, *measure(programs)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Compares the latency from a timeout firing on the TimeoutManager thread to the TaskProcess loop handling it. The old path
+encoded each TimeoutEvent and sent it through a Pipe to the same process while the new path queues the event by reference
+and writes a single byte to a socketpair to wake multiprocessing.connection.wait.
+
+    python benchmarks/timeout_wakeup.py
+"""
+import collections
+import multiprocessing
+import multiprocessing.connection
+import socket
+import threading
+import time
+
+import msgspec
+import numpy as np
+
+from pybehave.Events import PybEvents
+
+N_EVENTS = 5000
+
+
+def fire(send, n: int, stamps: list) -> None:
+    for i in range(n):
+        time.sleep(0.0002)
+        stamps.append(time.perf_counter())
+        send(PybEvents.TimeoutEvent(0, "timeout{}".format(i)))
+
+
+def pipe_path(n: int) -> np.ndarray:
+    encoder = msgspec.msgpack.Encoder(enc_hook=PybEvents.enc_hook)
+    decoder = msgspec.msgpack.Decoder(type=PybEvents.subclass_union(PybEvents.PybEvent), dec_hook=PybEvents.dec_hook)
+    tmq_in, tmq_out = multiprocessing.Pipe(False)
+    sent = []
+    handled = []
+    thread = threading.Thread(target=fire, args=(lambda e: tmq_out.send_bytes(encoder.encode(e)), n, sent))
+    thread.start()
+    while len(handled) < n:
+        for r in multiprocessing.connection.wait([tmq_in]):
+            decoder.decode(r.recv_bytes())
+            handled.append(time.perf_counter())
+    thread.join()
+    return (np.array(handled) - np.array(sent)) * 1e6
+
+
+def socketpair_path(n: int) -> np.ndarray:
+    timeout_q = collections.deque()
+    tmq_in, tmq_out = socket.socketpair()
+    tmq_in.setblocking(False)
+    signalled = [False]
+    sent = []
+    handled = []
+
+    def queue_timeout(event: PybEvents.TimeoutEvent) -> None:
+        timeout_q.append(event)
+        if not signalled[0]:
+            signalled[0] = True
+            tmq_out.send(b"\x00")
+
+    thread = threading.Thread(target=fire, args=(queue_timeout, n, sent))
+    thread.start()
+    while len(handled) < n:
+        for _ in multiprocessing.connection.wait([tmq_in]):
+            try:
+                tmq_in.recv(4096)
+            except BlockingIOError:
+                pass
+            signalled[0] = False
+            while len(timeout_q) > 0:
+                timeout_q.popleft()
+                handled.append(time.perf_counter())
+    thread.join()
+    tmq_in.close()
+    tmq_out.close()
+    return (np.array(handled) - np.array(sent)) * 1e6
+
+
+def main() -> None:
+    print("{:>12} {:>10} {:>10} {:>10}".format("path", "p50 us", "p99 us", "max us"))
+    for name, path in (("pipe", pipe_path), ("socketpair", socketpair_path)):
+        latency = path(N_EVENTS)
+        print("{:>12} {:>10.1f} {:>10.1f} {:>10.1f}".format(name, *np.percentile(latency, [50, 99]), latency.max()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Compares how late timeouts fire with the heap-based TimeoutManager and the previous implementation that scanned every
+active timeout on each wakeup. A fixed number of short timeouts are measured while a varying number of long timeouts
+are kept active in the background.
+
+    python benchmarks/timeouts.py
+"""
+import queue
+import threading
+import time
+
+import numpy as np
+
+from pybehave.Tasks.TimeoutManager import Timeout, TimeoutManager
+
+
+class ScanTimeoutManager(TimeoutManager):
+    """The TimeoutManager loop prior to the heap, kept here as the baseline."""
+
+    def run(self):
+        while True:
+            wait = None
+            for timeout in self.timeouts.values():
+                if wait is None:
+                    wait = timeout.time_remaining()
+                else:
+                    wait = min(wait, timeout.time_remaining())
+            try:
+                event = self.timeout_queue.get(timeout=None if wait is None else max(wait, 0))
+                if isinstance(event, Timeout):
+                    self.timeouts[event.key] = event
+                    event.start()
+                if isinstance(event, tuple):
+                    if event[0] == "Quit":
+                        return
+                    elif event[1] in self.timeouts and event[0] == "Cancel":
+                        del self.timeouts[event[1]]
+            except queue.Empty:
+                pass
+            for name in list(self.timeouts.keys()):
+                if self.timeouts[name].time_remaining() <= 0:
+                    self.timeouts[name].execute()
+                    del self.timeouts[name]
+
+
+def measure(manager_type: type, n_background: int, n_measured: int = 200, duration: float = 0.005) -> np.ndarray:
+    tm = manager_type()
+    tm.start()
+    for i in range(n_background):
+        tm.add_timeout(Timeout("background{}".format(i), 0, 3600, lambda: None, ()))
+    lateness = []
+    fired = threading.Event()
+
+    def target(deadline: float) -> None:
+        lateness.append(time.perf_counter() - deadline)
+        fired.set()
+
+    for i in range(n_measured):
+        fired.clear()
+        tm.add_timeout(Timeout("measured{}".format(i), 0, duration, target, (time.perf_counter() + duration,)))
+        fired.wait()
+    tm.quit()
+    tm.join()
+    return np.array(lateness) * 1e6
+
+
+def main() -> None:
+    print("{:>10} {:>12} {:>12} {:>12} {:>12}".format("background", "scan p50 us", "scan p99 us", "heap p50 us", "heap p99 us"))
+    for n_background in (0, 10, 100, 1000, 10000):
+        scan = measure(ScanTimeoutManager, n_background)
+        heap = measure(TimeoutManager, n_background)
+        print("{:>10} {:>12.1f} {:>12.1f} {:>12.1f} {:>12.1f}".format(
+            n_background, *np.percentile(scan, [50, 99]), *np.percentile(heap, [50, 99])))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Compares the time WaveformStim.parametrize takes to build a pulse train with the per-sample loops it used before being
+vectorized, with the vectorized builder and with repeated calls served from the waveform cache (which still copy the
+cached waveform into configs).
+
+    python benchmarks/waveform_stim.py
+"""
+import math
+import time
+from typing import Callable
+
+import numpy as np
+
+from pybehave.Components.WaveformStim import WaveformStim, build_waveforms
+
+# Biphasic pulses on two channels at 100 Hz for one second
+PER = 10000
+DUR = 1000000
+AMPS = np.array([[50.0, -50.0], [25.0, -25.0]])
+DURS = [200, 200]
+SAMPLE_RATES = (10000, 30000, 100000)
+REPEATS = 5
+
+
+class BaselineWaveformStim(WaveformStim):
+    """WaveformStim with parametrize as it was before being vectorized, kept here as the baseline."""
+
+    def parametrize(self, pnum: int, _, per: int, dur: int, amps: np.ndarray, durs: list[int]) -> None:
+        waveforms = np.zeros((amps.shape[0], math.ceil(dur/1000000*self.sr) + 1))
+        ns = 0
+        while ns < math.ceil(dur/1000000*self.sr):
+            sw = 0
+            for i in range(amps.shape[1]):
+                for j in range(math.floor(durs[i] / 1000000 * self.sr)):
+                    for k in range(amps.shape[0]):
+                        waveforms[k, ns] = amps[k, i]
+                    ns += 1
+                sw += math.floor(durs[i] / 1000000 * self.sr)
+            ns += math.ceil(per / 1000000 * self.sr) - sw
+        for i in range(amps.shape[0]):
+            waveforms[i, -1] = 0
+        self.configs[pnum] = waveforms
+
+
+def measure(stim: WaveformStim, before: Callable[[], None]) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        before()
+        start = time.perf_counter()
+        stim.parametrize(0, None, PER, DUR, AMPS, DURS)
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def main() -> None:
+    print("{:>8} {:>10} {:>10} {:>10}".format("rate", "loop ms", "build ms", "cached ms"))
+    for sr in SAMPLE_RATES:
+        baseline = BaselineWaveformStim(None, "stim-0-0", "0")
+        stim = WaveformStim(None, "stim-0-0", "0")
+        baseline.sr = stim.sr = sr
+        loop = measure(baseline, lambda: None)
+        build = measure(stim, build_waveforms.cache_clear)
+        cached = measure(stim, lambda: None)
+        print("{:>8} {:>10.3f} {:>10.3f} {:>10.3f}".format(sr, loop, build, cached))
+
+
+if __name__ == "__main__":
+    main()
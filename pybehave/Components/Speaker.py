@@ -1,3 +1,6 @@
+import functools
+import queue
+
 import pygame
 import math
 import numpy
@@ -6,6 +9,64 @@ import time
 
 from pybehave.Components.Component import Component
 
+SAMPLE_RATE = 22050
+MAX_SAMPLE = 128.0
+
+
+def init_mixer(sample_rate: int) -> None:
+    if pygame.mixer.get_init() is None:
+        pygame.mixer.init(sample_rate, -16, 2)
+
+
+@functools.lru_cache(maxsize=64)
+def make_tone(frequency: float, volume: float, sample_rate: int) -> pygame.mixer.Sound:
+    """Returns a one second stereo Sound of a sine wave at frequency that can be looped to play a tone."""
+    t = numpy.arange(sample_rate) / sample_rate  # time in seconds
+    wave = numpy.round(MAX_SAMPLE * numpy.sin(2 * math.pi * frequency * t)).astype(numpy.int16)
+    sound = pygame.sndarray.make_sound(numpy.column_stack((wave, wave)))
+    sound.set_volume(volume)  # volume response 0.0 to 1.0
+    return sound
+
+
+class ToneWorker:
+    """Plays the tones of every Speaker in the process from a single thread that is started when first needed."""
+
+    def __init__(self):
+        self.tones = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def play(self, speaker, frequency: float, volume: float, duration: float) -> None:
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+        self.tones.put((speaker, frequency, volume, duration))
+
+    def run(self) -> None:
+        init_mixer(SAMPLE_RATE)
+        playing = {}  # Speaker and end time of the tone each Speaker is playing keyed by id
+        while True:
+            now = time.perf_counter()
+            for key, (speaker, end) in list(playing.items()):
+                if end <= now:
+                    speaker.state = False
+                    del playing[key]
+            try:
+                # Wake up when the next tone ends to update the state
+                speaker, frequency, volume, duration = self.tones.get(
+                    timeout=None if len(playing) == 0 else max(min(end for _, end in playing.values()) - now, 0))
+            except queue.Empty:
+                continue
+            sound = make_tone(frequency, volume, SAMPLE_RATE)
+            # play once, then loop until duration has passed
+            sound.play(loops=-1, maxtime=int(duration * 1000))  # - 1 = loops forever, max time in ms
+            speaker.state = True
+            playing[id(speaker)] = (speaker, time.perf_counter() + duration)
+
+
+tone_worker = ToneWorker()
+
 
 class Speaker(Component):  # Not implemented
     """
@@ -19,8 +80,6 @@ class Speaker(Component):  # Not implemented
             The ID of this Component
         component_address : str
             The location of this Component for its Source
-        metadata : str
-            String containing any metadata associated with this Component
 
         Attributes
         ----------
@@ -31,6 +90,8 @@ class Speaker(Component):  # Not implemented
         -------
             play_sound(frequency, volume, duration)
                 Plays a 16 bit sound with a sampling rate of 22050 with the provided frequency and volume lasting the provided duration
+            preload(frequency, volume)
+                Synthesizes a tone ahead of time so playing it does not wait for synthesis
             play_sound_file(music_file, volume)
                 Plays a 16 bit sound with a sampling rate of 44100 saved in music_file with the provided volume
             get_state()
@@ -38,40 +99,17 @@ class Speaker(Component):  # Not implemented
             get_type()
                 Returns Component.Type.DIGITAL_OUTPUT
         """
-    def __init__(self, source, component_id, component_address, metadata=""):
+    def __init__(self, task, component_id, component_address):
+        super().__init__(task, component_id, component_address)
         self.state = False
-        super().__init__(source, component_id, component_address, metadata)
 
     def play_sound(self, frequency, volume, duration):
-        th = threading.Thread(target=self._play_sound, args=(frequency, volume, duration))
-        th.start()
-
-    def _play_sound(self, frequency, volume, duration):
-        sample_rate = 22050
-        bits = 16
-
-        pygame.mixer.pre_init(sample_rate, -bits, 2)
+        # One worker shared by every Speaker plays the tones so no thread is created per tone or Speaker
+        tone_worker.play(self, float(frequency), float(volume), duration)
 
-        n_samples = int(sample_rate)  # Number of sample to generate
-
-        # set up our numpy array to handle 16 bit ints, which is what we set our mixer to expect with "bits" up above
-        buf = numpy.zeros((n_samples, 2), dtype=numpy.int16)
-        # max_sample = 2**(bits - 1) - 1
-        max_sample = 128.0
-        for s in range(n_samples):
-            t = float(s) / sample_rate  # time in seconds
-            # grab the x-coordinate of the sine wave at a given time, while constraining the sample to what our mixer is set to with "bits"
-            buf[s][0] = int(round(max_sample * math.sin(2 * math.pi * float(frequency) * t)))  # left
-            buf[s][1] = int(round(max_sample * math.sin(2 * math.pi * float(frequency) * t)))  # right
-
-        sound = pygame.sndarray.make_sound(buf)
-        # play once, then loop until duration has passed
-        sound.set_volume(float(volume))  # volume response 0.0 to 1.0
-        play_time = int(duration * 1000)  # Duration in sec, need ms
-        self.state = True
-        sound.play(loops=-1, maxtime=play_time)  # - 1 = loops forever, max time in ms
-        time.sleep(duration)
-        self.state = False
+    def preload(self, frequency, volume):
+        init_mixer(SAMPLE_RATE)
+        make_tone(float(frequency), float(volume), SAMPLE_RATE)
 
     def play_sound_file(self, music_file, volume=0.8):
         th = threading.Thread(target=self._play_sound_file, args=(music_file, volume))
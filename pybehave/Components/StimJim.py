@@ -1,22 +1,73 @@
 from __future__ import annotations
 
 import re
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, Any, ClassVar, Union, List, Optional
+
+import msgspec
+import numpy as np
 
 from pybehave.Components.Component import Component
 
 if TYPE_CHECKING:
     from pybehave.Tasks.Task import Task
-    import numpy as np
 
 from pybehave.Components.Stimmer import Stimmer
 
 
+SPACES = re.compile(" +")
+TRAIN_ID = re.compile(r"\[([^\]]*)\]")
+
+
+def format_stages(amps: np.ndarray, durs: list[int]) -> str:
+    """Formats each stage as "; " followed by its amplitude on every channel and its duration, separated by commas."""
+    # The whole amplitude matrix is converted to Python numbers in one pass rather than indexing each value. They are
+    # written exactly as the NumPy scalars were formatted
+    stages = np.asarray(amps).T.tolist()
+    return "".join("; {},{}".format(",".join(map(str, stage)), durs[i]) for i, stage in enumerate(stages))
+
+
+class StimJimRecord(msgspec.Struct):
+    """Base for reports from the StimJim. Records can also be read like the dictionaries previously used for them."""
+    command: ClassVar[str] = ""
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "command":
+            return self.command
+        if key not in self.__struct_fields__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        # Fields that were not reported were previously left out of the dictionary
+        return key == "command" or (key in self.__struct_fields__ and getattr(self, key) not in (None, []))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+
+class StimJimParameters(StimJimRecord):
+    """Pulse train parameters reported by the StimJim. Each stage holds the raw amplitude and duration fields."""
+    command: ClassVar[str] = "P"
+    id: int
+    mode: List[int] = []
+    period: Optional[int] = None
+    duration: Optional[int] = None
+    stages: List[List[str]] = []
+
+
+class StimJimCompletion(StimJimRecord):
+    """Report from the StimJim that a pulse train has completed. Each stage holds the raw fields of its summary."""
+    command: ClassVar[str] = "C"
+    id: Optional[int]
+    n_pulse: int = 0
+    stages: List[List[str]] = []
+
+
 class StimJim(Stimmer):
 
     def __init__(self, task: Task, component_id: str, component_address: str):
         self.state = None
-        self.in_buffer = ""
+        self.in_buffer = bytearray()
         self.cur_command = None
         self.commands = []
         self.configs = {}
@@ -26,22 +77,19 @@ class StimJim(Stimmer):
         self.write("R{},{},{}".format(ichan, pnum, falling))
 
     def parametrize(self, pnum: int, outs: list[int], per: int, dur: int, amps: np.ndarray, durs: list[int]) -> None:
-        stimulus = "S{},{},{},{},{}".format(pnum, outs[0], outs[1], per, dur)
-        for i in range(amps.shape[1]):
-            stimulus += "; "
-            for j in range(amps.shape[0]):
-                stimulus += "{},".format(amps[j, i])
-            stimulus += "{}".format(durs[i])
-        self.write(stimulus)
+        self.write(self.parametrize_command(pnum, outs, per, dur, amps, durs))
 
     def update_parameters(self, per: int, amps: np.ndarray, durs: list[int]):
-        stimulus = "F{}".format(per)
-        for i in range(amps.shape[1]):
-            stimulus += "; "
-            for j in range(amps.shape[0]):
-                stimulus += "{},".format(amps[j, i])
-            stimulus += "{}".format(durs[i])
-        self.write(stimulus)
+        self.write("F{}{}".format(per, format_stages(amps, durs)))
+
+    def upload(self, programs: list[tuple]) -> None:
+        """Sends several pulse train definitions, each a tuple of the arguments to parametrize, in a single write."""
+        # SerialSource only terminates the end of each write so the commands are separated here
+        self.write(getattr(self, "terminator", "\n").join(self.parametrize_command(*program) for program in programs))
+
+    @staticmethod
+    def parametrize_command(pnum: int, outs: list[int], per: int, dur: int, amps: np.ndarray, durs: list[int]) -> str:
+        return "S{},{},{},{},{}{}".format(pnum, outs[0], outs[1], per, dur, format_stages(amps, durs))
 
     def start(self, pnum: int, stype: str = "T") -> None:
         self.write("{}{}".format(stype, pnum))
@@ -50,67 +98,64 @@ class StimJim(Stimmer):
         if value is not None:
             if isinstance(value, int):
                 self.state = value
-            else:
-                if isinstance(value, str):
-                    pass
-                else:
-                    dec_val = value.decode('utf-8')
-                    segs = dec_val.split('\n')
-                    segs[0] = self.in_buffer + segs[0]
-                    self.in_buffer = ''
-                    if not dec_val.endswith('\n'):
-                        self.in_buffer = segs[-1]
-                        del segs[-1]
-                    self.commands = []
-                    for line in segs:
-                        if len(line) > 0:
-                            if 'Parameters' in line:
-                                if self.cur_command is not None:
-                                    self.commands.append(self.cur_command)
-                                self.cur_command = {"command": "P", "id": int(line.split("[")[1].split("]")[0])}
-                            elif self.cur_command is not None and self.cur_command["command"] == "P":
-                                l_segs = re.split(" +", line)
-                                if "mode" in line:
-                                    if "mode" in self.cur_command:
-                                        self.cur_command["mode"].append(int(l_segs[2]))
-                                    else:
-                                        self.cur_command["mode"] = [int(l_segs[2])]
-                                elif "period:" in line:
-                                    self.cur_command["period"] = int(l_segs[2])
-                                elif "duration:" in line:
-                                    self.cur_command["duration"] = int(l_segs[2])
-                                elif len(l_segs) > 1 and l_segs[1].isnumeric():
-                                    if "stages" in self.cur_command:
-                                        self.cur_command["stages"].append([l_segs[2], l_segs[4], l_segs[5][:-1]])
-                                    else:
-                                        self.cur_command["stages"] = [[l_segs[2], l_segs[4], l_segs[5][:-1]]]
-                                elif line[0] == '-':
-                                    self.commands.append(self.cur_command)
-                                    self.configs[self.cur_command["id"]] = self.cur_command
-                                    self.cur_command = None
-                            elif 'Started' in line:
-                                self.state = int(line[line.rindex(' ')+1:-1])
-                                if self.cur_command is not None:
-                                    self.commands.append(self.cur_command)
-                                self.cur_command = None
-                            elif 'complete' in line:
-                                if self.cur_command is not None:
-                                    self.commands.append(self.cur_command)
-                                self.cur_command = {"command": "C", "id": self.state}
-                                self.state = None
-                                l_segs = line.split(" ")
-                                self.cur_command["n_pulse"] = int(l_segs[3])
-                            elif self.cur_command is not None and self.cur_command["command"] == "C" and "Stage" in line:
-                                l_segs = re.split(" +", line)
-                                if "stages" in self.cur_command:
-                                    self.cur_command["stages"].append([l_segs[2][:-1], l_segs[3][:-1]])
-                                else:
-                                    self.cur_command["stages"] = [[l_segs[2][:-1], l_segs[3][:-1]]]
-                                if len(self.cur_command["stages"]) == len(self.configs[self.cur_command["id"]]["stages"]):
-                                    self.commands.append(self.cur_command)
-                                    self.cur_command = None
+            elif not isinstance(value, str):
+                # A new list is used so records from earlier updates held elsewhere are unchanged
+                self.commands = []
+                buf = self.in_buffer
+                buf += value
+                # Only complete lines are decoded, the remainder of an incomplete line is kept in the buffer
+                last = buf.rfind(b"\n") + 1
+                if last > 0:
+                    text = buf[:last].decode('utf-8')
+                    del buf[:last]
+                    start = 0
+                    end = text.find("\n")
+                    while end >= 0:
+                        if end > start:
+                            self.parse_line(text[start:end])
+                        start = end + 1
+                        end = text.find("\n", start)
         return len(self.commands) > 0
 
+    def finish_command(self) -> None:
+        if self.cur_command is not None:
+            self.commands.append(self.cur_command)
+        self.cur_command = None
+
+    def parse_line(self, line: str) -> None:
+        command = self.cur_command
+        if 'Parameters' in line:
+            self.finish_command()
+            self.cur_command = StimJimParameters(int(TRAIN_ID.search(line).group(1)))
+        elif type(command) is StimJimParameters:
+            if "mode" in line:
+                command.mode.append(int(SPACES.split(line, 3)[2]))
+            elif "period:" in line:
+                command.period = int(SPACES.split(line, 3)[2])
+            elif "duration:" in line:
+                command.duration = int(SPACES.split(line, 3)[2])
+            else:
+                l_segs = SPACES.split(line)
+                if len(l_segs) > 1 and l_segs[1].isnumeric():
+                    command.stages.append([l_segs[2], l_segs[4], l_segs[5][:-1]])
+                elif line[0] == '-':
+                    self.configs[command.id] = command
+                    self.finish_command()
+        elif 'Started' in line:
+            self.state = int(line[line.rindex(' ') + 1:-1])
+            self.finish_command()
+        elif 'complete' in line:
+            self.finish_command()
+            self.cur_command = StimJimCompletion(self.state, int(line.split(" ", 4)[3]))
+            self.state = None
+        elif type(command) is StimJimCompletion and "Stage" in line:
+            l_segs = SPACES.split(line, 4)
+            command.stages.append([l_segs[2][:-1], l_segs[3][:-1]])
+            config = self.configs.get(command.id)
+            # The report is complete once every stage of the pulse train has been summarized
+            if config is not None and len(command.stages) == len(config.stages):
+                self.finish_command()
+
     @staticmethod
     def get_type() -> Component.Type:
         return Component.Type.BOTH
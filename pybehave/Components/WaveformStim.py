@@ -3,12 +3,40 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from pybehave.Sources.Source import Source
 
+import functools
 import math
 import numpy as np
 from pybehave.Components.Stimmer import Stimmer
 from pybehave.Components.Component import Component
 
 
+@functools.lru_cache(maxsize=32)
+def build_waveforms(sr: float, per: int, dur: int, amps_data: bytes, shape: tuple, dtype: str, durs: tuple) -> np.ndarray:
+    """Returns a read-only array of the pulse train for each channel with stage amplitudes and durations in us."""
+    amps = np.frombuffer(amps_data, dtype=dtype).reshape(shape)
+    n_samples = math.ceil(dur / 1000000 * sr)
+    period = math.ceil(per / 1000000 * sr)
+    if period <= 0 < n_samples:
+        raise ValueError("The stimulus period must be at least one sample")
+    waveforms = np.zeros((amps.shape[0], n_samples + 1))
+    if n_samples > 0:
+        # One pulse holds each stage amplitude for its duration
+        pulse = np.repeat(amps, [math.floor(d / 1000000 * sr) for d in durs[:amps.shape[1]]], axis=1)
+        # Pulses start every period and are cut short by the next pulse if they are longer than the period
+        one_period = np.zeros((amps.shape[0], period))
+        one_period[:, :min(pulse.shape[1], period)] = pulse[:, :period]
+        n_periods = math.ceil(n_samples / period)
+        train = np.tile(one_period, n_periods)[:, :waveforms.shape[1]]
+        waveforms[:, :train.shape[1]] = train
+        # Only the last pulse can extend past its period
+        last = (n_periods - 1) * period
+        tail = pulse[:, period:waveforms.shape[1] - last]
+        waveforms[:, last + period:last + period + tail.shape[1]] = tail
+    waveforms[:, -1] = 0
+    waveforms.flags.writeable = False
+    return waveforms
+
+
 class WaveformStim(Stimmer):
 
     def __init__(self, source: Source, component_id: str, component_address: str):
@@ -18,20 +46,11 @@ class WaveformStim(Stimmer):
         self.sr = None
 
     def parametrize(self, pnum: int, _, per: int, dur: int, amps: np.ndarray, durs: list[int]) -> None:
-        waveforms = np.zeros((amps.shape[0], math.ceil(dur/1000000*self.sr) + 1))
-        ns = 0
-        while ns < math.ceil(dur/1000000*self.sr):
-            sw = 0
-            for i in range(amps.shape[1]):
-                for j in range(math.floor(durs[i] / 1000000 * self.sr)):
-                    for k in range(amps.shape[0]):
-                        waveforms[k, ns] = amps[k, i]
-                    ns += 1
-                sw += math.floor(durs[i] / 1000000 * self.sr)
-            ns += math.ceil(per / 1000000 * self.sr) - sw
-        for i in range(amps.shape[0]):
-            waveforms[i, -1] = 0
-        self.configs[pnum] = waveforms
+        amps = np.asarray(amps)
+        # Identical stimulus parameters produce identical waveforms so they are only built once. The cached array is
+        # shared so each config gets its own writable copy.
+        self.configs[pnum] = build_waveforms(self.sr, per, dur, amps.tobytes(), amps.shape, amps.dtype.str,
+                                             tuple(durs)).copy()
 
     def start(self, pnum: int, stype: str = None) -> None:
         self.state = True  # Ideally make this false when stim is done
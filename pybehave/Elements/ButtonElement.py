@@ -6,6 +6,7 @@ if TYPE_CHECKING:
 
 import pygame
 from pybehave.Elements.Element import Element
+from pybehave.Elements.SpriteCache import sprite_cache
 from pybehave.GUIs import Colors
 
 
@@ -23,8 +24,8 @@ class ButtonElement(Element):
         self.pt4 = self.x, self.y+self.h
         self.face_color = (150, 150, 150)
         self.clicked = False
-        self.font = pygame.font.SysFont('arial', self.f_size)
-        self._msg = self.font.render(self.text, True, Colors.white)
+        self.font = sprite_cache.font('arial', self.f_size)
+        self._msg = sprite_cache.text('arial', self.f_size, self.text, Colors.white)
         self.draw_state = False
         self.mouse_up = lambda _: None
         self.mouse_down = lambda _: None
@@ -34,29 +35,43 @@ class ButtonElement(Element):
 
     def draw(self) -> None:
         self.draw_state = self.clicked
+        key = (type(self).__name__, self.rect.size, self.face.move(-self.rect.x, -self.rect.y).topleft, self.face.size,
+               self.face_color, self.draw_state, self.text, self.f_size)
+        self.screen.blit(sprite_cache.get(key, self.render), self.rect)
+
+    def render(self) -> pygame.Surface:
+        surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        # Draw relative to the Element bounds so the Surface can be reused by identical buttons
+        face = self.face.move(-self.rect.x, -self.rect.y)
+        pt1 = (self.pt1[0] - self.rect.x, self.pt1[1] - self.rect.y)
+        pt2 = (self.pt2[0] - self.rect.x, self.pt2[1] - self.rect.y)
+        pt3 = (self.pt3[0] - self.rect.x, self.pt3[1] - self.rect.y)
         ln_color = Colors.black
         # draw box
-        pygame.draw.rect(self.screen, ln_color, self.rect)
+        pygame.draw.rect(surface, ln_color, surface.get_rect())
         if self.draw_state:
-            pygame.draw.rect(self.screen, (100, 100, 100), self.face)
+            pygame.draw.rect(surface, (100, 100, 100), face)
         else:
-            pygame.draw.rect(self.screen, self.face_color, self.face)
+            pygame.draw.rect(surface, self.face_color, face)
             # Highlight
-            pygame.draw.line(self.screen, (255, 255, 255), self.pt1, self.pt2)
-            pygame.draw.line(self.screen, (255, 255, 255), self.pt2, self.pt3)
-        pygame.draw.line(self.screen, (100, 100, 100), self.pt1, self.pt2)
-        pygame.draw.line(self.screen, (100, 100, 100), self.pt2, self.pt3)
+            pygame.draw.line(surface, (255, 255, 255), pt1, pt2)
+            pygame.draw.line(surface, (255, 255, 255), pt2, pt3)
+        pygame.draw.line(surface, (100, 100, 100), pt1, pt2)
+        pygame.draw.line(surface, (100, 100, 100), pt2, pt3)
         # WRITE LABEL
         msg_ht = self._msg.get_height()
         msg_wd = self._msg.get_width()
         msg_x = (self.rect.width - msg_wd) / 2
         msg_y = (self.rect.height - msg_ht) / 2
-        self.screen.blit(self._msg, self.rect.move(msg_x, msg_y))
+        surface.blit(self._msg, surface.get_rect().move(msg_x, msg_y))
+        return surface
 
     def mouse_up_(self, event: pygame.event.Event) -> None:
         self.clicked = False
+        self.mark_dirty()
         self.mouse_up(event)
 
     def mouse_down_(self, event: pygame.event.Event) -> None:
         self.clicked = True
+        self.mark_dirty()
         self.mouse_down(event)
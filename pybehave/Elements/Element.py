@@ -52,6 +52,8 @@ class Element:
         Calls the relevant Element method if the event is within the bounds of the Element
     draw():
         Draws the Element on screen
+    mark_dirty():
+        Requests that the Element is redrawn on the next frame
     """
 
     def __init__(self, tg: GUI, x: int, y: int, rect: pygame.Rect, SF: float = None):
@@ -99,5 +101,8 @@ class Element:
     def has_updated(self) -> bool:
         raise NotImplementedError
 
+    def mark_dirty(self) -> None:
+        self.gui.ws.mark_dirty(self.gui.chamber, self)
+
     def component_changed(self, component: Component, value: Any):
-        self.gui.ws.mainq.send_bytes(self.gui.ws.encoder.encode(ComponentUpdateEvent(self.gui.chamber, component.id, value, metadata={"value": value})))
+        self.gui.ws.send_event(ComponentUpdateEvent(self.gui.chamber, component.id, value, metadata={"value": value}))
@@ -8,6 +8,7 @@ if TYPE_CHECKING:
 import pygame
 
 from pybehave.Elements.Element import Element
+from pybehave.Elements.SpriteCache import sprite_cache
 
 
 class InfoBoxElement(Element):
@@ -28,8 +29,8 @@ class InfoBoxElement(Element):
         self.pt2 = self.x+w, self.y
         self.pt3 = self.x+w, self.y+h
         self.pt4 = self.x, self.y+h
-        self.font = pygame.font.SysFont('arial', self.f_size)
-        self._lbl = self.font.render(self.label, True, (0, 0, 0))
+        self.font = sprite_cache.font('arial', self.f_size)
+        self._lbl = sprite_cache.text('arial', self.f_size, self.label, (0, 0, 0))
 
     def has_updated(self) -> bool:
         return self.text != self.buffer_text
@@ -39,6 +40,7 @@ class InfoBoxElement(Element):
             self.text = [new_text]
         else:
             self.text = new_text
+        self.mark_dirty()
 
     def draw(self) -> None:
         self.buffer_text = self.text
@@ -68,7 +70,7 @@ class InfoBoxElement(Element):
         # WRITE TEXT
         lines_in_txt = len(self.buffer_text)
         if lines_in_txt > 0:  # NOT EMPTY BOX, No info_boxes
-            msg_in_font = self.font.render(self.buffer_text[0], True, (0, 0, 0))
+            msg_in_font = sprite_cache.text('arial', self.f_size, self.buffer_text[0], (0, 0, 0))
             msg_ht = msg_in_font.get_height()
             msg_wd = msg_in_font.get_width()
 
@@ -79,7 +81,7 @@ class InfoBoxElement(Element):
 
             ln_count = 0
             for line in self.text:
-                msg_in_font = self.font.render(line, True, txt_color)
+                msg_in_font = sprite_cache.text('arial', self.f_size, line, txt_color)
                 msg_y = ln_count * msg_ht - 2 * self.SF
                 self.screen.blit(msg_in_font, self.rect.move(msg_x,  msg_y+1))
                 ln_count += 1
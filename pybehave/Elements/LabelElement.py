@@ -6,6 +6,7 @@ if TYPE_CHECKING:
 import pygame
 
 from pybehave.Elements.Element import Element
+from pybehave.Elements.SpriteCache import sprite_cache
 
 
 class LabelElement(Element):
@@ -46,7 +47,7 @@ class LabelElement(Element):
         super().__init__(tg, x, y, pygame.Rect(x, y, w, h), SF)
         self.text = text
         self.f_size = int(self.SF * f_size)
-        self.font = pygame.font.SysFont('arial', self.f_size)
+        self.font = sprite_cache.font('arial', self.f_size)
         self.txt_color = (255, 255, 255)  # Font color, could be made a parameter in the future
         self.shown_text = self.text
 
@@ -55,7 +56,7 @@ class LabelElement(Element):
 
     def draw(self) -> None:
         self.shown_text = self.text
-        _msg = self.font.render(self.text, True, self.txt_color)
+        _msg = sprite_cache.text('arial', self.f_size, self.text, self.txt_color)
         msg_ht = _msg.get_height()  # Position the label to the left of its containing rectangle
         msg_x = 0
         msg_y = (self.rect.height - msg_ht)/2
@@ -8,6 +8,7 @@ if TYPE_CHECKING:
 import pygame as pygame
 
 from pybehave.Elements.Element import Element
+from pybehave.Elements.SpriteCache import sprite_cache
 from pybehave.GUIs import Colors
 
 
@@ -24,16 +25,19 @@ class NosePokeElement(Element):
         self.entered = self.comp.get_state()
 
         pygame.draw.circle(self.screen, Colors.lightgray, (cx, cy), self.radius, 0)  # MAIN BULB
+        self.screen.blit(sprite_cache.get((type(self).__name__, self.radius), self.render_shadow), (cx-self.radius, cy-self.radius))
+        pygame.draw.circle(self.screen, Colors.black, (cx, cy), self.radius + 2, 3)  # Black circle
+
+        if self.entered:
+            pygame.draw.polygon(self.screen, Colors.black, [(cx, cy), (cx - self.radius / 2, cy + self.radius), (cx + self.radius / 2, cy + self.radius)])
+
+    def render_shadow(self) -> pygame.Surface:
         surf1 = pygame.Surface((self.radius*2, self.radius*2), pygame.SRCALPHA)
         surf2 = pygame.Surface((self.radius*2, self.radius*2), pygame.SRCALPHA)
         pygame.draw.circle(surf1, Colors.darkgray, (self.radius, self.radius), self.radius)
         pygame.draw.circle(surf2, Colors.darkgray, (self.radius + self.radius / 2, self.radius - self.radius / 2), self.radius)
         surf1.blit(surf2, (0, 0), special_flags=pygame.BLEND_RGBA_MIN)
-        self.screen.blit(surf1, (cx-self.radius, cy-self.radius))
-        pygame.draw.circle(self.screen, Colors.black, (cx, cy), self.radius + 2, 3)  # Black circle
-
-        if self.entered:
-            pygame.draw.polygon(self.screen, Colors.black, [(cx, cy), (cx - self.radius / 2, cy + self.radius), (cx + self.radius / 2, cy + self.radius)])
+        return surf1
 
     def has_updated(self) -> bool:
         return self.entered != self.comp.get_state()
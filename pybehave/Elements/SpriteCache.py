@@ -0,0 +1,68 @@
+import collections
+from typing import Callable, Hashable
+
+import pygame
+
+
+class SpriteCache:
+    """
+    Least recently used cache of pre-rendered Surfaces so Elements can blit unchanged visuals instead of redrawing them.
+
+    Parameters
+    ----------
+    max_size : int
+        The maximum number of Surfaces held before the least recently used are evicted
+
+    Attributes
+    ----------
+    hits : int
+        Number of requests served from the cache
+    misses : int
+        Number of requests that required rendering a new Surface
+
+    Methods
+    -------
+    get(key, render)
+        Returns the Surface for key, calling render to create it if it is not cached
+    font(name, f_size)
+        Returns the shared system font with the given name and size
+    text(name, f_size, text, color)
+        Returns the rendered text for the system font with the given name and size
+    clear()
+        Removes all cached Surfaces
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self.sprites = collections.OrderedDict()
+        self.fonts = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, render: Callable[[], pygame.Surface]) -> pygame.Surface:
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            self.misses += 1
+            sprite = render()
+            self.sprites[key] = sprite
+            if len(self.sprites) > self.max_size:
+                self.sprites.popitem(last=False)
+        else:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+        return sprite
+
+    def font(self, name: str, f_size: int) -> pygame.font.Font:
+        if (name, f_size) not in self.fonts:
+            self.fonts[(name, f_size)] = pygame.font.SysFont(name, f_size)
+        return self.fonts[(name, f_size)]
+
+    def text(self, name: str, f_size: int, text: str, color: tuple[int, int, int]) -> pygame.Surface:
+        return self.get(("text", name, f_size, text, color), lambda: self.font(name, f_size).render(text, True, color))
+
+    def clear(self) -> None:
+        self.sprites.clear()
+
+
+# Shared by every Element in the Workstation process
+sprite_cache = SpriteCache()
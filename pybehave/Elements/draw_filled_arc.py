@@ -1,3 +1,4 @@
+import functools
 import math
 import pygame
 
@@ -25,9 +26,13 @@ def draw_filled_arc(screen: pygame.Surface, center: tuple[int, int], arc_angle:
     """
     p = [center]
     # Get points on arc
-    for n in range(ns):
-        x = center[0] + int(r * math.cos(init_angle + arc_angle / ns * n))
-        y = center[1] - int(r * math.sin(init_angle + arc_angle / ns * n))
-        p.append((x, y))
+    for dx, dy in arc_offsets(arc_angle, r, init_angle, ns):
+        p.append((center[0] + dx, center[1] - dy))
     p.append(center)
     pygame.draw.polygon(screen, col, p)
+
+
+@functools.lru_cache(maxsize=256)
+def arc_offsets(arc_angle: float, r: float, init_angle: float, ns: int) -> tuple[tuple[int, int], ...]:
+    return tuple((int(r * math.cos(init_angle + arc_angle / ns * n)), int(r * math.sin(init_angle + arc_angle / ns * n)))
+                 for n in range(ns))
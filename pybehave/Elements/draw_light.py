@@ -2,6 +2,8 @@ from typing import Tuple
 import math
 import pygame
 
+from pybehave.Elements.SpriteCache import sprite_cache
+
 
 def draw_light(screen: pygame.Surface, color: Tuple[int, int, int], line_color: Tuple[int, int, int], rect: pygame.Rect, cx: int, cy: int, radius: float) -> None:
     """
@@ -24,6 +26,17 @@ def draw_light(screen: pygame.Surface, color: Tuple[int, int, int], line_color:
     radius : int
         Integer indicating the radius of the light
     """
+    # The light is rendered once relative to an integer origin and blitted so fractional positions round identically
+    x0 = math.floor(min(rect.x, cx - radius)) - 2
+    y0 = math.floor(min(rect.y, cy - radius)) - 2
+    size = (math.ceil(max(rect.right, cx + radius)) - x0 + 3, math.ceil(max(rect.bottom, cy + radius)) - y0 + 3)
+    key = ("light", color, line_color, rect.x - x0, rect.y - y0, rect.size, cx - x0, cy - y0, radius)
+    screen.blit(sprite_cache.get(key, lambda: render_light(size, color, line_color, rect.move(-x0, -y0), cx - x0,
+                                                           cy - y0, radius)), (x0, y0))
+
+
+def render_light(size: Tuple[int, int], color: Tuple[int, int, int], line_color: Tuple[int, int, int], rect: pygame.Rect, cx: float, cy: float, radius: float) -> pygame.Surface:
+    screen = pygame.Surface(size, pygame.SRCALPHA)
     pygame.draw.circle(screen, color, (cx, cy), radius, 0)  # The main bulb
     pygame.draw.circle(screen, (200, 200, 200), (cx + int(.5 * radius), cy - int(.5 * radius)),
                        int(.1 * radius), 0)  # Sparkle
@@ -35,3 +48,4 @@ def draw_light(screen: pygame.Surface, color: Tuple[int, int, int], line_color:
     pygame.draw.arc(screen, shadow_color, shadow_rect, 190 * math.pi / 180, 270 * math.pi / 180,
                     shadow_w)  # Light shadow
     pygame.draw.circle(screen, line_color, (cx, cy), radius, 2)  # Light border
+    return screen
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import collections
+import math
+import os
+import struct
+import time
+from typing import TYPE_CHECKING, Any
+
+import msgspec
+import numpy as np
+
+if TYPE_CHECKING:
+    from pybehave.Events.PybEvents import Loggable
+
+from pybehave.Events.FileEventLogger import FileEventLogger
+
+# Fixed-width record written for every event. The layout is packed so the events file can be memory-mapped with this dtype.
+EVENT_DTYPE = np.dtype([("trial", "<u8"), ("time", "<f8"), ("type", "<u4"), ("code", "<i8"), ("state", "<u4"),
+                        ("metadata_offset", "<u8"), ("metadata_length", "<u4")])
+EVENT_RECORD = struct.Struct("<QdIqIQI")
+
+
+def metadata_enc_hook(obj: Any) -> Any:
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif isinstance(obj, np.generic):
+        return obj.item()
+    else:
+        return str(obj)
+
+
+class BinaryEventLogger(FileEventLogger):
+    """
+    FileEventLogger that writes events to append-only binary files for fast loading during analysis.
+
+    Each session produces four files sharing the same name:
+
+    - .events: one EVENT_DTYPE record per event holding the trial, time, type id, code, state id and the location of
+      the event metadata
+    - .metadata: msgpack encoded metadata dictionaries
+    - .names: newline separated table of interned event type and state/component names referenced by the type and state ids
+    - .info: msgpack encoded dictionary with the subject, task, chamber, protocol, address file and subject configuration
+
+    The files can be loaded with pybehave.Utilities.load_binary_events.
+    """
+    raw_events = True
+
+    def __init__(self, name: str, buffer_size: int = 0, flush_count: int = 1, flush_interval: float = 0):
+        super().__init__(name, buffer_size, flush_count, flush_interval)
+        self.file_mode = "wb"
+        self.metadata_file = None
+        self.names_file = None
+        self.names = {}
+        self.metadata_offset = 0
+        self.encoder = msgspec.msgpack.Encoder(enc_hook=metadata_enc_hook)
+
+    def get_file_path(self) -> str:
+        return "{}{}.events".format(self.output_folder, math.floor(time.time() * 1000))
+
+    def start(self) -> None:
+        super().start()
+        base = os.path.splitext(self.log_file.name)[0]
+        self.metadata_file = open(base + ".metadata", "wb")
+        self.names_file = open(base + ".names", "w", encoding="utf-8")
+        self.names = {}
+        self.metadata_offset = 0
+        info = {"Subject": self.task.metadata["subject"],
+                "Task": type(self.task).__name__,
+                "Chamber": self.task.metadata["chamber"] + 1,
+                "Protocol": self.task.metadata["protocol"],
+                "AddressFile": self.task.metadata["address_file"],
+                "SubjectConfiguration": {key: str(getattr(self.task, key)) for key in self.task.initial_constants}}
+        with open(base + ".info", "wb") as info_file:
+            info_file.write(self.encoder.encode(info))
+
+    def intern(self, name: str) -> int:
+        if name not in self.names:
+            self.names[name] = len(self.names)
+            self.write(name.replace("\n", " ") + "\n", self.names_file)
+        return self.names[name]
+
+    def log_events(self, events: collections.deque[Loggable]) -> None:
+        records = []
+        for event in events:
+            self.event_count += 1
+            name, code = event.log_fields()
+            metadata = self.encoder.encode(event.metadata)
+            self.write(metadata, self.metadata_file)
+            records.append(EVENT_RECORD.pack(self.event_count, math.nan if event.timestamp is None else event.timestamp,
+                                             self.intern(type(event).__name__), int(code), self.intern(str(name)),
+                                             self.metadata_offset, len(metadata)))
+            self.metadata_offset += len(metadata)
+        if len(records) > 0:
+            self.write(b"".join(records))
+        super().log_events(events)
+
+    def flush(self) -> None:
+        # Metadata and names are flushed first so flushed records never reference missing data
+        self.metadata_file.flush()
+        self.names_file.flush()
+        super().flush()
+
+    def stop(self) -> None:
+        try:
+            super().stop()
+        finally:
+            for file in (self.metadata_file, self.names_file):
+                if file is not None and not file.closed:
+                    try:
+                        os.fsync(file.fileno())
+                    finally:
+                        file.close()
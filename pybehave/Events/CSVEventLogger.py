@@ -19,20 +19,20 @@ class CSVEventLogger(FileEventLogger):
 
     def start(self) -> None:
         super().start()
-        self.log_file.write("Subject,{}".format(self.task.metadata["subject"])+"\n")
-        self.log_file.write("Task,{}".format(type(self.task).__name__)+"\n")
-        self.log_file.write("Chamber,{}".format(self.task.metadata["chamber"] + 1)+"\n")
-        self.log_file.write("Protocol,{}".format(self.task.metadata["protocol"])+"\n")
-        self.log_file.write("AddressFile,{}".format(self.task.metadata["address_file"])+"\n")
+        self.write("Subject,{}".format(self.task.metadata["subject"])+"\n")
+        self.write("Task,{}".format(type(self.task).__name__)+"\n")
+        self.write("Chamber,{}".format(self.task.metadata["chamber"] + 1)+"\n")
+        self.write("Protocol,{}".format(self.task.metadata["protocol"])+"\n")
+        self.write("AddressFile,{}".format(self.task.metadata["address_file"])+"\n")
         if len(self.task.initial_constants) > 0:
-            self.log_file.write("SubjectConfiguration\n")
+            self.write("SubjectConfiguration\n")
             for key, value in self.task.initial_constants.items():
-                self.log_file.write("{},\"{}\"\n".format(key, getattr(self.task, key)))
-        self.log_file.write("\n")
-        self.log_file.write("Trial,Time,Type,Code,State,Metadata\n")
+                self.write("{},\"{}\"\n".format(key, getattr(self.task, key)))
+        self.write("\n")
+        self.write("Trial,Time,Type,Code,State,Metadata\n")
 
     def log_events(self, le: collections.deque[LoggerEvent]) -> None:
         for event in le:
             self.event_count += 1
-            self.log_file.write(self.format_event(event, type(event.event).__name__))
+            self.write(self.format_event(event, type(event.event).__name__))
         super().log_events(le)
@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from pybehave.Events.LoggerEvent import LoggerEvent
+    from pybehave.Events.PybEvents import Loggable
     from pybehave.Tasks.Task import Task
 
 from abc import ABCMeta, abstractmethod
@@ -15,6 +16,12 @@ class EventLogger:
     """
     Abstract class defining the base requirements for an event logging system. Event loggers parse Event objects.
 
+    Attributes
+    ----------
+    raw_events : bool
+        If True, log_events receives the Loggable events themselves rather than LoggerEvents so the TaskProcess can skip
+        formatting when no logger for the chamber needs it
+
     Methods
     -------
     start()
@@ -24,6 +31,7 @@ class EventLogger:
     log_events(events)
         Handle each event in the input Event list
     """
+    raw_events = False
 
     def __init__(self, name: str):
         self.name = name
@@ -58,3 +66,8 @@ class EventLogger:
         return "{},{},{},{},{},\"{}\"\n".format(self.event_count, le.entry_time, event_type,
                                                 str(le.eid), le.name,
                                                 str(le.event.metadata))
+
+    def format_raw_event(self, event: Loggable, event_type: str):
+        name, code = event.log_fields()
+        return "{},{},{},{},{},\"{}\"\n".format(self.event_count, event.timestamp, event_type, str(code), name,
+                                                str(event.metadata))
@@ -7,6 +7,8 @@ from pybehave.Events.Widget import Widget
 
 class EventWidget(Widget):
     emitter = pyqtSignal(PybEvents.PybEvent)
+    # Names of the TaskEvent classes this widget needs or None for all events
+    event_types = None
 
     def __init__(self, name: str):
         super(EventWidget, self).__init__(name)
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import collections
-from typing import TYPE_CHECKING
+import queue
+import threading
+import time
+from typing import TYPE_CHECKING, IO
 
 if TYPE_CHECKING:
     from pybehave.Events.LoggerEvent import LoggerEvent
@@ -17,6 +20,24 @@ class FileEventLogger(EventLogger):
     """
     Abstract class defining the base requirements for an EventLogger that logs Event objects to a file on disk.
 
+    Parameters
+    ----------
+    name : str
+        The name of the EventLogger
+    buffer_size : int
+        Number of writes that can be held for a background writer thread. Writes happen on the calling thread if 0.
+    flush_count : int
+        Number of writes after which the file is flushed. Disabled if 0.
+    flush_interval : float
+        Time in milliseconds after which written data is flushed. Disabled if 0.
+
+    Attributes
+    ----------
+    blocked_writes : int
+        Number of writes that had to wait for space in the background writer buffer
+    write_error : BaseException
+        Error that stopped the background writer thread if it has not been raised yet
+
     Methods
     -------
     start()
@@ -26,13 +47,28 @@ class FileEventLogger(EventLogger):
     log_events(events)
         Handle saving of each Event in the input list to the file
     get_file_path()
-        Returns the 
+        Returns the
+    write(data, file)
+        Writes data to the file (log_file by default) or queues it for the background writer. If the background writer
+        has stopped, writing continues on the calling thread and the error that stopped it is raised.
+    flush()
+        Flushes any open files
     """
 
-    def __init__(self, name: str):
+    def __init__(self, name: str, buffer_size: int = 0, flush_count: int = 1, flush_interval: float = 0):
         super().__init__(name)
         self.output_folder = None
         self.log_file = None
+        self.file_mode = "w"
+        self.buffer_size = int(buffer_size)
+        self.flush_count = int(flush_count)
+        self.flush_interval = float(flush_interval) / 1000
+        self.write_queue = None
+        self.writer = None
+        self.pending_writes = 0
+        self.last_flush = 0
+        self.blocked_writes = 0
+        self.write_error = None
 
     @abstractmethod
     def get_file_path(self) -> str:
@@ -40,15 +76,113 @@ class FileEventLogger(EventLogger):
 
     @abstractmethod
     def log_events(self, event: collections.deque[LoggerEvent]) -> None:
-        self.log_file.flush()  # Need a better solution for regular saving
+        if self.writer is None:
+            self.check_flush()
+
+    def write(self, data: str | bytes, file: IO = None) -> None:
+        file = file or self.log_file
+        if self.writer is not None:
+            if self.enqueue(file, data):
+                return
+            error = self.stop_failed_writer()
+            file.write(data)
+            self.pending_writes += 1
+            raise error
+        file.write(data)
+        self.pending_writes += 1
+
+    def enqueue(self, file: IO | None, data: str | bytes | None) -> bool:
+        """Queues data for the background writer returning False without queueing it if the writer has stopped."""
+        if not self.writer.is_alive():
+            return False
+        try:
+            self.write_queue.put_nowait((file, data))
+            return True
+        except queue.Full:
+            self.blocked_writes += 1
+        # The writer could stop while the buffer is full so it is checked periodically rather than waiting indefinitely
+        while self.writer.is_alive():
+            try:
+                self.write_queue.put((file, data), timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def stop_failed_writer(self) -> BaseException:
+        """Returns to writing on the calling thread after the background writer stopped, writing anything it left queued."""
+        self.writer = None
+        error, self.write_error = self.write_error, None
+        while True:
+            try:
+                file, data = self.write_queue.get_nowait()
+            except queue.Empty:
+                break
+            if file is not None:
+                file.write(data)
+                self.pending_writes += 1
+        return error or RuntimeError("FileEventLogger writer thread stopped")
+
+    def flush(self) -> None:
+        self.log_file.flush()
+
+    def check_flush(self) -> None:
+        if self.pending_writes > 0 and ((0 < self.flush_count <= self.pending_writes) or
+                                        (0 < self.flush_interval <= time.perf_counter() - self.last_flush)):
+            self.flush()
+            self.pending_writes = 0
+            self.last_flush = time.perf_counter()
+
+    def write_loop(self) -> None:
+        while True:
+            try:
+                if self.pending_writes > 0 and self.flush_interval > 0:
+                    item = self.write_queue.get(timeout=max(self.last_flush + self.flush_interval - time.perf_counter(), 0))
+                else:
+                    item = self.write_queue.get()
+            except queue.Empty:
+                item = None
+            try:
+                if item is not None:
+                    file, data = item
+                    if file is None:
+                        return
+                    file.write(data)
+                    self.pending_writes += 1
+                self.check_flush()
+            except BaseException as e:
+                # The error is raised by the next write or stop on the logging thread which then writes synchronously
+                self.write_error = e
+                return
 
     def start(self) -> None:
         if not os.path.exists(self.output_folder):
             os.makedirs(self.output_folder)
         if self.log_file is not None:
-            self.log_file.close()
-        self.log_file = open(self.get_file_path(), "w")
+            self.stop()
+        self.log_file = open(self.get_file_path(), self.file_mode)
+        self.pending_writes = 0
+        self.last_flush = time.perf_counter()
+        if self.buffer_size > 0:
+            self.write_queue = queue.Queue(self.buffer_size)
+            self.writer = threading.Thread(target=self.write_loop, daemon=True)
+            self.writer.start()
 
     def stop(self) -> None:
+        error = None
+        if self.writer is not None:
+            stopping = self.enqueue(None, None)
+            if stopping:
+                self.writer.join()
+            if not stopping or self.write_error is not None:
+                error = self.stop_failed_writer()
+            self.writer = None
         if self.log_file is not None and not self.log_file.closed:
-            self.log_file.close()
+            try:
+                # Make sure everything written reaches the disk before the file is released
+                self.flush()
+                os.fsync(self.log_file.fileno())
+            finally:
+                self.log_file.close()
+        if error is not None:
+            raise error
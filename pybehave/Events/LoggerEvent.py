@@ -6,6 +6,7 @@ if TYPE_CHECKING:
 
 
 class LoggerEvent:
+    __slots__ = ("entry_time", "event", "name", "eid")
 
     def __init__(self, event: TaskEvent, name: str, eid: int, entry_time: float):
         self.entry_time = entry_time
@@ -15,4 +16,4 @@ class LoggerEvent:
 
 
 class StopLoggerEvent(LoggerEvent):
-    pass
+    __slots__ = ()
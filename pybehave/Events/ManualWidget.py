@@ -43,4 +43,4 @@ class ManualWidget(Widget):
         manual_layout.addLayout(input_layout)
 
     def send_event(self) -> None:
-        self.cw.workstation.mainq.send_bytes(self.cw.workstation.encoder.encode(self.ManualEvent(int(self.cw.chamber_id.text()) - 1), self.manual_input.text(), int(self.code_input.text())))
+        self.cw.workstation.send_event(self.ManualEvent(int(self.cw.chamber_id.text()) - 1, self.manual_input.text(), int(self.code_input.text())))
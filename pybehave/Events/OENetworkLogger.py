@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 import collections
+import heapq
+import sys
 import threading
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Tuple
 
 from pybehave.Events.EventLogger import EventLogger
 from pybehave.Events.PybEvents import Loggable
@@ -13,8 +15,13 @@ if TYPE_CHECKING:
 import zmq
 import time
 
+# Frames passed to the I/O thread are prefixed by their kind so any message, including an empty one, can be logged
+DATA = b"\x00"
+CLOSE = b"\x01"
+
 
 class OENetworkLogger(EventLogger):
+    raw_events = True
 
     class OEEvent(Loggable):
         event_type: str
@@ -22,62 +29,153 @@ class OENetworkLogger(EventLogger):
         def format(self) -> LoggerEvent:
             return LoggerEvent(self, self.event_type, 0, self.timestamp)
 
-    def __init__(self, name: str, address: str, port: str):
+        def log_fields(self) -> Tuple[str, int]:
+            return self.event_type, 0
+
+    def __init__(self, name: str, address: str, port: str, max_in_flight: int = 64, max_pending: int = 10000):
         super().__init__(name)
-        context = zmq.Context()
         self.fd = None
         self.event_count = 0
-        self.socket = context.socket(zmq.REQ)
-        self.socket.set(zmq.REQ_RELAXED, True)
-        self.socket.connect("tcp://" + address + ":" + str(port))
+        self.address = "tcp://" + address + ":" + str(port)
+        self.max_in_flight = int(max_in_flight)
+        self.max_pending = int(max_pending)
+        self.sent = 0
+        self.replies = 0
+        self.dropped = 0
+        self.stats_lock = threading.Lock()
+        self.closed = False
+        self.context = zmq.Context()
+        # Messages are handed to the I/O thread through an inproc pipe since zmq sockets are not thread-safe
+        self.outbound = self.context.socket(zmq.PUSH)
+        self.outbound.bind("inproc://oe-logger-{}".format(id(self)))
+        self.outbound_lock = threading.Lock()
+        self.io_thread = threading.Thread(target=self.io_loop, daemon=True)
+        self.io_thread.start()
+        self.ttl_heap = []
+        self.ttl_count = 0
+        self.ttl_cond = threading.Condition()
+        self.ttl_thread = threading.Thread(target=self.ttl_loop, daemon=True)
+        self.ttl_thread.start()
+
+    @property
+    def in_flight(self) -> int:
+        with self.stats_lock:
+            return self.sent - self.replies
+
+    def io_loop(self) -> None:
+        inbound = self.context.socket(zmq.PULL)
+        inbound.connect("inproc://oe-logger-{}".format(id(self)))
+        socket = self.context.socket(zmq.DEALER)
+        socket.setsockopt(zmq.LINGER, 1000)
+        socket.connect(self.address)
+        poller = zmq.Poller()
+        poller.register(inbound, zmq.POLLIN)
+        poller.register(socket, zmq.POLLIN)
+        pending = collections.deque()
+        overflowing = False
+        running = True
+        while running:
+            # Held messages are retried periodically in case they could not be queued on the socket
+            ready = dict(poller.poll(100 if len(pending) > 0 else None))
+            if socket in ready:
+                # NetworkEvents replies to every request, the contents are only used for accounting
+                while socket.poll(0):
+                    socket.recv_multipart()
+                    with self.stats_lock:
+                        self.replies += 1
+            if inbound in ready:
+                while inbound.poll(0):
+                    kind, msg = inbound.recv_multipart()
+                    if kind == CLOSE:
+                        running = False
+                    elif len(pending) < self.max_pending:
+                        pending.append(msg)
+                    else:
+                        # The Task is never blocked by the network so messages are dropped once too many are held
+                        if not overflowing:
+                            print("OENetworkLogger {} is dropping messages: {} are waiting for OpenEphys".format(
+                                self.name, len(pending)), file=sys.stderr)
+                            overflowing = True
+                        with self.stats_lock:
+                            self.dropped += 1
+            # Pipeline as many requests as allowed without waiting for replies, everything left is sent when closing
+            while len(pending) > 0 and (not running or self.max_in_flight <= 0 or self.in_flight < self.max_in_flight):
+                try:
+                    socket.send_multipart([b"", pending[0]], zmq.NOBLOCK)
+                except zmq.Again:
+                    break
+                pending.popleft()
+                with self.stats_lock:
+                    self.sent += 1
+            if len(pending) == 0:
+                overflowing = False
+        if len(pending) > 0:
+            print("OENetworkLogger {} closed with {} messages that could not be sent".format(self.name, len(pending)),
+                  file=sys.stderr)
+            with self.stats_lock:
+                self.dropped += len(pending)
+        socket.close()
+        inbound.close()
+
+    def ttl_loop(self) -> None:
+        with self.ttl_cond:
+            while not self.closed:
+                if len(self.ttl_heap) == 0:
+                    self.ttl_cond.wait()
+                else:
+                    remaining = self.ttl_heap[0][0] - time.perf_counter()
+                    if remaining > 0:
+                        self.ttl_cond.wait(remaining)
+                    else:
+                        _, _, msg = heapq.heappop(self.ttl_heap)
+                        self.send(msg)
+            # Make sure no TTL lines are left on
+            while len(self.ttl_heap) > 0:
+                self.send(heapq.heappop(self.ttl_heap)[2])
+
+    def send(self, msg: bytes) -> None:
+        with self.outbound_lock:
+            self.outbound.send_multipart([DATA, msg])
 
     def send_ttl_event(self, ec: int, ttl_type: str | float) -> None:
         if ttl_type == 'on':
-            self.socket.send(
-                b"".join([b'TTL Channel=', str(ec).encode('ascii'), b' on=1']))
-            self.receive()
+            self.send(b"".join([b'TTL Channel=', str(ec).encode('ascii'), b' on=1']))
         elif ttl_type == 'off':
-            self.socket.send(
-                b"".join([b'TTL Channel=', str(ec).encode('ascii'), b' on=0']))
-            self.receive()
+            self.send(b"".join([b'TTL Channel=', str(ec).encode('ascii'), b' on=0']))
         else:
-            t = threading.Thread(target=self.send_ttl_event_, args=[ec, ttl_type])
-            t.start()
-
-    def send_ttl_event_(self, ec: int, dur: float) -> None:
-        # Activate the TTL channels according to the bit sequence
-        self.socket.send(
-            b"".join([b'TTL Channel=', str(ec).encode('ascii'), b' on=1']))
-        self.receive()
-        time.sleep(dur)
-        self.socket.send(
-            b"".join([b'TTL Channel=', str(ec).encode('ascii'), b' on=0']))
-        self.receive()
+            # Timed pulses schedule their off edge rather than sleeping on a dedicated thread
+            self.send(b"".join([b'TTL Channel=', str(ec).encode('ascii'), b' on=1']))
+            with self.ttl_cond:
+                heapq.heappush(self.ttl_heap, (time.perf_counter() + ttl_type, self.ttl_count,
+                                               b"".join([b'TTL Channel=', str(ec).encode('ascii'), b' on=0'])))
+                self.ttl_count += 1
+                self.ttl_cond.notify()
 
     def send_string(self, msg: str) -> None:
-        self.socket.send(msg.encode("utf-8"))
-        self.receive()
-
-    def receive(self) -> None:
-        try:
-            self.socket.recv(flags=zmq.NOBLOCK)
-        except zmq.ZMQError:
-            pass
+        self.send(msg.encode("utf-8"))
 
-    def log_events(self, events: collections.deque[LoggerEvent]) -> None:
+    def log_events(self, events: collections.deque[Loggable]) -> None:
         for event in events:
             self.event_count += 1
-            if isinstance(event.event, self.OEEvent):
-                if event.event.event_type == 'startAcquisition':
+            if isinstance(event, self.OEEvent):
+                if event.event_type == 'startAcquisition':
                     self.send_string("startAcquisition")
-                elif event.event.event_type == 'stopAcquisition':
+                elif event.event_type == 'stopAcquisition':
                     self.send_string("stopAcquisition")
-                elif event.event.event_type == 'startRecord':
-                    self.send_string("startRecord RecDir={} prependText={} appendText={}".format(event.event.metadata["rec_dir"] if "rec_dir" in event.event.metadata else "",
-                                                                                                 event.event.metadata["pre"] if "pre" in event.event.metadata else "",
-                                                                                                 event.event.metadata["app"] if "app" in event.event.metadata else ""))
+                elif event.event_type == 'startRecord':
+                    self.send_string("startRecord RecDir={} prependText={} appendText={}".format(event.metadata["rec_dir"] if "rec_dir" in event.metadata else "",
+                                                                                                 event.metadata["pre"] if "pre" in event.metadata else "",
+                                                                                                 event.metadata["app"] if "app" in event.metadata else ""))
             else:
-                self.send_string(self.format_event(event, type(event.event).__name__))
+                self.send_string(self.format_raw_event(event, type(event).__name__))
 
     def close(self) -> None:
-        self.socket.close()
+        with self.ttl_cond:
+            self.closed = True
+            self.ttl_cond.notify()
+        self.ttl_thread.join()
+        with self.outbound_lock:
+            self.outbound.send_multipart([CLOSE, b""])
+        self.io_thread.join()
+        self.outbound.close()
+        self.context.term()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import multiprocessing
-from multiprocessing.connection import PipeConnection
+import sys
 from typing import Dict, Any
 
 import msgspec
@@ -11,6 +11,13 @@ import numpy as np
 
 from pybehave.Events.LoggerEvent import LoggerEvent
 from pybehave.Components.Component import Component
+from pybehave.Utilities.SharedArrayRing import SharedArrayRing, SharedArrayDescriptor, open_shared_array
+
+# Pipes are only PipeConnections on Windows, headless Workstations may run elsewhere
+if sys.platform == "win32":
+    from multiprocessing.connection import PipeConnection
+else:
+    from multiprocessing.connection import Connection as PipeConnection
 
 
 T = typing.TypeVar("T")
@@ -36,8 +43,10 @@ def subclass_union(cls: typing.Type[T]) -> typing.Type[T]:
 
 
 NUMPY_TYPE_CODE = 1
+SHARED_NUMPY_TYPE_CODE = 2
 numpy_array_encoder = msgspec.msgpack.Encoder()
 numpy_array_decoder = msgspec.msgpack.Decoder(type=NumpySerializedRepresentation)
+shared_array_decoder = msgspec.msgpack.Decoder(type=SharedArrayDescriptor)
 
 
 def enc_hook(obj: Any) -> Any:
@@ -52,6 +61,17 @@ def enc_hook(obj: Any) -> Any:
         raise NotImplementedError(f"Objects of type {type(obj)} are not supported")
 
 
+def shared_enc_hook(ring: SharedArrayRing) -> typing.Callable[[Any], Any]:
+    """Returns an enc_hook that passes large arrays through the ring. Only use for messages sent to a single process."""
+    def hook(obj: Any) -> Any:
+        if isinstance(obj, np.ndarray):
+            descriptor = ring.put(obj)
+            if descriptor is not None:
+                return msgspec.msgpack.Ext(SHARED_NUMPY_TYPE_CODE, numpy_array_encoder.encode(descriptor))
+        return enc_hook(obj)
+    return hook
+
+
 def dec_hook(typ: typing.Type, obj: Any) -> Any:
     # `type` here is the value of the custom type annotation being decoded.
     if typ is PipeConnection:
@@ -67,11 +87,20 @@ def ext_hook(code: int, data: memoryview) -> Any:
         serialized_array_rep = numpy_array_decoder.decode(data)
         return np.frombuffer(serialized_array_rep.data, dtype=serialized_array_rep.dtype).reshape(
             serialized_array_rep.shape)
+    elif code == SHARED_NUMPY_TYPE_CODE:
+        return open_shared_array(shared_array_decoder.decode(data))
     else:
         # Raise a NotImplementedError for other extension type codes
         raise NotImplementedError(f"Extension type code {code} is not supported")
 
 
+def view_ext_hook(code: int, data: memoryview) -> Any:
+    """ext_hook that returns arrays passed through shared memory as read-only views instead of copying them."""
+    if code == SHARED_NUMPY_TYPE_CODE:
+        return open_shared_array(shared_array_decoder.decode(data), copy=False)
+    return ext_hook(code, data)
+
+
 class PybEvent(msgspec.Struct, kw_only=True, tag=True, omit_defaults=True, array_like=True):
     metadata: Dict = {}
 
@@ -130,6 +159,11 @@ class Loggable(TimedEvent):
     def format(self) -> LoggerEvent:
         raise NotImplementedError
 
+    def log_fields(self) -> typing.Tuple[str, int]:
+        """Returns the name and code format would log for the event. Override to avoid allocating a LoggerEvent."""
+        le = self.format()
+        return le.name, le.eid
+
 
 class AddTaskEvent(TaskEvent):
     task_name: str
@@ -156,6 +190,9 @@ class InfoEvent(Loggable):
     def format(self) -> LoggerEvent:
         return LoggerEvent(self, self.name, self.value, self.timestamp)
 
+    def log_fields(self) -> typing.Tuple[str, int]:
+        return self.name, self.value
+
 
 class StartEvent(TaskEvent):
     pass
@@ -169,11 +206,17 @@ class PauseEvent(Loggable, StatefulEvent):
     def format(self) -> LoggerEvent:
         return LoggerEvent(self, "", 0, self.timestamp)
 
+    def log_fields(self) -> typing.Tuple[str, int]:
+        return "", 0
+
 
 class ResumeEvent(Loggable, StatefulEvent):
     def format(self) -> LoggerEvent:
         return LoggerEvent(self, "", 0, self.timestamp)
 
+    def log_fields(self) -> typing.Tuple[str, int]:
+        return "", 0
+
 
 class InitEvent(TaskEvent):
     pass
@@ -186,6 +229,16 @@ class ClearEvent(TaskEvent):
 class ComponentUpdateEvent(TimedEvent):
     comp_id: str
     value: Any
+    acquisition_time: typing.Optional[float] = None
+
+
+class TraceEvent(TaskEvent):
+    trace: typing.List[float]
+
+
+class GUISubscriptionEvent(TaskEvent):
+    event_types: typing.Optional[typing.List[str]] = None
+    update_intervals: Dict[str, float] = {}
 
 
 class ConstantsUpdateEvent(TaskEvent):
@@ -217,6 +270,9 @@ class ComponentChangedEvent(Loggable, StatefulEvent):
     def format(self) -> LoggerEvent:
         return LoggerEvent(self, self.comp.id, self.index, self.timestamp)
 
+    def log_fields(self) -> typing.Tuple[str, int]:
+        return self.comp.id, self.index
+
 
 class TimeoutEvent(Loggable, StatefulEvent):
     name: str
@@ -224,6 +280,9 @@ class TimeoutEvent(Loggable, StatefulEvent):
     def format(self) -> LoggerEvent:
         return LoggerEvent(self, self.name, 0, self.timestamp)
 
+    def log_fields(self) -> typing.Tuple[str, int]:
+        return self.name, 0
+
 
 class GUIEvent(Loggable, StatefulEvent):
     name: str
@@ -232,6 +291,9 @@ class GUIEvent(Loggable, StatefulEvent):
     def format(self) -> LoggerEvent:
         return LoggerEvent(self, self.name, self.value, self.timestamp)
 
+    def log_fields(self) -> typing.Tuple[str, int]:
+        return self.name, self.value
+
 
 class StateEnterEvent(Loggable, StatefulEvent):
     name: str
@@ -240,6 +302,9 @@ class StateEnterEvent(Loggable, StatefulEvent):
     def format(self) -> LoggerEvent:
         return LoggerEvent(self, self.name, self.value, self.timestamp)
 
+    def log_fields(self) -> typing.Tuple[str, int]:
+        return self.name, self.value
+
 
 class StateExitEvent(Loggable, StatefulEvent):
     name: str
@@ -247,3 +312,6 @@ class StateExitEvent(Loggable, StatefulEvent):
 
     def format(self) -> LoggerEvent:
         return LoggerEvent(self, self.name, self.value, self.timestamp)
+
+    def log_fields(self) -> typing.Tuple[str, int]:
+        return self.name, self.value
@@ -107,8 +107,7 @@ class SubjectConfigWidget(EventWidget):
             if len(self.settings.value(key, "")) > 0:
                 constants[key] = self.settings.value(key, "")
         if len(constants) > 0:
-            self.cw.workstation.mainq.send_bytes(
-                self.cw.workstation.encoder.encode(PybEvents.ConstantsUpdateEvent(int(self.cw.chamber_id.text()) - 1, constants)))
+            self.cw.workstation.send_event(PybEvents.ConstantsUpdateEvent(int(self.cw.chamber_id.text()) - 1, constants))
 
     def set_chamber(self, cw: ChamberWidget):
         super(SubjectConfigWidget, self).set_chamber(cw)
@@ -122,9 +121,8 @@ class SubjectConfigWidget(EventWidget):
     def remove_constant(self):
         index = self.constants_value_list.currentRow()
         self.settings.remove(self.combos[index].currentText())
-        self.cw.workstation.mainq.send_bytes(
-            self.cw.workstation.encoder.encode(PybEvents.ConstantRemoveEvent(int(self.cw.chamber_id.text()) - 1,
-                                                                             self.combos[index].currentText())))
+        self.cw.workstation.send_event(PybEvents.ConstantRemoveEvent(int(self.cw.chamber_id.text()) - 1,
+                                                                     self.combos[index].currentText()))
         option = self.names.pop(index)
         self.add_option(option, index)
         self.combos.pop(index)
@@ -166,14 +164,12 @@ class SubjectConfigWidget(EventWidget):
         if len(self.constants_value_list.currentItem().text()) > 0:
             if self.combos[index].currentText() != prev and len(prev) > 0:
                 self.settings.remove(prev)
-                self.cw.workstation.mainq.send_bytes(
-                    self.cw.workstation.encoder.encode(PybEvents.ConstantRemoveEvent(int(self.cw.chamber_id.text()) - 1,
-                                                                                     prev)))
+                self.cw.workstation.send_event(PybEvents.ConstantRemoveEvent(int(self.cw.chamber_id.text()) - 1,
+                                                                             prev))
             self.settings.setValue(self.combos[index].currentText(), self.constants_value_list.currentItem().text())
             if len(self.constants_value_list.currentItem().text()) > 0:
-                self.cw.workstation.mainq.send_bytes(
-                    self.cw.workstation.encoder.encode(PybEvents.ConstantsUpdateEvent(int(self.cw.chamber_id.text()) - 1,
-                                                       {self.combos[index].currentText(): self.constants_value_list.currentItem().text()})))
+                self.cw.workstation.send_event(PybEvents.ConstantsUpdateEvent(int(self.cw.chamber_id.text()) - 1,
+                                                                              {self.combos[index].currentText(): self.constants_value_list.currentItem().text()}))
         self.names[self.constants_name_list.currentRow()] = self.combos[index].currentText()
 
     def on_commit_value(self):
@@ -181,9 +177,8 @@ class SubjectConfigWidget(EventWidget):
         if len(self.constants_value_list.currentItem().text()) > 0:
             self.settings.setValue(self.combos[index].currentText(), self.constants_value_list.currentItem().text())
             if len(self.constants_value_list.currentItem().text()) > 0:
-                self.cw.workstation.mainq.send_bytes(
-                    self.cw.workstation.encoder.encode(PybEvents.ConstantsUpdateEvent(int(self.cw.chamber_id.text()) - 1,
-                                                       {self.combos[index].currentText(): self.constants_value_list.currentItem().text()})))
+                self.cw.workstation.send_event(PybEvents.ConstantsUpdateEvent(int(self.cw.chamber_id.text()) - 1,
+                                                                              {self.combos[index].currentText(): self.constants_value_list.currentItem().text()}))
 
     def remove_option(self, option, index):
         for i, combo in enumerate(self.combos):
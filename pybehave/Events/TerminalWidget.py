@@ -11,6 +11,7 @@ from pybehave.Workstation.ScrollLabel import ScrollLabel
 
 
 class TerminalWidget(EventWidget):
+    event_types = ["Loggable"]
 
     def __init__(self, name: str):
         super().__init__(name)
@@ -26,6 +26,10 @@ from pybehave.GUIs import Colors
 
 class GUI:
     __metaclass__ = ABCMeta
+    # Names of the TaskEvent classes this GUI needs in addition to those used by the Workstation or None for all events
+    event_types = None
+    # Minimum time in seconds between updates sent for the named components with only the latest value kept in between
+    component_update_intervals = {}
 
     def __init__(self, event: PybEvents.AddTaskEvent, task_gui: Surface, ws: Workstation):
         self.task_gui = task_gui
@@ -192,4 +196,4 @@ class GUI:
 
     def log_gui_event(self, event: Enum, metadata: Dict = None):
         metadata = metadata or {}
-        self.ws.mainq.send_bytes(self.ws.encoder.encode(GUIEvent(self.chamber, event.name, event.value, metadata=metadata)))
+        self.ws.send_event(GUIEvent(self.chamber, event.name, event.value, metadata=metadata))
@@ -1,17 +1,44 @@
+import math
+import threading
+
 import nidaqmx
 from nidaqmx import stream_writers
-from nidaqmx.constants import (LineGrouping)
+from nidaqmx.constants import (AcquisitionType, LineGrouping, RegenerationMode)
 import numpy as np
 from nidaqmx.system import system
 
 from pybehave.Components.Component import Component
 from pybehave.Sources.Source import Source
+from pybehave.Utilities.Exceptions import ComponentRegisterError
+
+# Number of blocks of silence written before a streaming analog output task is started
+AO_PREFILL_BLOCKS = 2
+# Number of blocks the buffer of queued streaming output initially holds
+AO_QUEUE_BLOCKS = 16
+
+
+def ring_slices(start: int, n: int, capacity: int) -> list:
+    """Returns pairs of slices into a ring buffer and into a run of n samples beginning at absolute sample start."""
+    first = start % capacity
+    if first + n <= capacity:
+        return [(slice(first, first + n), slice(0, n))]
+    split = capacity - first
+    return [(slice(first, capacity), slice(0, split)), (slice(0, n - split), slice(split, n))]
 
 
 class NIDAQSource(Source):
     """
         Class defining a Source for interacting with National Instruments DAQs.
 
+        Parameters
+        ----------
+        dev : str
+            Device ID of the DAQ
+        ao_rate : str
+            Sampling rate of a continuously streaming analog output task. Analog outputs are written as finite tasks if 0.
+        ao_block : str
+            Duration in seconds of each block of samples handed to the DAQ while streaming
+
         Attributes
         ----------
         dev : Device
@@ -22,6 +49,12 @@ class NIDAQSource(Source):
             Links Component IDs to DAQ tasks
         streams : dict
             Links Component IDs to DAQ streams
+        ao_timing : tuple
+            Sampling rate and waveform length the finite analog output task is currently configured for
+        ao_queue : np.ndarray
+            Ring buffer of streaming output waiting to be handed to the DAQ with a row for each analog output channel
+        ao_position : int
+            Index of the next streaming output sample to be handed to the DAQ
 
         Methods
         -------
@@ -37,7 +70,7 @@ class NIDAQSource(Source):
             Writes a response for the Component to the DAQ
     """
 
-    def __init__(self, dev):
+    def __init__(self, dev, ao_rate: str = "0", ao_block: str = "0.01"):
         super(NIDAQSource, self).__init__()
         self.dev = dev
         self.tasks = {}
@@ -45,6 +78,16 @@ class NIDAQSource(Source):
         self.ao_task = None
         self.ao_stream = None
         self.ao_inds = {}
+        self.ao_timing = None
+        self.ao_rate = float(ao_rate)
+        self.ao_block_size = max(math.ceil(float(ao_block) * self.ao_rate), 1)
+        self.ao_queue = None
+        self.ao_block = None
+        self.ao_position = 0
+        self.ao_ends = {}
+        self.ao_lock = None
+        self.ao_thread = None
+        self.ao_streaming = False
 
     def initialize(self):
         dev_obj = system.Device(self.dev)
@@ -58,28 +101,38 @@ class NIDAQSource(Source):
             task.start()
             self.tasks[component.id] = task
         elif component.get_type() == Component.Type.ANALOG_OUTPUT:
+            # Every channel shares the sample clock of a streaming task
+            if self.ao_rate > 0 and float(component.sr) != self.ao_rate:
+                raise ComponentRegisterError
             if self.ao_task is None:
                 self.ao_task = nidaqmx.Task()
+            # Channels cannot be added to a running task so streaming restarts with the next output
+            self.stop_streaming()
             self.ao_task.ao_channels.add_ao_voltage_chan(self.dev + component.address)
             self.ao_stream = stream_writers.AnalogMultiChannelWriter(self.ao_task.out_stream)
             self.ao_inds[component.id] = len(self.ao_inds)
+            self.ao_timing = None
 
     def close_source(self):
         if self.ao_task is not None:
+            self.stop_streaming()
             self.ao_task.close()
             self.ao_task = None
             self.ao_stream = None
-        for task in self.tasks:
+            self.ao_timing = None
+        for task in self.tasks.values():
             task.close()
         self.tasks = {}
 
     def close_component(self, component_id):
         if self.components[component_id].get_type() == Component.Type.ANALOG_OUTPUT:
             if self.ao_task is not None:
+                self.stop_streaming()
                 self.ao_task.stop()
                 self.ao_task.close()
                 self.ao_task = None
                 self.ao_stream = None
+                self.ao_timing = None
         else:
             self.tasks[component_id].stop()
             self.tasks[component_id].close()
@@ -88,12 +141,84 @@ class NIDAQSource(Source):
         if self.components[component_id].get_type() == Component.Type.DIGITAL_OUTPUT:
             self.tasks[component_id].write(msg)
         elif self.components[component_id].get_type() == Component.Type.ANALOG_OUTPUT:
+            if self.ao_rate > 0:
+                self.queue_output(self.ao_inds[component_id], np.ravel(msg))
+                return
+            timing = (self.components[component_id].sr, msg.shape[1])
             output = np.zeros((len(self.ao_inds), msg.shape[1]))
             output[self.ao_inds[component_id], :] = np.squeeze(msg)
             if self.ao_task.is_task_done():
                 self.ao_task.stop()
-            self.ao_task.timing.cfg_samp_clk_timing(self.components[component_id].sr,
-                                                    sample_mode=nidaqmx.constants.AcquisitionType.FINITE,
-                                                    samps_per_chan=msg.shape[1])
+            # Reconfiguring the sample clock is only necessary when the rate or length of the output changes
+            if timing != self.ao_timing:
+                self.ao_task.timing.cfg_samp_clk_timing(timing[0],
+                                                        sample_mode=AcquisitionType.FINITE,
+                                                        samps_per_chan=timing[1])
+                self.ao_timing = timing
             self.ao_stream.write_many_sample(output)
             self.ao_task.start()
+
+    def queue_output(self, row: int, samples: np.ndarray) -> None:
+        """Places samples in the streaming output for a channel, replacing anything still queued for that channel."""
+        if self.ao_lock is None:
+            self.ao_lock = threading.Lock()
+        with self.ao_lock:
+            if not self.ao_streaming:
+                self.prepare_streaming()
+            if samples.shape[0] > self.ao_queue.shape[1]:
+                self.grow_queue(samples.shape[0])
+            start = self.ao_position
+            end = self.ao_ends.get(row, start)
+            # Samples are mixed into the channel's row in place so other channels are unaffected
+            for queue_slice, sample_slice in ring_slices(start, samples.shape[0], self.ao_queue.shape[1]):
+                self.ao_queue[row, queue_slice] = samples[sample_slice]
+            if end > start + samples.shape[0]:
+                for queue_slice, _ in ring_slices(start + samples.shape[0], end - start - samples.shape[0],
+                                                  self.ao_queue.shape[1]):
+                    self.ao_queue[row, queue_slice] = 0
+            self.ao_ends[row] = start + samples.shape[0]
+        if self.ao_thread is None:
+            self.ao_thread = threading.Thread(target=self.stream_loop, daemon=True)
+            self.ao_thread.start()
+
+    def prepare_streaming(self) -> None:
+        n_channels = len(self.ao_inds)
+        self.ao_queue = np.zeros((n_channels, AO_QUEUE_BLOCKS * self.ao_block_size))
+        self.ao_block = np.zeros((n_channels, self.ao_block_size))
+        self.ao_position = 0
+        self.ao_ends = {}
+        # The DAQ buffer only holds a few blocks ahead of the output so queued samples play soon after being written
+        self.ao_task.timing.cfg_samp_clk_timing(self.ao_rate, sample_mode=AcquisitionType.CONTINUOUS,
+                                                samps_per_chan=AO_PREFILL_BLOCKS * self.ao_block_size)
+        self.ao_task.out_stream.regen_mode = RegenerationMode.DONT_ALLOW_REGENERATION
+        self.ao_stream.write_many_sample(np.zeros((n_channels, AO_PREFILL_BLOCKS * self.ao_block_size)))
+        self.ao_task.start()
+        self.ao_streaming = True
+
+    def grow_queue(self, n: int) -> None:
+        capacity = self.ao_queue.shape[1]
+        queued = np.concatenate([self.ao_queue[:, queue_slice] for queue_slice, _ in
+                                 ring_slices(self.ao_position, capacity, capacity)], axis=1)
+        # The capacity stays a whole number of blocks so a block never wraps around the end of the queue
+        self.ao_queue = np.zeros((queued.shape[0], max(2 * capacity, math.ceil(n / self.ao_block_size) * self.ao_block_size)))
+        for queue_slice, sample_slice in ring_slices(self.ao_position, capacity, self.ao_queue.shape[1]):
+            self.ao_queue[:, queue_slice] = queued[:, sample_slice]
+
+    def stream_loop(self) -> None:
+        while self.ao_streaming:
+            with self.ao_lock:
+                start = self.ao_position % self.ao_queue.shape[1]
+                self.ao_block[:] = self.ao_queue[:, start:start + self.ao_block_size]
+                # Played samples are cleared so the queue holds silence until more output is written
+                self.ao_queue[:, start:start + self.ao_block_size] = 0
+                self.ao_position += self.ao_block_size
+            # Blocks until the DAQ has room for the block which paces the loop to the sample clock
+            self.ao_stream.write_many_sample(self.ao_block)
+
+    def stop_streaming(self) -> None:
+        if self.ao_streaming:
+            self.ao_streaming = False
+            if self.ao_thread is not None:
+                self.ao_thread.join()
+                self.ao_thread = None
+            self.ao_task.stop()
@@ -0,0 +1,146 @@
+import heapq
+import math
+import threading
+import time
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+from pybehave.Components.Component import Component
+from pybehave.Sources.ThreadSource import ThreadSource
+from pybehave.Utilities.Exceptions import ComponentRegisterError
+
+
+class SimulatedSource(ThreadSource):
+    """
+    Source that simulates hardware so tasks can be tested and benchmarked without a rig. Any Component type can be
+    registered. Inputs are driven by the random process named by the "process" key in the Component metadata:
+
+    - poisson: pulses (True then False after duration seconds) arriving at an average of rate per second
+    - burst: bursts of count pulses spaced interval seconds apart arriving at an average of rate per second
+    - sine: blocks of block_size samples of a sine wave with the given frequency and amplitude sampled at sample_rate
+
+    Values written to a Component are echoed back as updates to the same Component after its latency. Updates are
+    timestamped with the time they were scheduled for so acquisition_time reflects the simulated input time.
+
+    Parameters
+    ----------
+    latency : str
+        Default time in seconds before written values are echoed. Can be overridden with "latency" in the metadata.
+    seed : str
+        Seed for the random number generator. Random if empty.
+    """
+
+    defaults = {"rate": 1, "duration": 0.1, "count": 5, "interval": 0.05, "frequency": 1, "amplitude": 1,
+                "sample_rate": 1000, "block_size": 100}
+
+    def __init__(self, latency: str = "0", seed: str = ""):
+        super(SimulatedSource, self).__init__()
+        self.latency = float(latency)
+        self.seed = int(seed) if len(seed) > 0 else None
+        self.rng = None
+        self.settings = {}
+        self.generations = {}
+        self.schedule = []
+        self.schedule_count = 0
+        self.schedule_cv = None
+        self.closing = False
+        self.processes = {"poisson": self.poisson, "burst": self.burst, "sine": self.sine}
+
+    def run(self):
+        # Components can be registered as soon as the event thread starts so the scheduler state is created first
+        self.schedule_cv = threading.Condition()
+        self.rng = np.random.default_rng(self.seed)
+        super(SimulatedSource, self).run()
+
+    def initialize(self):
+        while True:
+            with self.schedule_cv:
+                if self.closing:
+                    return
+                if len(self.schedule) == 0:
+                    self.schedule_cv.wait()
+                    continue
+                delay = self.schedule[0][0] - time.perf_counter()
+                if delay > 0:
+                    self.schedule_cv.wait(delay)
+                    continue
+                t, _, cid, generation, action = heapq.heappop(self.schedule)
+                # Actions for closed or re-registered Components are dropped
+                if self.generations.get(cid) != generation:
+                    continue
+            # Actions send updates which can block on the pipe so they run without the lock to let writes be scheduled
+            action(cid, t)
+
+    def add_action(self, cid: str, t: float, action: Callable[[str, float], None]) -> None:
+        with self.schedule_cv:
+            heapq.heappush(self.schedule, (t, self.schedule_count, cid, self.generations[cid], action))
+            self.schedule_count += 1
+            self.schedule_cv.notify()
+
+    def register_component(self, component: Component, metadata: Dict) -> None:
+        process = metadata.get("process")
+        if process is not None and process not in self.processes:
+            raise ComponentRegisterError
+        settings = {key: float(metadata.get(key, value)) for key, value in self.defaults.items()}
+        settings["latency"] = float(metadata.get("latency", self.latency))
+        settings["block"] = 0
+        with self.schedule_cv:
+            self.settings[component.id] = settings
+            self.generations[component.id] = self.generations.get(component.id, -1) + 1
+        if process == "sine":
+            self.add_action(component.id, time.perf_counter(), self.sine)
+        elif process is not None:
+            self.add_action(component.id, time.perf_counter() + self.next_arrival(component.id), self.processes[process])
+
+    def next_arrival(self, cid: str) -> float:
+        return self.rng.exponential(1 / self.settings[cid]["rate"])
+
+    def pulse(self, cid: str, t: float) -> None:
+        self.update_component(cid, True, timestamp=t)
+        self.add_action(cid, t + self.settings[cid]["duration"], self.pulse_end)
+
+    def pulse_end(self, cid: str, t: float) -> None:
+        self.update_component(cid, False, timestamp=t)
+
+    def poisson(self, cid: str, t: float) -> None:
+        self.pulse(cid, t)
+        self.add_action(cid, t + self.next_arrival(cid), self.poisson)
+
+    def burst(self, cid: str, t: float) -> None:
+        settings = self.settings[cid]
+        self.pulse(cid, t)
+        for i in range(1, int(settings["count"])):
+            self.add_action(cid, t + i * settings["interval"], self.pulse)
+        # The next burst cannot begin before the current one has finished
+        end = t + (settings["count"] - 1) * settings["interval"] + settings["duration"]
+        self.add_action(cid, end + self.next_arrival(cid), self.burst)
+
+    def sine(self, cid: str, t: float) -> None:
+        settings = self.settings[cid]
+        block_size = int(settings["block_size"])
+        # Samples are generated from the block index so the phase is continuous across blocks
+        start = settings["block"] * block_size
+        samples = settings["amplitude"] * np.sin(2 * math.pi * settings["frequency"] *
+                                                 np.arange(start, start + block_size) / settings["sample_rate"])
+        settings["block"] += 1
+        self.update_component(cid, samples, timestamp=t)
+        self.add_action(cid, t + block_size / settings["sample_rate"], self.sine)
+
+    def write_component(self, component_id: str, msg: Any) -> None:
+        latency = self.settings[component_id]["latency"]
+        if latency <= 0:
+            self.update_component(component_id, msg)
+        else:
+            self.add_action(component_id, time.perf_counter() + latency,
+                            lambda cid, t: self.update_component(cid, msg, timestamp=t))
+
+    def close_component(self, component_id: str) -> None:
+        with self.schedule_cv:
+            if component_id in self.generations:
+                self.generations[component_id] += 1
+
+    def close_source(self) -> None:
+        with self.schedule_cv:
+            self.closing = True
+            self.schedule_cv.notify()
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 import importlib
+import multiprocessing.connection
+import threading
+import time
 import traceback
 from multiprocessing import Process
+from multiprocessing.connection import Connection
 from typing import TYPE_CHECKING, Any, Dict, List
 
 import msgspec.msgpack
@@ -14,6 +18,7 @@ if TYPE_CHECKING:
 
 from abc import ABCMeta
 from pybehave.Events.PybEvents import ComponentUpdateEvent, UnavailableSourceEvent
+from pybehave.Utilities.SharedArrayRing import SharedArrayRing
 import pybehave.Utilities.Exceptions as pyberror
 
 
@@ -23,6 +28,20 @@ class Source(Process):
     Abstract class defining the base requirements for an input/output source. Sources provide data to and receive data
     from components.
     
+    Attributes
+    ----------
+    batch_window : float
+        Maximum time in seconds component updates are held so they can be sent to the TaskProcess together. Updates are
+        sent immediately if 0.
+    batch_size : int
+        Number of held component updates that triggers an immediate send regardless of the batch window
+    clock_scale : float
+        Seconds per tick of the clock used for timestamps passed to update_component
+    clock_offset : float
+        Value of time.perf_counter when the clock used for timestamps passed to update_component read zero
+    trace : bool
+        If component updates should carry latency traces. Set by the Workstation from the latency_trace setting.
+
     Methods
     -------
     register_component(task, component)
@@ -40,28 +59,48 @@ class Source(Process):
         self.sid = None
         self.components = {}
         self.component_chambers = {}
+        self.component_queues = {}
+        self.queues = []
         self.queue = None
         self.decoder = None
         self.encoder = None
+        self.ring = None
         self.available = True
+        self.batch_window = 0
+        self.batch_size = 64
+        self.batches = {}
+        self.batch_lock = None
+        self.batch_ready = None
+        self.send_lock = None
+        self.shared_array_views = False
+        self.clock_scale = 1
+        self.clock_offset = 0
+        self.trace = False
 
     def initialize(self):
         pass
 
     def run(self):
-        self.decoder = msgspec.msgpack.Decoder(type=List[PybEvents.subclass_union(PybEvents.PybEvent)], dec_hook=PybEvents.dec_hook, ext_hook=PybEvents.ext_hook)
-        self.encoder = msgspec.msgpack.Encoder(enc_hook=PybEvents.enc_hook)
+        self.decoder = msgspec.msgpack.Decoder(type=List[PybEvents.subclass_union(PybEvents.PybEvent)], dec_hook=PybEvents.dec_hook,
+                                               ext_hook=PybEvents.view_ext_hook if self.shared_array_views else PybEvents.ext_hook)
+        # Updates are sent to a single TaskProcess so large arrays can be passed through shared memory
+        self.ring = SharedArrayRing()
+        self.encoder = msgspec.msgpack.Encoder(enc_hook=PybEvents.shared_enc_hook(self.ring))
+        self.queue = self.queues[0]
+        self.start_batching()
         try:
             self.initialize()
             while True:
-                events = self.decoder.decode(self.queue.recv_bytes())
-                if not self.handle_events(events):
-                    return
+                for queue in multiprocessing.connection.wait(self.queues):
+                    self.queue = queue
+                    events = self.decoder.decode(queue.recv_bytes())
+                    if not self.handle_events(events):
+                        return
         except pyberror.ComponentRegisterError as e:
-            self.queue.send_bytes(self.encoder.encode(PybEvents.ErrorEvent(type(e).__name__, traceback.format_exc(), metadata={"sid": self.sid})))
+            self.broadcast(PybEvents.ErrorEvent(type(e).__name__, traceback.format_exc(), metadata={"sid": self.sid}))
             self.unavailable()
         except BaseException as e:
-            self.queue.send_bytes(self.encoder.encode(PybEvents.ErrorEvent(type(e).__name__, traceback.format_exc(), metadata={"sid": self.sid})))
+            self.broadcast(PybEvents.ErrorEvent(type(e).__name__, traceback.format_exc(), metadata={"sid": self.sid}))
             self.unavailable()
             raise
 
@@ -69,13 +108,21 @@ class Source(Process):
         for event in events:
             if isinstance(event, PybEvents.ComponentUpdateEvent):
                 self.write_component(event.comp_id, event.value)
+                if self.trace and "trace" in event.metadata:
+                    trace = event.metadata["trace"]
+                    trace.append(time.perf_counter())
+                    with self.send_lock:
+                        self.queue.send_bytes(self.encoder.encode([PybEvents.TraceEvent(event.chamber, trace)]))
             elif isinstance(event, PybEvents.ComponentRegisterEvent):
                 self.register_component_(event)
             elif isinstance(event, PybEvents.ComponentCloseEvent):
                 self.close_component(event.comp_id)
             elif isinstance(event, PybEvents.CloseSourceEvent) or isinstance(event, PybEvents.RemoveSourceEvent):
-                self.close_source_()
-                return False
+                # Only close once every TaskProcess has released the Source
+                self.queues.remove(self.queue)
+                if len(self.queues) == 0:
+                    self.close_source_()
+                    return False
             elif isinstance(event, PybEvents.OutputFileChangedEvent):
                 self.output_file_changed(event)
             elif isinstance(event, PybEvents.ConstantsUpdateEvent):
@@ -88,6 +135,7 @@ class Source(Process):
         component.initialize(event.metadata)
         self.components[component.id] = component
         self.component_chambers[component.id] = event.metadata["chamber"]
+        self.component_queues[component.id] = self.queue  # Updates are returned to the TaskProcess running the chamber
         self.register_component(component, event.metadata)
 
     def register_component(self, component: Component, metadata: Dict) -> None:
@@ -102,7 +150,7 @@ class Source(Process):
         """
         pass
 
-    def update_component(self, cid: str, value: Any, metadata: Dict = None) -> None:
+    def update_component(self, cid: str, value: Any, metadata: Dict = None, timestamp: float = None) -> None:
         """ This method should be called to indicate a Component has updated based on new information from the Source.
 
         Parameters
@@ -113,13 +161,81 @@ class Source(Process):
             the new value received from the Source for the Component
         metadata : dict
             any metadata associated with this update
+        timestamp : float
+            the time the value was acquired according to the Source's clock (see sync_clock). Defaults to the time this method is called.
         """
         metadata = metadata or {}
-        self.queue.send_bytes(self.encoder.encode(ComponentUpdateEvent(self.component_chambers[cid], cid, value, metadata=metadata)))
+        acquisition_time = time.perf_counter() if timestamp is None else self.map_time(timestamp)
+        if self.trace:
+            # time.perf_counter stamps are added to the trace at each hop and only exist when tracing is enabled
+            metadata = dict(metadata, trace=[acquisition_time])
+        event = ComponentUpdateEvent(self.component_chambers[cid], cid, value, acquisition_time=acquisition_time, metadata=metadata)
+        queue = self.component_queues[cid]
+        if self.batch_window <= 0:
+            self.send_updates(queue, [event])
+        else:
+            with self.batch_lock:
+                batch = self.batches.setdefault(queue, [])
+                batch.append(event)
+                if len(batch) >= self.batch_size:
+                    self.send_updates(queue, batch)
+                    del self.batches[queue]
+                elif len(batch) == 1:
+                    self.batch_ready.set()
+
+    def send_updates(self, queue: Connection, events: List[PybEvents.ComponentUpdateEvent]) -> None:
+        if self.trace:
+            now = time.perf_counter()
+            for event in events:
+                event.metadata["trace"].append(now)
+        # Updates may be sent from several threads (the Source's own, batching and any it starts) to the same connection
+        with self.send_lock:
+            queue.send_bytes(self.encoder.encode(events))
+
+    def sync_clock(self, device_time: float, scale: float = 1) -> None:
+        """ Call to relate a hardware clock to time.perf_counter so timestamps from the device can be passed to update_component.
+
+        Parameters
+        ----------
+        device_time : float
+            the current reading of the hardware clock
+        scale : float
+            the duration of one tick of the hardware clock in seconds
+        """
+        self.clock_scale = scale
+        self.clock_offset = time.perf_counter() - device_time * scale
+
+    def map_time(self, timestamp: float) -> float:
+        """Converts a timestamp from the Source's clock to time.perf_counter seconds."""
+        return timestamp * self.clock_scale + self.clock_offset
+
+    def start_batching(self) -> None:
+        self.batch_lock = threading.Lock()
+        self.send_lock = threading.Lock()
+        self.batch_ready = threading.Event()
+        if self.batch_window > 0:
+            threading.Thread(target=self.batch_loop, daemon=True).start()
+
+    def batch_loop(self) -> None:
+        while True:
+            self.batch_ready.wait()
+            self.batch_ready.clear()
+            time.sleep(self.batch_window)
+            self.flush_batches()
+
+    def flush_batches(self) -> None:
+        """Sends any held component updates to the TaskProcess."""
+        with self.batch_lock:
+            for queue, batch in self.batches.items():
+                self.send_updates(queue, batch)
+            self.batches = {}
 
     def close_source_(self):
+        self.flush_batches()
         self.close_source()
         self.unavailable()
+        if self.ring is not None:
+            self.ring.close()
 
     def close_source(self) -> None:
         """Override to close all connections with the interface represented by the Source."""
@@ -152,4 +268,14 @@ class Source(Process):
     def unavailable(self):
         """Call to signal to other processes that the Source has lost connection to the hardware."""
         self.available = False
-        self.queue.send_bytes(self.encoder.encode(UnavailableSourceEvent(self.sid)))
+        self.flush_batches()
+        # Every TaskProcess may be running chambers that use the Source
+        self.broadcast(UnavailableSourceEvent(self.sid))
+
+    def broadcast(self, event: PybEvents.PybEvent) -> None:
+        """Sends an event to every TaskProcess connected to the Source."""
+        # Shared arrays can only be read by one process so broadcasts are always copied
+        msg = msgspec.msgpack.encode([event], enc_hook=PybEvents.enc_hook)
+        with self.send_lock:
+            for queue in self.queues:
+                queue.send_bytes(msg)
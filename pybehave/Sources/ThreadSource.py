@@ -1,3 +1,4 @@
+import multiprocessing.connection
 import threading
 import traceback
 from abc import ABC
@@ -7,6 +8,7 @@ import msgspec.msgpack
 
 from pybehave.Events import PybEvents
 from pybehave.Sources.Source import Source
+from pybehave.Utilities.SharedArrayRing import SharedArrayRing
 import pybehave.Utilities.Exceptions as pyberror
 
 
@@ -18,31 +20,37 @@ class ThreadSource(Source, ABC):
         self.run_stop = None
 
     def run(self):
-        self.decoder = msgspec.msgpack.Decoder(type=List[PybEvents.subclass_union(PybEvents.PybEvent)])
-        self.encoder = msgspec.msgpack.Encoder()
+        self.decoder = msgspec.msgpack.Decoder(type=List[PybEvents.subclass_union(PybEvents.PybEvent)], dec_hook=PybEvents.dec_hook,
+                                               ext_hook=PybEvents.view_ext_hook if self.shared_array_views else PybEvents.ext_hook)
+        self.ring = SharedArrayRing()
+        self.encoder = msgspec.msgpack.Encoder(enc_hook=PybEvents.shared_enc_hook(self.ring))
+        self.queue = self.queues[0]
+        self.start_batching()
         try:
             self.run_stop = threading.Event()
             self.run_thread = threading.Thread(target=self.run_)
             self.run_thread.start()
             self.initialize()
         except pyberror.ComponentRegisterError as e:
-            self.queue.send_bytes(self.encoder.encode(PybEvents.ErrorEvent(type(e).__name__, traceback.format_exc(), metadata={"sid": self.sid})))
+            self.broadcast(PybEvents.ErrorEvent(type(e).__name__, traceback.format_exc(), metadata={"sid": self.sid}))
             self.unavailable()
         except BaseException as e:
-            self.queue.send_bytes(self.encoder.encode(PybEvents.ErrorEvent(type(e).__name__, traceback.format_exc(), metadata={"sid": self.sid})))
+            self.broadcast(PybEvents.ErrorEvent(type(e).__name__, traceback.format_exc(), metadata={"sid": self.sid}))
             self.unavailable()
             raise
 
     def run_(self):
         try:
             while True:
-                events = self.decoder.decode(self.queue.recv_bytes())
-                if not self.handle_events(events):
-                    return
+                for queue in multiprocessing.connection.wait(self.queues):
+                    self.queue = queue
+                    events = self.decoder.decode(queue.recv_bytes())
+                    if not self.handle_events(events):
+                        return
         except pyberror.ComponentRegisterError as e:
-            self.queue.send_bytes(self.encoder.encode(PybEvents.ErrorEvent(type(e).__name__, traceback.format_exc(), metadata={"sid": self.sid})))
+            self.broadcast(PybEvents.ErrorEvent(type(e).__name__, traceback.format_exc(), metadata={"sid": self.sid}))
             self.unavailable()
         except BaseException as e:
-            self.queue.send_bytes(self.encoder.encode(PybEvents.ErrorEvent(type(e).__name__, traceback.format_exc(), metadata={"sid": self.sid})))
+            self.broadcast(PybEvents.ErrorEvent(type(e).__name__, traceback.format_exc(), metadata={"sid": self.sid}))
             self.unavailable()
             raise
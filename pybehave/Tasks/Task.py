@@ -1,15 +1,17 @@
 from __future__ import annotations
 
+import operator
 import time
 from abc import ABCMeta, abstractmethod
 import importlib
 from enum import Enum
 import runpy
-from typing import Any, Type, overload, Dict, List, TYPE_CHECKING, Tuple
+from typing import Any, Type, overload, Dict, List, TYPE_CHECKING, Tuple, Callable, Iterable, Union
 
 from pybehave.Events import PybEvents
 from pybehave.Tasks.TimeoutManager import Timeout
 from pybehave.Utilities.AddressFile import AddressFile
+from pybehave.Utilities.component_name import component_name
 import pybehave.Utilities.Exceptions as pyberror
 
 if TYPE_CHECKING:
@@ -17,6 +19,40 @@ if TYPE_CHECKING:
     from pybehave.Components.Component import Component
 
 
+def on(event_type: Type[PybEvents.PybEvent], comp: str = None, state: Union[Enum, Iterable[Enum]] = None) -> Callable:
+    """ Decorator registering a Task method to be called with events of event_type (or its subclasses) instead of the
+    current state method. Handlers can be limited to events from the components with a given name and to one or more
+    states. The decorator can be applied several times to the same method.
+
+    Parameters
+    ----------
+    event_type : Type[PybEvent]
+        the type of event handled by the method
+    comp : str
+        the name of the component (as returned by get_components) the event must come from. Only valid for
+        ComponentChangedEvents and ComponentUpdateEvents.
+    state : Enum | Iterable[Enum]
+        the state or states the task must be in for the method to be called. Defaults to all states.
+    """
+    if comp is not None and not issubclass(event_type, (PybEvents.ComponentChangedEvent, PybEvents.ComponentUpdateEvent)):
+        raise TypeError("Only component events can be filtered by component")
+
+    def decorator(method: Callable) -> Callable:
+        if "handles" not in method.__dict__:
+            method.handles = []
+        method.handles.append((event_type, comp, state))
+        return method
+    return decorator
+
+
+def event_component(event_type: Type[PybEvents.PybEvent]) -> Callable[[PybEvents.PybEvent], str] | None:
+    if issubclass(event_type, PybEvents.ComponentChangedEvent):
+        return operator.attrgetter("comp.id")
+    elif issubclass(event_type, PybEvents.ComponentUpdateEvent):
+        return operator.attrgetter("comp_id")
+    return None
+
+
 class Task:
     __metaclass__ = ABCMeta
     """
@@ -34,6 +70,8 @@ class Task:
             The current time in seconds for the task loop
         events : List<Event>
             List of events related to the current loop of the task
+        heartbeat_interval : float
+            Time in seconds between HeartbeatEvents passed to the task while it is running. Set to None to disable heartbeats.
 
         Methods
         -------
@@ -60,6 +98,16 @@ class Task:
     class SessionStates(Enum):
         PAUSED = 0
 
+    heartbeat_interval = 0.1
+    event_plans = {}
+    state_values = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Event plans and state lookups depend on the States of each Task class so they are not shared with the parent
+        cls.event_plans = {}
+        cls.state_values = None
+
     def __init__(self):
         self.state = None
         self.entry_time = self.start_time = self.pause_time = self.time_into_trial = self.time_paused = 0
@@ -70,6 +118,8 @@ class Task:
         self.metadata = None
         self.components = {}
         self.state_methods = {}
+        self.event_handlers = {}
+        self.handled_events = {}
         self.complete = False
         self._complete = False
         self.initial_constants = {}
@@ -206,7 +256,37 @@ class Task:
 
         if hasattr(self, "States"):
             for e in self.States:
-                self.state_methods[e.name] = getattr(self, e.name)
+                # State methods are optional for tasks that only use handlers registered with on
+                if hasattr(self, e.name):
+                    self.state_methods[e.name] = getattr(self, e.name)
+            self.compile_handlers()
+
+    def compile_handlers(self) -> None:
+        # Collect methods decorated with on in definition order letting subclasses override their parents' methods
+        methods = {}
+        for cls in reversed(type(self).__mro__):
+            for name, value in vars(cls).items():
+                methods[name] = value
+        general = {}
+        specific = {}
+        for name, method in methods.items():
+            for event_type, comp, state in getattr(method, "handles", ()):
+                states = list(self.States) if state is None else [state] if isinstance(state, Enum) else list(state)
+                # Handlers are keyed by concrete event class so routing never needs to check subclasses
+                event_types = [event_type]
+                for event_cls in event_types:
+                    event_types.extend(sc for sc in event_cls.__subclasses__() if sc not in event_types)
+                cids = [None] if comp is None else [cid for cid in self.components if component_name(cid) == comp]
+                for task_state in states:
+                    for event_cls in event_types:
+                        self.handled_events[event_cls] = event_component(event_cls)
+                        for cid in cids:
+                            handlers = general if cid is None else specific
+                            handlers.setdefault((task_state, event_cls, cid), []).append(getattr(self, name))
+        # Handlers for specific components also run the handlers for every component of the same type and state
+        for (task_state, event_cls, cid), handlers in specific.items():
+            handlers.extend(general.get((task_state, event_cls, None), ()))
+        self.event_handlers = {**general, **specific}
 
     def init(self) -> None:
         """Called when the task is first loaded into the chamber."""
@@ -303,30 +383,76 @@ class Task:
         pass
 
     def main_loop(self, event: PybEvents.PybEvent) -> None:
-        if isinstance(event, PybEvents.StateEnterEvent):
-            self.state = self.States(event.value)
-        elif isinstance(event, PybEvents.StateExitEvent):
-            if self.state in self.state_timeouts:
-                for tm in self.state_timeouts[self.state].values():
-                    if tm[1]:
-                        self.cancel_timeout(tm[0].name)
-        elif isinstance(event, PybEvents.TimeoutEvent):
-            del self.timeouts[event.name]
+        event_type = type(event)
+        if event_type not in self.event_plans:
+            self.plan_event(event_type)
+        hook = self.event_plans[event_type]
+        if hook is not None:
+            hook(self, event)
         all_handled = self.all_states(event)
-        if not all_handled and self.state.name in self.state_methods:
-            self.state_methods[self.state.name](event)
+        if not all_handled and not self.route_event(event):
+            state_method = self.state_methods.get(self.state.name)
+            if state_method is not None:
+                state_method(event)
         if self.is_complete_():
             self.task_complete()
 
+    def route_event(self, event: PybEvents.PybEvent) -> bool:
+        """Calls any handlers registered with on for the event returning True if there were any."""
+        event_type = type(event)
+        if event_type not in self.handled_events:
+            return False
+        get_component = self.handled_events[event_type]
+        handlers = None
+        if get_component is not None:
+            handlers = self.event_handlers.get((self.state, event_type, get_component(event)))
+        if handlers is None:
+            handlers = self.event_handlers.get((self.state, event_type, None))
+            if handlers is None:
+                return False
+        for handler in handlers:
+            handler(event)
+        return True
+
+    @classmethod
+    def plan_event(cls, event_type: Type[PybEvents.PybEvent]) -> None:
+        # The bookkeeping needed for each event type is resolved once per Task class rather than for every event
+        if issubclass(event_type, PybEvents.StateEnterEvent):
+            cls.event_plans[event_type] = cls.enter_state_
+        elif issubclass(event_type, PybEvents.StateExitEvent):
+            cls.event_plans[event_type] = cls.exit_state_
+        elif issubclass(event_type, PybEvents.TimeoutEvent):
+            cls.event_plans[event_type] = cls.timeout_complete_
+        else:
+            cls.event_plans[event_type] = None
+
+    def enter_state_(self, event: PybEvents.StateEnterEvent) -> None:
+        if self.state_values is None:
+            type(self).state_values = {state.value: state for state in self.States}
+        self.state = self.state_values[event.value]
+
+    def exit_state_(self, event: PybEvents.StateExitEvent) -> None:
+        if self.state in self.state_timeouts:
+            for tm in self.state_timeouts[self.state].values():
+                if tm[1]:
+                    self.cancel_timeout(tm[0].name)
+
+    def timeout_complete_(self, event: PybEvents.TimeoutEvent) -> None:
+        del self.timeouts[event.name]
+
     def all_states(self, event: PybEvents.PybEvent) -> bool:
         pass
 
     def time_elapsed(self) -> float:
         """Returns the time that has passed in seconds (and fractions of a second) since the task began."""
+        return self.task_time(time.perf_counter())
+
+    def task_time(self, t: float) -> float:
+        """Converts a time.perf_counter value to the time in seconds since the task began excluding time spent paused."""
         if self.start_time == 0:
             return 0
         else:
-            return time.perf_counter() - self.start_time - self.time_paused
+            return t - self.start_time - self.time_paused
 
     def time_in_state(self) -> float:
         """Returns the time that has passed in seconds (and fractions of a second) since the current state began."""
@@ -431,10 +557,12 @@ class Task:
         self.tp.tp_q.append(event)
 
     def log_timeout(self, event: PybEvents.TimeoutEvent):
-        self.tp.tmq_out.send_bytes(self.tp.encoder.encode(event))
+        self.tp.queue_timeout(event)
 
     def write_component(self, cid: str, value: Any, metadata: Dict = None):
         metadata = metadata or {}
+        if self.tp.active_trace is not None:
+            metadata = dict(metadata, trace=self.tp.active_trace)
         e = PybEvents.ComponentUpdateEvent(self.metadata["chamber"], cid, value, metadata=metadata)
         self.tp.log_gui_event(e)
         if self.components[cid][2] is not None:
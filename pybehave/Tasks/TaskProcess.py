@@ -4,56 +4,110 @@ import importlib
 import multiprocessing
 import os
 import re
+import socket
+import sys
+import time
 import traceback
-from multiprocessing import Process, Pipe
+from multiprocessing import Process
 from multiprocessing.connection import Connection
-from typing import Dict
+from typing import Dict, List, Optional, Type
 
 import msgspec.msgpack
+import msgspec.structs
 import psutil
 
 from pybehave.Events import PybEvents
 from pybehave.Events.FileEventLogger import FileEventLogger
 from pybehave.Tasks.TaskSequence import TaskSequence
 from pybehave.Tasks.TimeoutManager import TimeoutManager
+from pybehave.Utilities.LatencyTracer import LatencyTracer
+from pybehave.Utilities.component_name import component_name
+from pybehave.Utilities.SharedArrayRing import SharedArrayRing
+
+
+# Events the Workstation relies on to manage each chamber's GUI that are sent regardless of subscriptions
+GUI_CORE_EVENTS = {"AddTaskEvent", "InitEvent", "StartEvent", "StopEvent", "PauseEvent", "ResumeEvent", "ClearEvent",
+                   "OutputFileChangedEvent", "TaskCompleteEvent", "StateEnterEvent"}
+# Control events a headless Workstation is sent back once they have been handled so it can report the chamber's status
+ACKNOWLEDGED_EVENTS = (PybEvents.InitEvent, PybEvents.StartEvent, PybEvents.StopEvent, PybEvents.PauseEvent,
+                       PybEvents.ResumeEvent, PybEvents.ClearEvent)
+# HeartbeatEvents carry no information so a single instance is passed to every task and the GUI
+HEARTBEAT = PybEvents.HeartbeatEvent()
 
 
 class TaskProcess(Process):
 
-    def __init__(self, mainq: Connection, guiq: Connection, sourceq: Dict[str, Connection]):
+    def __init__(self, mainq: Connection, guiq: Connection, sourceq: Dict[str, Connection], index: int = 0,
+                 heartbeat_interval: float = 0.1, trace_folder: str = ""):
         super().__init__()
+        self.index = index
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeats = {}
+        self.gui_heartbeat = None
         self.mainq = mainq
         self.guiq = guiq
         self.sourceq = sourceq
         self.tasks = {}
         self.task_event_loggers = {}
+        self.logger_formats = {}
         self.tm = None
         self.tmq_in = None
         self.tmq_out = None
+        self.timeout_q = None
+        self.timeout_signalled = False
         self.encoder = None
+        self.shared_encoder = None
+        self.ring = None
         self.decoder = None
+        self.source_decoder = None
         self.gui_out = []
+        self.gui_filters = {}
+        self.update_intervals = {}
+        self.latest_updates = {}
+        self.update_deadlines = {}
         self.tp_q = None
         self.logger_q = None
         self.event_responses = {}
+        self.event_plans = {}
         self.source_buffers = {}
         self.connections = []
         self.should_exit = False
+        self.trace_folder = trace_folder
+        self.tracer = None
+        self.active_trace = None
 
     def run(self):
         p = psutil.Process(os.getpid())
-        p.nice(psutil.REALTIME_PRIORITY_CLASS)
+        if sys.platform == "win32":
+            p.nice(psutil.REALTIME_PRIORITY_CLASS)
+        else:
+            try:
+                p.nice(-10)
+            except psutil.AccessDenied:  # Raising the priority requires elevated permissions outside Windows
+                pass
         self.tm = TimeoutManager()
         self.tm.start()
         self.tp_q = collections.deque()
         self.logger_q = collections.deque()
-        self.tmq_in, self.tmq_out = Pipe(False)
+        self.raw_logger_q = collections.deque()
+        self.timeout_q = collections.deque()
+        # Fired timeouts are queued by reference and the socket only serves to wake the wait call below
+        self.tmq_in, self.tmq_out = socket.socketpair()
+        self.tmq_in.setblocking(False)
         self.connections = [self.mainq, self.tmq_in, *self.sourceq.values()]
         self.encoder = msgspec.msgpack.Encoder(enc_hook=PybEvents.enc_hook)
+        # Messages to the GUI and Sources each have a single reader so large arrays can be passed through shared memory
+        self.ring = SharedArrayRing()
+        self.shared_encoder = msgspec.msgpack.Encoder(enc_hook=PybEvents.shared_enc_hook(self.ring))
         self.decoder = msgspec.msgpack.Decoder(type=PybEvents.subclass_union(PybEvents.PybEvent), dec_hook=PybEvents.dec_hook)
+        # Sources send frames that may contain several events
+        self.source_decoder = msgspec.msgpack.Decoder(type=List[PybEvents.subclass_union(PybEvents.PybEvent)],
+                                                      dec_hook=PybEvents.dec_hook, ext_hook=PybEvents.ext_hook)
 
         for source in self.sourceq:
             self.source_buffers[source] = []
+        if len(self.trace_folder) > 0:
+            self.tracer = LatencyTracer(self.trace_folder)
 
         self.event_responses = {PybEvents.AddTaskEvent: self.add_task,
                                 PybEvents.AddLoggerEvent: self.add_logger,
@@ -73,62 +127,174 @@ class TaskProcess(Process):
                                 PybEvents.ErrorEvent: self.error,
                                 PybEvents.ConstantsUpdateEvent: self.update_constants,
                                 PybEvents.ConstantRemoveEvent: self.remove_constant,
+                                PybEvents.GUISubscriptionEvent: self.update_subscription,
                                 PybEvents.ExitEvent: self.prepare_exit}
 
         while True:
             try:
-                ready = multiprocessing.connection.wait(self.connections, timeout=0.1)
-                if len(ready) == 0:
-                    event = PybEvents.HeartbeatEvent()
-                    for key in self.tasks.keys():
-                        if self.tasks[key].started and not self.tasks[key].paused:
-                            self.tasks[key].main_loop(event)
-                    for source in self.source_buffers:
-                        if len(self.source_buffers[source]) > 0:
-                            self.sourceq[source].send_bytes(self.encoder.encode(self.source_buffers[source]))
-                            self.source_buffers[source] = []
-                    self.log_gui_event(event)
-                else:
-                    for r in ready:
+                ready = multiprocessing.connection.wait(self.connections, timeout=self.time_to_heartbeat())
+                for r in ready:
+                    if r is self.tmq_in:
+                        self.clear_timeout_signal()
+                        while len(self.timeout_q) > 0:
+                            self.process_batched_event(self.timeout_q.popleft())
+                    elif r is self.mainq:
                         event = self.decoder.decode(r.recv_bytes())
-                        # t = time.perf_counter()
-                        self.handle_event(event)
-                        # print(time.perf_counter() - t)
-                        while len(self.tp_q) > 0:
-                            self.handle_event(self.tp_q.popleft())
-                        for source in self.source_buffers:
-                            if len(self.source_buffers[source]) > 0:
-                                self.sourceq[source].send_bytes(self.encoder.encode(self.source_buffers[source]))
-                                self.source_buffers[source] = []
-                        if isinstance(event, PybEvents.TaskEvent) and len(self.logger_q) > 0:
-                            for logger in self.task_event_loggers[event.chamber].values():
-                                logger.log_events(self.logger_q)
-                            self.logger_q.clear()
+                        self.process_event(event)
+                    else:
+                        events = self.source_decoder.decode(r.recv_bytes())
+                        if self.tracer is not None:
+                            events = self.trace_events(events)
+                        for event in events:
+                            self.process_batched_event(event)
+                event = HEARTBEAT
+                self.heartbeat(event)
+                self.flush_gui_updates()
             except BaseException as e:
-                metadata = {"chamber": event.chamber} if isinstance(event, PybEvents.TaskEvent) else {}
-                self.log_gui_event(PybEvents.ErrorEvent(type(e).__name__, traceback.format_exc(),
-                                   metadata=metadata))
+                self.report_error(e, event)
             if len(self.gui_out) > 0:
-                self.guiq.send_bytes(self.encoder.encode(self.gui_out))
+                self.guiq.send_bytes(self.shared_encoder.encode(self.gui_out))
                 self.gui_out.clear()
 
             if self.should_exit:
                 self.exit()
                 break
 
+    def process_event(self, event: PybEvents.PybEvent):
+        # t = time.perf_counter()
+        self.handle_event(event)
+        # print(time.perf_counter() - t)
+        self.flush(event.chamber if isinstance(event, PybEvents.TaskEvent) else None)
+
+    def process_batched_event(self, event: PybEvents.PybEvent):
+        # Events that arrive together are handled separately so an error in one does not drop the rest
+        try:
+            self.process_event(event)
+        except Exception as e:
+            self.report_error(e, event)
+
+    def report_error(self, e: BaseException, event: PybEvents.PybEvent):
+        metadata = {"chamber": event.chamber} if isinstance(event, PybEvents.TaskEvent) else {}
+        error = PybEvents.ErrorEvent(type(e).__name__, traceback.format_exc(), metadata=metadata)
+        if self.guiq is None:
+            self.mainq.send_bytes(self.encoder.encode(error))
+        else:
+            self.log_gui_event(error)
+
+    def flush(self, chamber: int = None):
+        while len(self.tp_q) > 0:
+            self.handle_event(self.tp_q.popleft())
+        for source in self.source_buffers:
+            if len(self.source_buffers[source]) > 0:
+                if self.tracer is not None:
+                    self.stamp_flush(self.source_buffers[source])
+                self.sourceq[source].send_bytes(self.shared_encoder.encode(self.source_buffers[source]))
+                self.source_buffers[source] = []
+        if chamber is not None and (len(self.logger_q) > 0 or len(self.raw_logger_q) > 0):
+            self.log_events(chamber)
+
+    def trace_events(self, events: List[PybEvents.PybEvent]) -> List[PybEvents.PybEvent]:
+        """Stamps traced updates with the decode time and records returned traces, removing them from events."""
+        now = time.perf_counter()
+        untraced = []
+        for event in events:
+            if isinstance(event, PybEvents.TraceEvent):
+                self.tracer.record(event.chamber, event.trace)
+                continue
+            if isinstance(event, PybEvents.ComponentUpdateEvent) and "trace" in event.metadata:
+                event.metadata["trace"].append(now)
+            untraced.append(event)
+        return untraced
+
+    @staticmethod
+    def stamp_flush(events: List[PybEvents.PybEvent]) -> None:
+        now = time.perf_counter()
+        for event in events:
+            # Outputs written in response to the same update share its trace so each gets its own copy
+            if isinstance(event, PybEvents.ComponentUpdateEvent) and "trace" in event.metadata:
+                event.metadata["trace"] = event.metadata["trace"] + [now]
+
+    def time_to_heartbeat(self) -> Optional[float]:
+        """Returns the time in seconds until the next heartbeat is due or None if no heartbeats are scheduled."""
+        deadlines = list(self.heartbeats.values())
+        if self.gui_heartbeat is not None:
+            deadlines.append(self.gui_heartbeat)
+        deadlines.extend(self.update_deadlines[cid] for cid in self.latest_updates)
+        if len(deadlines) == 0:
+            return None
+        return max(min(deadlines) - time.perf_counter(), 0)
+
+    def heartbeat(self, event: PybEvents.HeartbeatEvent):
+        """Passes the HeartbeatEvent to every running task whose heartbeat deadline has passed."""
+        now = time.perf_counter()
+        for chamber, deadline in list(self.heartbeats.items()):
+            if deadline <= now:
+                task = self.tasks[chamber]
+                if task.heartbeat_interval is None or not task.started or task.paused:
+                    del self.heartbeats[chamber]
+                    continue
+                # Missed beats are dropped rather than delivered in a burst
+                next_deadline = deadline + task.heartbeat_interval
+                self.heartbeats[chamber] = next_deadline if next_deadline > now else now + task.heartbeat_interval
+                task.main_loop(event)
+                self.flush(chamber)
+        if self.gui_heartbeat is not None and self.gui_heartbeat <= now:
+            if any(task.started and not task.paused for task in self.tasks.values()):
+                self.gui_heartbeat = now + self.heartbeat_interval
+                self.log_gui_event(event)
+            else:
+                self.gui_heartbeat = None
+
+    def schedule_heartbeat(self, chamber: int):
+        now = time.perf_counter()
+        if self.tasks[chamber].heartbeat_interval is not None:
+            self.heartbeats[chamber] = now + self.tasks[chamber].heartbeat_interval
+        if self.gui_heartbeat is None and self.guiq is not None:
+            self.gui_heartbeat = now + self.heartbeat_interval
+
+    def queue_timeout(self, event: PybEvents.TimeoutEvent):
+        """Called from the TimeoutManager thread to pass a fired timeout to the main loop without serialization."""
+        self.timeout_q.append(event)
+        if not self.timeout_signalled:
+            self.timeout_signalled = True
+            self.tmq_out.send(b"\x00")
+
+    def clear_timeout_signal(self):
+        try:
+            self.tmq_in.recv(4096)
+        except BlockingIOError:
+            pass
+        self.timeout_signalled = False
+
     def handle_event(self, event):
         event_type = type(event)
-        self.log_gui_event(event)
-        if event_type in self.event_responses:
-            self.event_responses[type(event)](event)
-        elif isinstance(event, PybEvents.StatefulEvent):
+        if event_type not in self.event_plans:
+            self.plan_event(event_type)
+        response, stateful, loggable, gui, acknowledge = self.event_plans[event_type]
+        if gui:
+            self.log_gui_event(event)
+        if response is not None:
+            response(event)
+        elif stateful:
             task = self.tasks[event.chamber]
             if task.started and not task.paused:
                 self.tasks[task.metadata["chamber"]].main_loop(event)
-        if isinstance(event, PybEvents.Loggable):
+        if loggable:
             task = self.tasks[event.chamber]
             if task.started and not task.paused:
                 self.log_event(event)
+        if acknowledge:
+            self.mainq.send_bytes(self.encoder.encode(event))
+
+    def plan_event(self, event_type: Type[PybEvents.PybEvent]):
+        # How each event type is handled only depends on its class so it is resolved once rather than for every event.
+        # ErrorEvents are passed to the GUI by error so those from Sources are only reported by one TaskProcess.
+        # GUISubscriptionEvents come from the Workstation so they are not echoed back to it.
+        self.event_plans[event_type] = (self.event_responses.get(event_type),
+                                        issubclass(event_type, PybEvents.StatefulEvent),
+                                        issubclass(event_type, PybEvents.Loggable),
+                                        not issubclass(event_type, (PybEvents.ErrorEvent, PybEvents.GUISubscriptionEvent)),
+                                        self.guiq is None and issubclass(event_type, ACKNOWLEDGED_EVENTS))
 
     def add_task(self, event: PybEvents.AddTaskEvent):
         try:
@@ -150,11 +316,13 @@ class TaskProcess(Process):
                 self.task_event_loggers[event.chamber][param_vals[0]] = logger_type(*param_vals)  # Instantiate the logger
             for logger in self.task_event_loggers[event.chamber].values():
                 logger.set_task(self.tasks[event.chamber])
+            self.update_logger_formats(event.chamber)
             self.tp_q.append(PybEvents.InitEvent(event.chamber))
         except BaseException as e:
             tb = traceback.format_exc()
             print(tb)
-            self.mainq.send_bytes(self.encoder.encode(PybEvents.ErrorEvent(type(e).__name__, tb)))
+            self.mainq.send_bytes(self.encoder.encode(PybEvents.ErrorEvent(type(e).__name__, tb,
+                                                                           metadata={"chamber": event.chamber})))
 
     def add_logger(self, event: PybEvents.AddLoggerEvent):
         segs = event.logger_code.split('((')
@@ -162,10 +330,24 @@ class TaskProcess(Process):
         param_vals = re.findall("\|\|(.+?)\|\|", segs[1].split('))')[0])
         self.task_event_loggers[event.chamber][param_vals[0]] = logger_type(*param_vals)
         self.task_event_loggers[event.chamber][param_vals[0]].set_task(self.tasks[event.chamber])
+        self.update_logger_formats(event.chamber)
 
     def remove_logger(self, event: PybEvents.RemoveLoggerEvent):
         self.task_event_loggers[event.chamber][event.logger_name].close_()
         del self.task_event_loggers[event.chamber][event.logger_name]
+        self.update_logger_formats(event.chamber)
+
+    def update_logger_formats(self, chamber: int):
+        """Records whether any logger for the chamber needs formatted LoggerEvents and whether any takes raw events."""
+        loggers = self.task_event_loggers[chamber].values()
+        self.logger_formats[chamber] = (any(not logger.raw_events for logger in loggers),
+                                        any(logger.raw_events for logger in loggers))
+
+    def log_events(self, chamber: int):
+        for logger in self.task_event_loggers[chamber].values():
+            logger.log_events(self.raw_logger_q if logger.raw_events else self.logger_q)
+        self.logger_q.clear()
+        self.raw_logger_q.clear()
 
     def output_file_changed(self, event: PybEvents.OutputFileChangedEvent):
         self.tasks[event.chamber].metadata["subject"] = event.subject
@@ -190,6 +372,7 @@ class TaskProcess(Process):
         self.tasks[task.metadata["chamber"]].main_loop(new_event)
         self.log_event(new_event)
         self.log_gui_event(new_event)
+        self.schedule_heartbeat(task.metadata["chamber"])
 
     def task_complete(self, event: PybEvents.TaskCompleteEvent):
         if "sequence_complete" in event.metadata:
@@ -201,7 +384,9 @@ class TaskProcess(Process):
         else:
             task = self.tasks[event.chamber]
             e = PybEvents.StopEvent(event.chamber)
-            self.mainq.send_bytes(self.encoder.encode(e))
+            # A headless Workstation is notified when the StopEvent is acknowledged instead
+            if self.guiq is not None:
+                self.mainq.send_bytes(self.encoder.encode(e))
             self.tp_q.append(e)
             task.complete = True
 
@@ -210,16 +395,18 @@ class TaskProcess(Process):
         new_event = PybEvents.StateExitEvent(event.chamber, task.state.name, task.state.value, metadata=event.metadata)
         self.tasks[task.metadata["chamber"]].main_loop(event)
         self.log_event(new_event)
-        for logger in self.task_event_loggers[event.chamber].values():
-            logger.log_events(self.logger_q)
+        self.log_events(event.chamber)
         task.stop__()
+        self.heartbeats.pop(event.chamber, None)
         for logger in self.task_event_loggers[event.chamber].values():
             logger.stop()
-        self.logger_q.clear()
+        if self.tracer is not None:
+            self.tracer.export(event.chamber)
 
     def pause_task(self, event: PybEvents.PauseEvent):
         task = self.tasks[event.chamber]
         task.pause__()
+        self.heartbeats.pop(event.chamber, None)
         self.tasks[task.metadata["chamber"]].main_loop(event)
         self.log_event(event)
 
@@ -227,6 +414,7 @@ class TaskProcess(Process):
         task = self.tasks[event.chamber]
         task.resume__()
         self.tasks[task.metadata["chamber"]].main_loop(event)
+        self.schedule_heartbeat(event.chamber)
 
     def init_task(self, event: PybEvents.InitEvent):
         self.tasks[event.chamber].init()
@@ -234,13 +422,20 @@ class TaskProcess(Process):
     def clear_task(self, event: PybEvents.ClearEvent):
         task = self.tasks[event.chamber]
         task.clear()
+        self.heartbeats.pop(event.chamber, None)
         del_loggers = event.del_loggers
         if del_loggers:
             for logger in self.task_event_loggers[task.metadata["chamber"]].values():
                 logger.close_()
             del self.task_event_loggers[task.metadata["chamber"]]
+            del self.logger_formats[task.metadata["chamber"]]
         for comp in self.tasks[task.metadata["chamber"]].components.values():
             comp[0].close()
+            self.latest_updates.pop(comp[0].id, None)
+            self.update_deadlines.pop(comp[0].id, None)
+        # The Workstation resubscribes when the chamber's GUI is recreated
+        self.gui_filters.pop(task.metadata["chamber"], None)
+        self.update_intervals.pop(task.metadata["chamber"], None)
         del self.tasks[task.metadata["chamber"]]
 
     def update_component(self, event: PybEvents.ComponentUpdateEvent):
@@ -249,10 +444,24 @@ class TaskProcess(Process):
         if comp.update(event.value) and task.started and not task.paused:
             # event.value = comp.state
             metadata = event.metadata.copy()
+            # Traces are not logged with the ComponentChangedEvent
+            trace = metadata.pop("trace", None) if self.tracer is not None else None
             metadata["value"] = comp.state
+            if event.acquisition_time is not None:
+                # Handling time is logged as the event time so queueing latency can be recovered from the difference
+                metadata["acquisition_time"] = task.task_time(event.acquisition_time)
             new_event = PybEvents.ComponentChangedEvent(task.metadata["chamber"], comp, task.components[comp.id][1],
                                                         metadata=metadata)
-            self.tasks[task.metadata["chamber"]].main_loop(new_event)
+            if trace is None:
+                self.tasks[task.metadata["chamber"]].main_loop(new_event)
+            else:
+                # Outputs written by the Task while handling the update continue its trace
+                self.active_trace = trace
+                trace.append(time.perf_counter())
+                self.tasks[task.metadata["chamber"]].main_loop(new_event)
+                trace.append(time.perf_counter())
+                self.active_trace = None
+                self.tracer.record(event.chamber, trace)
             self.log_event(new_event)
 
     def update_constants(self, event: PybEvents.ConstantsUpdateEvent):
@@ -276,12 +485,68 @@ class TaskProcess(Process):
     def log_gui_event(self, event: PybEvents.PybEvent):
         if isinstance(event, PybEvents.TimedEvent) and event.timestamp is None:
             event.acknowledge(self.tasks[event.chamber].time_elapsed())
+        # Headless TaskProcesses have no GUI to update
+        if self.guiq is None:
+            return
+        if self.tracer is not None and isinstance(event, PybEvents.ComponentUpdateEvent) and "trace" in event.metadata:
+            # Traces are only used by the Sources and the LatencyTracer so the GUI is sent a copy without one
+            event = msgspec.structs.replace(event, metadata={key: value for key, value in event.metadata.items()
+                                                             if key != "trace"})
+        if isinstance(event, PybEvents.TaskEvent) and event.chamber in self.gui_filters:
+            if not self.is_subscribed(event):
+                return
+            if isinstance(event, PybEvents.ComponentUpdateEvent):
+                interval = self.update_intervals[event.chamber].get(component_name(event.comp_id))
+                if interval is not None:
+                    self.rate_limit_update(event, interval)
+                    return
         self.gui_out.append(event)
 
+    def update_subscription(self, event: PybEvents.GUISubscriptionEvent):
+        if event.event_types is None and len(event.update_intervals) == 0:
+            self.gui_filters.pop(event.chamber, None)
+            self.update_intervals.pop(event.chamber, None)
+        else:
+            types = None if event.event_types is None else GUI_CORE_EVENTS.union(event.event_types)
+            # Whether each event type is subscribed is resolved once from its class hierarchy
+            self.gui_filters[event.chamber] = (types, {})
+            self.update_intervals[event.chamber] = event.update_intervals
+
+    def is_subscribed(self, event: PybEvents.TaskEvent) -> bool:
+        types, cache = self.gui_filters[event.chamber]
+        if types is None:
+            return True
+        event_type = type(event)
+        if event_type not in cache:
+            cache[event_type] = any(cls.__name__ in types for cls in event_type.__mro__)
+        return cache[event_type]
+
+    def rate_limit_update(self, event: PybEvents.ComponentUpdateEvent, interval: float):
+        """Sends the update if the component has not been sent within interval, otherwise keeps it as the latest value to send later."""
+        now = time.perf_counter()
+        if event.comp_id not in self.update_deadlines or self.update_deadlines[event.comp_id] <= now:
+            if event.comp_id not in self.latest_updates:
+                self.gui_out.append(event)
+                self.update_deadlines[event.comp_id] = now + interval
+                return
+        self.latest_updates[event.comp_id] = event
+
+    def flush_gui_updates(self):
+        now = time.perf_counter()
+        for cid in [cid for cid in self.latest_updates if self.update_deadlines[cid] <= now]:
+            event = self.latest_updates.pop(cid)
+            self.gui_out.append(event)
+            self.update_deadlines[cid] = now + self.update_intervals.get(event.chamber, {}).get(component_name(cid), 0)
+
     def log_event(self, event: PybEvents.Loggable):
         if isinstance(event, PybEvents.TimedEvent) and event.timestamp is None:
             event.acknowledge(self.tasks[event.chamber].time_elapsed())
-        self.logger_q.append(event.format())
+        formatted, raw = self.logger_formats.get(event.chamber, (True, False))
+        # LoggerEvents are only allocated if a logger for the chamber consumes them
+        if formatted:
+            self.logger_q.append(event.format())
+        if raw:
+            self.raw_logger_q.append(event)
 
     def source_unavailable(self, event: PybEvents.UnavailableSourceEvent):
         self.mainq.send_bytes(self.encoder.encode(event))
@@ -298,9 +563,15 @@ class TaskProcess(Process):
         self.connections = [self.mainq, self.tmq_in, *self.sourceq.values()]
 
     def error(self, event: PybEvents.ErrorEvent):
-        if "sid" in event.metadata and event.metadata["sid"] in self.sourceq:
-            del self.sourceq[event.metadata["sid"]]
-            del self.source_buffers[event.metadata["sid"]]
+        if "sid" in event.metadata:
+            if event.metadata["sid"] in self.sourceq:
+                del self.sourceq[event.metadata["sid"]]
+                del self.source_buffers[event.metadata["sid"]]
+                self.connections = [self.mainq, self.tmq_in, *self.sourceq.values()]
+            if self.index > 0:
+                # Source errors reach every TaskProcess but only the first reports them
+                return
+        self.log_gui_event(event)
         self.mainq.send_bytes(self.encoder.encode(event))
 
     def prepare_exit(self, event: PybEvents.ExitEvent):
@@ -311,3 +582,6 @@ class TaskProcess(Process):
             q.send_bytes(self.encoder.encode([PybEvents.CloseSourceEvent()]))
         self.tm.quit()
         self.tm.join()
+        self.tmq_in.close()
+        self.tmq_out.close()
+        self.ring.close()
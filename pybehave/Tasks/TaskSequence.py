@@ -59,8 +59,10 @@ class TaskSequence(Task):
         if "sequence" in event.metadata:
             super(TaskSequence, self).main_loop(event)
         else:
-            if not self.all_states(event):
-                self.state_methods[self.state.name](event)
+            if not self.all_states(event) and not self.route_event(event):
+                state_method = self.state_methods.get(self.state.name)
+                if state_method is not None:
+                    state_method(event)
             if not isinstance(event, PybEvents.TaskCompleteEvent) and self.cur_task is not None:
                 self.cur_task.main_loop(event)
             if self.is_complete_():
@@ -1,6 +1,7 @@
+import heapq
+import itertools
 import queue
 import time
-from collections import OrderedDict
 from queue import Queue
 from threading import Thread
 
@@ -10,6 +11,7 @@ class Timeout:
     def __init__(self, name: str, chamber: int, duration: float, target, args):
         self.name = name
         self.chamber = str(chamber)
+        self.key = self.chamber + "/" + self.name
         self.duration = duration
         self.duration_ = self.duration
         self.target = target
@@ -46,56 +48,85 @@ class Timeout:
         else:
             return self.duration_ - self.elapsed_time
 
+    def deadline(self):
+        return self.start_time + self.duration_
+
     def execute(self):
         self.target(*self.args)
 
 
 class TimeoutManager(Thread):
+    """
+    Thread that executes Timeout targets once their durations have elapsed.
+
+    Running timeouts are scheduled on a min-heap ordered by deadline so each wakeup only inspects the soonest entry.
+    Cancelling, pausing, extending or resetting a timeout does not search the heap; instead the stale entry is left in
+    place and skipped when it reaches the top (lazy deletion).
+    """
 
     def __init__(self):
         super(TimeoutManager, self).__init__()
-        self.timeouts = OrderedDict()
+        self.timeouts = {}
         self.timeout_queue = Queue()
+        self.heap = []
+        self.scheduled = {}
+        self.counter = itertools.count()
 
     def run(self):
         while True:
-            wait = None
-            for timeout in self.timeouts.values():
-                if wait is None:
-                    wait = timeout.time_remaining()
-                else:
-                    wait = min(wait, timeout.time_remaining())
+            if len(self.heap) > 0:
+                wait = max(self.heap[0][0] - time.perf_counter(), 0)
+            else:
+                wait = None
 
             try:
-
                 event = self.timeout_queue.get(timeout=wait)
 
                 if isinstance(event, Timeout):
-                    self.timeouts[event.chamber + "/" + event.name] = event
+                    self.timeouts[event.key] = event
                     event.start()
+                    self.schedule(event)
 
                 if isinstance(event, tuple):
                     if event[0] == "Reset":
-                        self.timeouts[event[1].chamber + "/" + event[1].name] = event[1]
-                        self.timeouts[event[1].chamber + "/" + event[1].name].start()
+                        self.timeouts[event[1].key] = event[1]
+                        event[1].reset(event[1].duration)
+                        self.schedule(event[1])
                     elif event[0] == "Quit":
                         return
                     elif event[1] in self.timeouts:
                         if event[0] == "Cancel":
                             del self.timeouts[event[1]]
+                            self.scheduled.pop(event[1], None)
                         elif event[0] == "Pause":
                             self.timeouts[event[1]].pause()
+                            self.scheduled.pop(event[1], None)
                         elif event[0] == "Resume":
                             self.timeouts[event[1]].resume()
+                            self.schedule(self.timeouts[event[1]])
                         elif event[0] == "Extend":
                             self.timeouts[event[1]].extend(event[2])
+                            if event[1] in self.scheduled:
+                                self.schedule(self.timeouts[event[1]])
             except queue.Empty:
                 pass
 
-            for name in list(self.timeouts.keys()):
-                if self.timeouts[name].time_remaining() <= 0:
-                    self.timeouts[name].execute()
-                    del self.timeouts[name]
+            now = time.perf_counter()
+            while len(self.heap) > 0 and self.heap[0][0] <= now:
+                _, seq, key = heapq.heappop(self.heap)
+                if self.scheduled.get(key) == seq:  # Skip entries invalidated by a later command
+                    del self.scheduled[key]
+                    self.timeouts.pop(key).execute()
+
+            # Rebuild the heap if stale entries have come to dominate it
+            if len(self.heap) > 2 * len(self.scheduled) + 64:
+                self.heap = [entry for entry in self.heap if self.scheduled.get(entry[2]) == entry[1]]
+                heapq.heapify(self.heap)
+
+    def schedule(self, timeout: Timeout):
+        seq = next(self.counter)
+        self.scheduled[timeout.key] = seq
+        heapq.heappush(self.heap, (timeout.deadline(), seq, timeout.key))
 
     def add_timeout(self, timeout: Timeout):
         self.timeout_queue.put(timeout)
@@ -0,0 +1,78 @@
+import math
+import os
+import time
+from typing import Dict, List
+
+import numpy as np
+
+# Intervals between consecutive stamps in a trace: acquisition, Source send, TaskProcess decode, main_loop entry,
+# main_loop exit, Source buffer flush and write_component completion
+HOPS = ("send", "decode", "queue", "main_loop", "flush", "write")
+# Histogram bins are logarithmic from 1 us to 10 s
+BINS_PER_DECADE = 20
+MIN_EXPONENT = -6
+N_BINS = 7 * BINS_PER_DECADE
+
+
+class LatencyTracer:
+    """
+    Aggregates latency traces from component updates into per-chamber histograms. Traces are recorded in two parts:
+    once the update has been handled by the Task (the hops up to main_loop exit and the input total) and, if the Task
+    wrote an output in response, once the output has been written by the Source (the remaining hops and the round trip
+    total).
+
+    Parameters
+    ----------
+    folder : str
+        Folder histograms are exported to
+
+    Methods
+    -------
+    record(chamber, trace)
+        Adds the hops in a trace to the chamber's histograms
+    percentile(chamber, name, q)
+        Returns an estimate of the qth percentile of a hop or total from its histogram
+    export(chamber)
+        Writes the chamber's histograms to a CSV file and clears them
+    """
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.histograms = {}
+
+    def add(self, histograms: Dict[str, np.ndarray], name: str, duration: float) -> None:
+        if name not in histograms:
+            histograms[name] = np.zeros(N_BINS, dtype=np.int64)
+        index = int((math.log10(duration) - MIN_EXPONENT) * BINS_PER_DECADE) if duration > 0 else 0
+        histograms[name][min(max(index, 0), N_BINS - 1)] += 1
+
+    def record(self, chamber: int, trace: List[float]) -> None:
+        histograms = self.histograms.setdefault(chamber, {})
+        # Input traces end at main_loop exit while output traces continue from there to write_component completion
+        first = 0 if len(trace) <= 5 else 4
+        for i in range(first, len(trace) - 1):
+            self.add(histograms, HOPS[i], trace[i + 1] - trace[i])
+        self.add(histograms, "input" if first == 0 else "round_trip", trace[-1] - trace[0])
+
+    @staticmethod
+    def bin_edges(index: int) -> tuple:
+        return (10 ** (MIN_EXPONENT + index / BINS_PER_DECADE), 10 ** (MIN_EXPONENT + (index + 1) / BINS_PER_DECADE))
+
+    def percentile(self, chamber: int, name: str, q: float) -> float:
+        counts = self.histograms[chamber][name]
+        index = int(np.searchsorted(np.cumsum(counts), q / 100 * counts.sum()))
+        return self.bin_edges(min(index, N_BINS - 1))[1]
+
+    def export(self, chamber: int) -> None:
+        histograms = self.histograms.pop(chamber, {})
+        if len(histograms) == 0:
+            return
+        if not os.path.exists(self.folder):
+            os.makedirs(self.folder)
+        path = "{}/latency_{}_{}.csv".format(self.folder, chamber + 1, math.floor(time.time() * 1000))
+        with open(path, "w") as f:
+            f.write("Hop,BinStart,BinEnd,Count\n")
+            for name, counts in histograms.items():
+                for index in np.flatnonzero(counts):
+                    start, end = self.bin_edges(index)
+                    f.write("{},{:.3e},{:.3e},{}\n".format(name, start, end, counts[index]))
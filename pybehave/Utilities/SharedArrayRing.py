@@ -0,0 +1,118 @@
+import collections
+import struct
+import threading
+import weakref
+from multiprocessing import shared_memory
+from typing import Optional
+
+import msgspec
+import numpy as np
+
+# Each slot begins with a header holding 1 while a reader may still be using the array and 0 once it is released
+SLOT_HEADER = 64
+
+
+class SharedArrayDescriptor(msgspec.Struct, gc=False, array_like=True):
+    name: str
+    offset: int
+    dtype: str
+    shape: tuple
+
+
+class SharedArrayRing:
+    """
+    Ring buffer in shared memory used to pass large NumPy arrays to another process without copying them through a pipe.
+    Arrays are written into the next free slot and only a descriptor of the slot is sent. The receiving process maps the
+    slot and either copies the array out or keeps a view until it is garbage collected. Arrays may be written from several
+    threads but every array written should be read by exactly one process. The segment is owned by the writer which
+    removes it on close.
+
+    Parameters
+    ----------
+    capacity : int
+        Size of the shared memory segment in bytes. The segment is only created once the first array is written.
+    threshold : int
+        Arrays smaller than this many bytes are not written to shared memory
+
+    Methods
+    -------
+    put(array)
+        Writes the array to the ring returning its descriptor or None if it should be serialized instead
+    close()
+        Releases and removes the shared memory segment
+    """
+
+    def __init__(self, capacity: int = 64 * 1024 * 1024, threshold: int = 64 * 1024):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.shm = None
+        self.outstanding = collections.deque()
+        self.lock = threading.Lock()
+
+    def put(self, array: np.ndarray) -> Optional[SharedArrayDescriptor]:
+        if array.nbytes < self.threshold or array.dtype.hasobject:
+            return None
+        size = SLOT_HEADER + -(-array.nbytes // SLOT_HEADER) * SLOT_HEADER
+        if size > self.capacity:
+            return None
+        with self.lock:
+            if self.shm is None:
+                self.shm = shared_memory.SharedMemory(create=True, size=self.capacity)
+            offset = self.allocate(size)
+            if offset is None:  # The ring is full of arrays that have yet to be released
+                return None
+            struct.pack_into("<q", self.shm.buf, offset, 1)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=self.shm.buf, offset=offset + SLOT_HEADER)[...] = array
+            self.outstanding.append((offset, size))
+            return SharedArrayDescriptor(self.shm.name, offset, array.dtype.str, array.shape)
+
+    def allocate(self, size: int) -> Optional[int]:
+        # Slots are reclaimed in the order they were written
+        while len(self.outstanding) > 0 and struct.unpack_from("<q", self.shm.buf, self.outstanding[0][0])[0] == 0:
+            self.outstanding.popleft()
+        if len(self.outstanding) == 0:
+            return 0
+        oldest = self.outstanding[0][0]
+        newest_end = self.outstanding[-1][0] + self.outstanding[-1][1]
+        if self.outstanding[-1][0] >= oldest:  # Free space is after the newest slot and before the oldest
+            if newest_end + size <= self.capacity:
+                return newest_end
+            elif size <= oldest:
+                return 0
+        elif newest_end + size <= oldest:  # Writes have wrapped so free space is between the newest and oldest slots
+            return newest_end
+        return None
+
+    def close(self) -> None:
+        with self.lock:
+            if self.shm is not None:
+                self.shm.close()
+                self.shm.unlink()
+                self.shm = None
+                self.outstanding.clear()
+
+
+segments = {}
+
+
+def release(shm: shared_memory.SharedMemory, offset: int) -> None:
+    struct.pack_into("<q", shm.buf, offset, 0)
+
+
+def open_shared_array(descriptor: SharedArrayDescriptor, copy: bool = True) -> np.ndarray:
+    """
+    Returns an array written to a SharedArrayRing. By default the array is copied out and its slot released immediately,
+    otherwise a read-only view is returned that releases the slot when collected.
+    """
+    if descriptor.name not in segments:
+        # pybehave processes share one resource tracker so the writer unlinking the segment also accounts for readers
+        segments[descriptor.name] = shared_memory.SharedMemory(name=descriptor.name)
+    shm = segments[descriptor.name]
+    array = np.ndarray(descriptor.shape, dtype=descriptor.dtype, buffer=shm.buf, offset=descriptor.offset + SLOT_HEADER)
+    if copy:
+        array = array.copy()
+        release(shm, descriptor.offset)
+        return array
+    array.flags.writeable = False
+    weakref.finalize(array, release, shm, descriptor.offset)
+    return array
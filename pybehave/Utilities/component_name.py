@@ -0,0 +1,3 @@
+def component_name(cid: str) -> str:
+    """Returns the name a Component was declared with in its Task from its ID formatted as name-chamber-index."""
+    return cid.rsplit("-", 2)[0]
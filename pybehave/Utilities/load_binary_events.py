@@ -0,0 +1,57 @@
+import os
+from typing import Dict, List, Tuple, Any
+
+import msgspec
+import numpy as np
+
+from pybehave.Events.BinaryEventLogger import EVENT_DTYPE
+
+
+class BinaryEventMetadata:
+    """Sequence view of the metadata for each event in a binary event log that decodes entries on access."""
+
+    def __init__(self, events: np.ndarray, data: np.ndarray):
+        self.events = events
+        self.data = data
+        self.decoder = msgspec.msgpack.Decoder()
+
+    def __len__(self) -> int:
+        return self.events.shape[0]
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        offset = int(self.events["metadata_offset"][index])
+        return self.decoder.decode(self.data[offset:offset + int(self.events["metadata_length"][index])])
+
+
+def load_binary_events(path: str) -> Tuple[Dict[str, Any], np.ndarray, List[str], BinaryEventMetadata]:
+    """
+    Loads the files written by a BinaryEventLogger. The event records are memory-mapped rather than read so columns
+    can be accessed without copying, e.g. events["time"][events["type"] == names.index("ComponentChangedEvent")].
+
+    Parameters
+    ----------
+    path : str
+        The path to any of the files from the session or their shared name without an extension
+
+    Returns
+    -------
+    Tuple[Dict[str, Any], np.ndarray, List[str], BinaryEventMetadata]
+        the session information, the event records, the names referenced by the type and state columns and the metadata
+        for each event
+    """
+    base = os.path.splitext(path)[0] if os.path.splitext(path)[1] in (".events", ".metadata", ".names", ".info") else path
+    with open(base + ".info", "rb") as f:
+        info = msgspec.msgpack.decode(f.read())
+    with open(base + ".names", encoding="utf-8") as f:
+        names = f.read().splitlines()
+    # Ignore any partially written record at the end of the file
+    n_events = os.path.getsize(base + ".events") // EVENT_DTYPE.itemsize
+    if n_events > 0:
+        events = np.memmap(base + ".events", dtype=EVENT_DTYPE, mode="r", shape=(n_events,))
+    else:
+        events = np.zeros(0, dtype=EVENT_DTYPE)
+    if os.path.getsize(base + ".metadata") > 0:
+        data = np.memmap(base + ".metadata", dtype=np.uint8, mode="r")
+    else:
+        data = np.zeros(0, dtype=np.uint8)
+    return info, events, names, BinaryEventMetadata(events, data)
@@ -0,0 +1,19 @@
+from typing import List
+
+import pygame
+
+
+def merge_rects(rects: List[pygame.Rect]) -> List[pygame.Rect]:
+    merged = []
+    for rect in rects:
+        rect = rect.copy()
+        i = 0
+        while i < len(merged):
+            if rect.colliderect(merged[i]):
+                # The union may now overlap rects that were already checked so start over
+                rect.union_ip(merged.pop(i))
+                i = 0
+            else:
+                i += 1
+        merged.append(rect)
+    return merged
@@ -227,14 +227,14 @@ class ChamberWidget(QGroupBox):
             self.play_button.icon = os.path.join(os.path.dirname(__file__), 'icons/pause.svg')
             self.play_button.hover_icon = os.path.join(os.path.dirname(__file__), 'icons/pause_hover.svg')
             self.play_button.setIcon(QIcon(self.play_button.icon))
-            self.workstation.mainq.send_bytes(self.workstation.encoder.encode(PybEvents.ResumeEvent(int(self.chamber_id.text()) - 1)))  # Resume the task
+            self.workstation.send_event(PybEvents.ResumeEvent(int(self.chamber_id.text()) - 1))  # Resume the task
         else:  # The task is currently playing
             self.paused = True
             # Change the play to a pause button
             self.play_button.icon = os.path.join(os.path.dirname(__file__), 'icons/play.svg')
             self.play_button.hover_icon = os.path.join(os.path.dirname(__file__), 'icons/play_hover.svg')
             self.play_button.setIcon(QIcon(self.play_button.icon))
-            self.workstation.mainq.send_bytes(self.workstation.encoder.encode(PybEvents.PauseEvent(int(self.chamber_id.text()) - 1)))  # Pause the task
+            self.workstation.send_event(PybEvents.PauseEvent(int(self.chamber_id.text()) - 1))  # Pause the task
 
     def play_helper(self) -> None:
         self.started = True
@@ -250,7 +250,7 @@ class ChamberWidget(QGroupBox):
         self.address_file_browse.setEnabled(False)
         self.protocol_file_browse.setEnabled(False)
         self.output_file_path.setEnabled(False)
-        self.workstation.mainq.send_bytes(self.workstation.encoder.encode(PybEvents.StartEvent(int(self.chamber_id.text()) - 1)))
+        self.workstation.send_event(PybEvents.StartEvent(int(self.chamber_id.text()) - 1))
         if self.pd is not None:
             super(QMessageBox, self.pd).accept()
             self.pd = None
@@ -262,7 +262,7 @@ class ChamberWidget(QGroupBox):
         self.started = False
         self.paused = False
         if from_click:
-            self.workstation.mainq.send_bytes(self.workstation.encoder.encode(PybEvents.StopEvent(int(self.chamber_id.text()) - 1)))
+            self.workstation.send_event(PybEvents.StopEvent(int(self.chamber_id.text()) - 1))
         # Change the pause to a play button
         self.play_button.icon = os.path.join(os.path.dirname(__file__), 'icons/play.svg')
         self.play_button.hover_icon = os.path.join(os.path.dirname(__file__), 'icons/play_hover.svg')
@@ -294,7 +294,7 @@ class ChamberWidget(QGroupBox):
         """
         File for handling changes to the desired output directory
         """
-        self.workstation.mainq.send_bytes(self.workstation.encoder.encode(PybEvents.OutputFileChangedEvent(int(self.chamber_id.text()) - 1, self.output_file_path.text(), self.subject.text())))
+        self.workstation.send_event(PybEvents.OutputFileChangedEvent(int(self.chamber_id.text()) - 1, self.output_file_path.text(), self.subject.text()))
 
     def contextMenuEvent(self, _):
         """
@@ -108,6 +108,7 @@ class ConfigurationDialog(QDialog):
         del self.cw.widgets[self.widget_list.currentRow()]
         del self.cw.widget_params[self.widget_list.currentRow()]
         self.widget_list.takeItem(self.widget_list.currentRow())
+        self.cw.workstation.update_subscriptions(int(self.cw.chamber_id.text()) - 1)
         self.remove_button.setDisabled(False)
 
     def remove_logger(self) -> None:
@@ -118,7 +119,7 @@ class ConfigurationDialog(QDialog):
         self.cw.event_loggers = '))'.join(txt)
         self.logger_list.takeItem(self.logger_list.currentRow())
         self.remove_button.setDisabled(False)
-        self.cw.workstation.mainq.send_bytes(self.cw.workstation.encoder.encode(RemoveLoggerEvent(int(self.cw.chamber_id.text()) - 1, param_vals[0])))
+        self.cw.workstation.send_event(RemoveLoggerEvent(int(self.cw.chamber_id.text()) - 1, param_vals[0]))
 
     def add_extra(self, logger=True) -> None:
         self.ld = AddExtrasDialog(self, logger)
@@ -162,11 +163,12 @@ class AddExtrasDialog(QDialog):
             new_widget.set_chamber(self.cd.cw)
             self.cd.cw.chamber.addWidget(new_widget)
             QListWidgetItem("{} ({})".format(new_widget.name, self.extra.currentText()), self.cd.widget_list)
+            self.cd.cw.workstation.update_subscriptions(int(self.cd.cw.chamber_id.text()) - 1)
         else:
             logger_text = self.extra.currentText() + "((" + ''.join(f"||{w}||" for w in self.params) + "))"
             self.cd.cw.event_loggers += logger_text
             QListWidgetItem("{} ({})".format(self.params[0], self.extra.currentText()), self.cd.logger_list)
-            self.cd.cw.workstation.mainq.send_bytes(self.cd.cw.workstation.encoder.encode(AddLoggerEvent(int(self.cd.cw.chamber_id.text()) - 1, logger_text)))
+            self.cd.cw.workstation.send_event(AddLoggerEvent(int(self.cd.cw.chamber_id.text()) - 1, logger_text))
             self.cd.cw.output_file_changed()
         super(AddExtrasDialog, self).accept()
 
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import socketserver
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pybehave.Workstation.Workstation import Workstation
+
+
+class ControlServer(socketserver.ThreadingTCPServer):
+    """
+    Line-based TCP server on localhost for controlling a headless Workstation. Each line received is passed to
+    Workstation.handle_command and the response is written back followed by a newline.
+
+    Parameters
+    ----------
+    port : int
+        The localhost port to listen on
+    workstation : Workstation
+        The Workstation that handles the commands
+    """
+    daemon_threads = True
+    block_on_close = False
+    allow_reuse_address = True
+
+    def __init__(self, port: int, workstation: Workstation):
+        self.workstation = workstation
+        super().__init__(("127.0.0.1", port), ControlHandler)
+
+
+class ControlHandler(socketserver.StreamRequestHandler):
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            command = line.decode("utf-8").strip()
+            if len(command) == 0:
+                continue
+            self.wfile.write((self.server.workstation.handle_command(command) + "\n").encode("utf-8"))
+            self.wfile.flush()
@@ -1,10 +1,9 @@
 from __future__ import annotations
 
-import multiprocessing
 import os
 from typing import TYPE_CHECKING
 
-from pybehave.Events.PybEvents import AddSourceEvent, RemoveSourceEvent
+from pybehave.Events.PybEvents import RemoveSourceEvent
 from pybehave.Utilities.find_closing_paren import find_closing_paren
 import pybehave.Sources
 
@@ -109,7 +108,7 @@ class SettingsDialog(QDialog):
     def refresh_source(self) -> None:
         st = self.source_list.currentItem().text()
         st_name = st.split(" (")[0]
-        self.workstation.mainq.send_bytes(self.workstation.encoder.encode(RemoveSourceEvent(st_name)))
+        self.workstation.send_event(RemoveSourceEvent(st_name))
         desktop = os.path.join(os.path.join(os.path.expanduser('~')), 'Desktop')
         settings = QSettings(desktop + "/py-behav/pybehave.ini", QSettings.IniFormat)
         source_string = settings.value("sources")
@@ -118,10 +117,7 @@ class SettingsDialog(QDialog):
         open_ind = source_string.index(search_str) + len(search_str)
         close_ind = find_closing_paren(source_string, open_ind) + 1
         self.workstation.sources[st_name] = s_type(**eval(source_string[open_ind:close_ind]))
-        tpq, sourceq = multiprocessing.Pipe()
-        self.workstation.sources[st_name].queue = sourceq
-        self.workstation.sources[st_name].start()
-        self.workstation.mainq.send_bytes(self.workstation.encoder.encode(AddSourceEvent(st_name, tpq)))
+        self.workstation.add_source(st_name)
 
     def remove_source(self) -> None:
         st = self.source_list.currentItem().text()
@@ -135,7 +131,7 @@ class SettingsDialog(QDialog):
         else:
             si -= 1
         se = source_string.find(")", si)
-        self.workstation.mainq.send_bytes(self.workstation.encoder.encode(RemoveSourceEvent(st_name)))
+        self.workstation.send_event(RemoveSourceEvent(st_name))
         del self.workstation.sources[st_name]
         self.source_list.takeItem(self.source_list.currentRow())
         self.remove_button.setDisabled(False)
@@ -235,10 +231,7 @@ class AddSourceDialog(QDialog):
                 source_string = source_string[:-1] + ', "{}": \'{}()\''.format(self.name.text(), self.source.currentText()) + "}"
         settings.setValue("sources", source_string)
         self.sd.workstation.sources[self.name.text()] = source_type(*self.params)
-        tpq, sourceq = multiprocessing.Pipe()
-        self.sd.workstation.sources[self.name.text()].queue = sourceq
-        self.sd.workstation.sources[self.name.text()].start()
-        self.sd.workstation.mainq.send_bytes(self.sd.workstation.encoder.encode(AddSourceEvent(self.name.text(), tpq)))
+        self.sd.workstation.add_source(self.name.text())
         ql = QListWidgetItem("{} ({})".format(self.name.text(), self.source.currentText()), self.sd.source_list)
         if self.sd.workstation.sources[self.name.text()].available:
             ql.setIcon(self.sd.source_list.style().standardIcon(QStyle.SP_DialogApplyButton))
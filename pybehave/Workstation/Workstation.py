@@ -4,8 +4,10 @@ import multiprocessing
 import sys
 import threading
 import time
+from multiprocessing import resource_tracker
 from multiprocessing.dummy.connection import Connection
-from typing import List
+from datetime import datetime
+from typing import List, TYPE_CHECKING, Dict
 
 import msgspec
 
@@ -13,11 +15,17 @@ from pybehave.Events import PybEvents
 from pybehave.Events.EventWidget import EventWidget
 from pybehave.GUIs.SequenceGUI import SequenceGUI
 from pybehave.Tasks.TaskProcess import TaskProcess
+from pybehave.Utilities.merge_rects import merge_rects
+from pybehave.Workstation.ControlServer import ControlServer
 from pybehave.Workstation.WorkstationGUI import WorkstationGUI
 
+if TYPE_CHECKING:
+    from pybehave.Elements.Element import Element
+
 import importlib
 
 import math
+import csv
 
 from pybehave.GUIs import Colors
 import pygame
@@ -31,7 +39,8 @@ from screeninfo import get_monitors
 
 class Workstation:
 
-    def __init__(self):
+    def __init__(self, headless: bool = False):
+        self.headless = headless
         self.tasks = {}
         self.task_event_loggers = {}
         self.guis = {}
@@ -39,7 +48,7 @@ class Workstation:
         self.n_chamber, self.n_col, self.n_row, self.w, self.h = 0, 0, 0, 0, 0
         self.ed = None
         self.wsg = None
-        self.mainq = None
+        self.mainqs = []
         self.gui_task = None
         self.gui_event_task = None
         self.heartbeat_task = None
@@ -48,13 +57,28 @@ class Workstation:
         self.last_frame = 0
         self.task_gui = None
         self.gui_updates = []
-        self.gui_queue = None
+        self.dirty_chambers = set()
+        self.dirty_elements = {}
+        self.gui_queues = []
         self.qui_events_queue = None
         self.gui_stop_event = None
         self.refresh_gui = True
-        self.tp = None
+        self.tps = []
+        self.n_tp = 1
+        self.tp_assignment = {}
+        self.trace_folder = ""
+        self.send_lock = threading.Lock()
+        self.subscription_lock = threading.Lock()
+        self.chamber_status = {}
+        # Guards chamber_status which is changed by command threads and the thread reading the TaskProcesses
+        self.status_cond = threading.Condition()
+        self.ack_timeout = 10
+        self.control_server = None
+        self.control_in = None
+        self.control_out = None
         self.encoder = msgspec.msgpack.Encoder(enc_hook=PybEvents.enc_hook)
-        self.decoder = msgspec.msgpack.Decoder(type=List[PybEvents.subclass_union(PybEvents.PybEvent)], dec_hook=PybEvents.dec_hook)
+        self.decoder = msgspec.msgpack.Decoder(type=List[PybEvents.subclass_union(PybEvents.PybEvent)], dec_hook=PybEvents.dec_hook,
+                                               ext_hook=PybEvents.ext_hook)
 
         # Core application details
         QCoreApplication.setOrganizationName("TNEL")
@@ -64,17 +88,18 @@ class Workstation:
         # Load information from settings or set defaults
         desktop = os.path.join(os.path.join(os.path.expanduser('~')), 'Desktop')
         settings = QSettings(desktop + "/py-behav/pybehave.ini", QSettings.IniFormat)
-        # Store the position of the pygame window
-        if settings.contains("pygame/offset"):
-            offset = ast.literal_eval(settings.value("pygame/offset"))
-        else:
-            m = get_monitors()[0]
-            offset = (m.width / 6, 30)
-            settings.setValue("pygame/offset", str(offset))
-
-        os.environ['SDL_VIDEO_WINDOW_POS'] = '%i,%i' % offset  # Position the pygame window
-        pygame.init()
-        pygame.display.set_caption("Pybehave")
+        if not self.headless:
+            # Store the position of the pygame window
+            if settings.contains("pygame/offset"):
+                offset = ast.literal_eval(settings.value("pygame/offset"))
+            else:
+                m = get_monitors()[0]
+                offset = (m.width / 6, 30)
+                settings.setValue("pygame/offset", str(offset))
+
+            os.environ['SDL_VIDEO_WINDOW_POS'] = '%i,%i' % offset  # Position the pygame window
+            pygame.init()
+            pygame.display.set_caption("Pybehave")
 
         # Store the GUI refresh state
         if settings.contains("refresh_gui"):
@@ -90,8 +115,37 @@ class Workstation:
             self.n_chamber = 1
             settings.setValue("n_chamber", self.n_chamber)
 
+        # Store the number of TaskProcesses chambers are distributed across
+        if settings.contains("n_task_process"):
+            self.n_tp = max(int(settings.value("n_task_process")), 1)
+        else:
+            self.n_tp = 1
+            settings.setValue("n_task_process", self.n_tp)
+
+        # Store the folder latency traces are exported to (tracing is disabled if empty)
+        if settings.contains("latency_trace"):
+            self.trace_folder = settings.value("latency_trace")
+        else:
+            self.trace_folder = ""
+            settings.setValue("latency_trace", self.trace_folder)
+
+        # Store any chambers pinned to a specific TaskProcess
+        if settings.contains("task_process_assignment"):
+            self.tp_assignment = ast.literal_eval(settings.value("task_process_assignment"))
+        else:
+            self.tp_assignment = {}
+            settings.setValue("task_process_assignment", str(self.tp_assignment))
+        for chamber, index in list(self.tp_assignment.items()):
+            if not isinstance(index, int) or not 0 <= index < self.n_tp:
+                # Chambers pinned to a TaskProcess that does not exist are assigned round-robin instead
+                print("Ignoring assignment of chamber {} to TaskProcess {}: n_task_process is {}".format(
+                    chamber, index, self.n_tp), file=sys.stderr)
+                del self.tp_assignment[chamber]
+
         # Compute the arrangement of chambers in the pygame window
-        if settings.contains("pygame/n_row"):
+        if self.headless:
+            pass
+        elif settings.contains("pygame/n_row"):
             self.n_row = int(settings.value("pygame/n_row"))
             self.n_col = int(settings.value("pygame/n_col"))
             self.w = int(settings.value("pygame/w"))
@@ -102,6 +156,103 @@ class Workstation:
             self.compute_chambergui()
 
     def start_workstation(self):
+        source_connections = self.load_sources()
+
+        app = QApplication(sys.argv)
+        self.wsg = WorkstationGUI(self)
+        self.qui_events_queue, gui_events_out = multiprocessing.Pipe(False)
+        self.start_task_processes(source_connections)
+        self.gui_task = threading.Thread(target=self.update_gui)
+        self.gui_task.start()
+        self.gui_stop_event = threading.Event()
+        self.gui_event_task = threading.Thread(target=self.gui_event_loop, args=[gui_events_out, self.gui_stop_event])
+        self.gui_event_task.start()
+
+        sys.exit(app.exec())
+
+    def start_headless(self, configurations: List[str], port: int = None) -> None:
+        """
+        Runs the Workstation without the pygame or PyQt interfaces. Chambers are loaded from configuration files and
+        controlled with text commands over a local socket (see handle_command).
+
+        Parameters
+        ----------
+        configurations : List[str]
+            Paths to configuration CSVs that should be loaded on startup
+        port : int
+            The localhost port for the control socket. No socket is opened if None.
+        """
+        source_connections = self.load_sources()
+        self.start_task_processes(source_connections)
+        self.control_in, self.control_out = multiprocessing.Pipe(False)
+        # Commands wait for the TaskProcesses to acknowledge them so their connections are read on a separate thread
+        threading.Thread(target=self.read_task_processes, daemon=True).start()
+        for path in configurations:
+            print(self.load_configuration(path))
+        if port is not None:
+            self.control_server = ControlServer(port, self)
+            threading.Thread(target=self.control_server.serve_forever, daemon=True).start()
+        try:
+            # Poll so the main thread remains responsive to KeyboardInterrupt
+            while not self.control_in.poll(0.5):
+                pass
+            self.exit(self.control_in.recv())
+        except KeyboardInterrupt:
+            self.exit(True)
+
+    def read_task_processes(self) -> None:
+        """Updates the status of each chamber from the events its TaskProcess acknowledges and reports errors."""
+        decoder = msgspec.msgpack.Decoder(type=PybEvents.subclass_union(PybEvents.PybEvent), dec_hook=PybEvents.dec_hook,
+                                          ext_hook=PybEvents.ext_hook)
+        acknowledged = {PybEvents.InitEvent: "loaded", PybEvents.StartEvent: "running", PybEvents.StopEvent: "stopped",
+                        PybEvents.PauseEvent: "paused", PybEvents.ResumeEvent: "running"}
+        while True:
+            for ready in multiprocessing.connection.wait(self.mainqs):
+                try:
+                    event = decoder.decode(ready.recv_bytes())
+                except (EOFError, OSError):  # The TaskProcesses have exited
+                    return
+                if isinstance(event, PybEvents.ErrorEvent):
+                    print(event.traceback, file=sys.stderr)
+                elif isinstance(event, PybEvents.UnavailableSourceEvent):
+                    self.sources[event.sid].available = False
+                    print("Source '{}' is unavailable".format(event.sid), file=sys.stderr)
+                with self.status_cond:
+                    if isinstance(event, PybEvents.ClearEvent):
+                        self.chamber_status.pop(event.chamber, None)
+                    elif isinstance(event, PybEvents.ErrorEvent):
+                        if event.metadata.get("chamber") in self.chamber_status:
+                            self.chamber_status[event.metadata["chamber"]] = "error"
+                    elif type(event) in acknowledged and event.chamber in self.chamber_status:
+                        # Starting a sub-task of a sequence does not change the state of the chamber
+                        if "sub_task" not in event.metadata:
+                            self.chamber_status[event.chamber] = acknowledged[type(event)]
+                    self.status_cond.notify_all()
+
+    def await_status(self, chamber: int, pending: str) -> str:
+        """
+        Waits for the TaskProcess to acknowledge a command that set the chamber to a pending status.
+
+        Parameters
+        ----------
+        chamber : int
+            The index of the chamber
+        pending : str
+            The status of the chamber while the command is unacknowledged
+
+        Returns
+        -------
+        str
+            The status of the chamber, which is still pending if the command was not acknowledged within ack_timeout
+        """
+        with self.status_cond:
+            self.status_cond.wait_for(lambda: self.chamber_status.get(chamber) != pending, self.ack_timeout)
+            return self.chamber_status.get(chamber, "empty")
+
+    def load_sources(self) -> Dict[str, List[Connection]]:
+        if os.name != "nt":
+            # Every process shares one resource tracker so shared memory read by other processes stays owned by its writer
+            resource_tracker.ensure_running()
         # Load information from settings or set defaults
         desktop = os.path.join(os.path.join(os.path.expanduser('~')), 'Desktop')
         settings = QSettings(desktop + "/py-behav/pybehave.ini", QSettings.IniFormat)
@@ -119,26 +270,180 @@ class Workstation:
         else:
             settings.setValue("sources", '{}')
         source_connections = {}
-        for name, source in self.sources.items():
+        for name in self.sources:
+            source_connections[name] = self.start_source(name)
+        return source_connections
+
+    def start_task_processes(self, source_connections: Dict[str, List[Connection]]) -> None:
+        # Each TaskProcess runs a subset of the chambers with its own connection to every Source
+        for i in range(self.n_tp):
+            if self.headless:  # TaskProcesses without a GUI connection do not produce GUI events
+                gui_out = None
+            else:
+                gui_queue, gui_out = multiprocessing.Pipe(False)
+                self.gui_queues.append(gui_queue)
+            mainq, tpq = multiprocessing.Pipe()
+            self.mainqs.append(mainq)
+            self.tps.append(TaskProcess(tpq, gui_out, {name: conns[i] for name, conns in source_connections.items()}, i,
+                                        1 / self.fr, self.trace_folder))
+            self.tps[i].start()
+
+    def load_configuration(self, path: str) -> str:
+        """
+        Adds a Task to a chamber from a configuration CSV like those loaded by the AddTaskDialog. Widgets are ignored.
+
+        Parameters
+        ----------
+        path : str
+            The path to the configuration file
+
+        Returns
+        -------
+        str
+            Description of the result
+        """
+        with open(path, newline='') as csvfile:
+            config = {row[0]: row[1] for row in csv.reader(csvfile, delimiter=',', quotechar='|') if len(row) > 1}
+        chamber = int(config.get("Chamber", 1)) - 1
+        if not 0 <= chamber < self.n_chamber:
+            return "error chamber {} does not exist".format(chamber + 1)
+        with self.status_cond:
+            if chamber in self.chamber_status:
+                return "error chamber {} is already occupied".format(chamber + 1)
+            self.chamber_status[chamber] = "loading"
+        subject = config.get("Subject", "default")
+        self.add_task(chamber, config["Task"], subject, config.get("Address File", ""), config.get("Protocol", ""),
+                      config.get("EventLoggers", ""))
+        desktop = os.path.join(os.path.join(os.path.expanduser('~')), 'Desktop')
+        self.send_event(PybEvents.OutputFileChangedEvent(chamber, "{}/py-behav/{}/Data/{}/{}/".format(
+            desktop, config["Task"], subject, datetime.now().strftime("%m-%d-%Y")), subject))
+        status = self.await_status(chamber, "loading")
+        if status == "loaded":
+            return "ok chamber {} loaded {}".format(chamber + 1, config["Task"])
+        if status == "error":
+            # The chamber is left empty so the configuration can be corrected and loaded again
+            with self.status_cond:
+                del self.chamber_status[chamber]
+            return "error chamber {} failed to load {}".format(chamber + 1, config["Task"])
+        return "error chamber {} did not respond".format(chamber + 1)
+
+    def handle_command(self, command: str) -> str:
+        """
+        Handles a text command for controlling a headless Workstation. Chambers are numbered from 1.
+
+        load PATH, start CHAMBER, stop CHAMBER, pause CHAMBER, resume CHAMBER, clear CHAMBER, status, exit [stop]
+
+        Parameters
+        ----------
+        command : str
+            The command and its arguments separated by whitespace
+
+        Returns
+        -------
+        str
+            The response to the command beginning with ok or error
+        """
+        args = command.split()
+        if len(args) == 0:
+            return "error empty command"
+        try:
+            if args[0] == "load":
+                return self.load_configuration(command.split(None, 1)[1].strip())
+            elif args[0] == "status":
+                with self.status_cond:
+                    statuses = sorted(self.chamber_status.items())
+                return "ok " + " ".join("{}:{}".format(chamber + 1, status) for chamber, status in statuses)
+            elif args[0] == "exit":
+                self.control_out.send(len(args) > 1 and args[1] == "stop")
+                return "ok exiting"
+            commands = {"start": (PybEvents.StartEvent, "starting"), "stop": (PybEvents.StopEvent, "stopping"),
+                        "pause": (PybEvents.PauseEvent, "pausing"), "resume": (PybEvents.ResumeEvent, "resuming"),
+                        "clear": (None, "clearing")}
+            if args[0] not in commands:
+                return "error unknown command " + args[0]
+            event_type, pending = commands[args[0]]
+            chamber = int(args[1]) - 1
+            with self.status_cond:
+                if chamber not in self.chamber_status:
+                    return "error chamber {} is empty".format(chamber + 1)
+                self.chamber_status[chamber] = pending
+            if args[0] == "clear":
+                self.remove_task(chamber)
+            else:
+                self.send_event(event_type(chamber))
+            # The status is only updated once the TaskProcess has handled the event
+            status = self.await_status(chamber, pending)
+            if status == pending:
+                return "error chamber {} did not respond".format(chamber + 1)
+            if status == "error":
+                return "error chamber {} failed to {}".format(chamber + 1, args[0])
+            return "ok"
+        except (IndexError, ValueError, KeyError, OSError) as e:
+            return "error {}: {}".format(type(e).__name__, e)
+
+    def start_source(self, name: str) -> List[Connection]:
+        """
+        Connects a Source to every TaskProcess and starts it.
+
+        Parameters
+        ----------
+        name : string
+            The name of the Source in the sources dictionary
+
+        Returns
+        -------
+        List[Connection]
+            The TaskProcess side of each connection ordered by TaskProcess index
+        """
+        tp_connections = []
+        self.sources[name].queues = []
+        for _ in range(self.n_tp):
             tpq, sourceq = multiprocessing.Pipe()
-            source.queue = sourceq
-            source_connections[name] = tpq
-            source.start()
+            self.sources[name].queues.append(sourceq)
+            tp_connections.append(tpq)
+        self.sources[name].trace = len(self.trace_folder) > 0
+        self.sources[name].start()
+        return tp_connections
 
-        app = QApplication(sys.argv)
-        self.wsg = WorkstationGUI(self)
-        self.gui_queue, gui_out = multiprocessing.Pipe(False)
-        self.qui_events_queue, gui_events_out = multiprocessing.Pipe(False)
-        self.mainq, tpq = multiprocessing.Pipe()
-        self.tp = TaskProcess(tpq, gui_out, source_connections)
-        self.tp.start()
-        self.gui_task = threading.Thread(target=self.update_gui)
-        self.gui_task.start()
-        self.gui_stop_event = threading.Event()
-        self.gui_event_task = threading.Thread(target=self.gui_event_loop, args=[gui_events_out, self.gui_stop_event])
-        self.gui_event_task.start()
+    def add_source(self, name: str) -> None:
+        """
+        Starts a newly configured Source and registers it with every running TaskProcess.
 
-        sys.exit(app.exec())
+        Parameters
+        ----------
+        name : string
+            The name of the Source in the sources dictionary
+        """
+        for i, tpq in enumerate(self.start_source(name)):
+            self.mainqs[i].send_bytes(self.encoder.encode(PybEvents.AddSourceEvent(name, tpq)))
+
+    def task_process(self, chamber: int) -> int:
+        """
+        Returns the index of the TaskProcess responsible for a chamber. Chambers are assigned round-robin unless pinned in the settings.
+
+        Parameters
+        ----------
+        chamber : int
+            The index of the chamber
+        """
+        return self.tp_assignment.get(chamber + 1, chamber % self.n_tp)
+
+    def send_event(self, event: PybEvents.PybEvent) -> None:
+        """
+        Sends an event to the TaskProcess responsible for its chamber or to all TaskProcesses if it is not chamber-specific.
+
+        Parameters
+        ----------
+        event : PybEvent
+            The event to send
+        """
+        with self.send_lock:
+            if isinstance(event, PybEvents.TaskEvent):
+                self.mainqs[self.task_process(event.chamber)].send_bytes(self.encoder.encode(event))
+            else:
+                msg = self.encoder.encode(event)
+                for mainq in self.mainqs:
+                    mainq.send_bytes(msg)
 
     def compute_chambergui(self) -> None:
         desktop = os.path.join(os.path.join(os.path.expanduser('~')), 'Desktop')
@@ -186,7 +491,7 @@ class Workstation:
             The list of EventLoggers for the task
         """
         metadata = {"chamber": chamber, "subject": subject_name, "protocol": protocol, "address_file": address_file}
-        self.mainq.send_bytes(self.encoder.encode(PybEvents.AddTaskEvent(chamber, task_name, task_event_loggers, metadata=metadata)))
+        self.send_event(PybEvents.AddTaskEvent(chamber, task_name, task_event_loggers, metadata=metadata))
 
     def remove_task(self, chamber: int, del_loggers: bool = True) -> None:
         """
@@ -199,7 +504,7 @@ class Workstation:
         del_loggers : bool
             Indicates if the event loggers should be cleared along with the chamber
         """
-        self.mainq.send_bytes(self.encoder.encode(PybEvents.ClearEvent(chamber, del_loggers)))
+        self.send_event(PybEvents.ClearEvent(chamber, del_loggers))
 
     def gui_event_loop(self, out: Connection, stop_event: threading.Event) -> None:
         while not stop_event.is_set():
@@ -208,9 +513,13 @@ class Workstation:
                 out.send_bytes(self.encoder.encode([PybEvents.PygameEvent(event.type, event.__dict__)]))
 
     def update_gui(self) -> None:
-        conns = [self.qui_events_queue, self.gui_queue]
+        conns = [self.qui_events_queue, *self.gui_queues]
         while True:
-            for ready in multiprocessing.connection.wait(conns):
+            if len(self.gui_updates) > 0 or len(self.dirty_chambers) > 0 or len(self.dirty_elements) > 0:
+                timeout = max(self.last_frame + 1 / self.fr - time.perf_counter(), 0)
+            else:
+                timeout = None
+            for ready in multiprocessing.connection.wait(conns, timeout):
                 events = self.decoder.decode(ready.recv_bytes())
                 for event in events:
                     if isinstance(event, PybEvents.AddTaskEvent):
@@ -220,6 +529,7 @@ class Workstation:
                         row = math.floor(event.chamber / self.n_col)
                         # Create the GUI
                         self.guis[event.chamber] = gui(event, self.task_gui.subsurface(col * self.w, row * self.h, self.w, self.h), self)
+                        self.update_subscriptions(event.chamber)
                     elif isinstance(event, PybEvents.TaskEvent):
                         if event.chamber in self.guis:
                             for widget in self.wsg.chambers[event.chamber].widgets:
@@ -252,27 +562,16 @@ class Workstation:
                                 self.wsg.remove_task(event.chamber + 1)
                                 del self.guis[event.chamber]
                             else:
-                                if isinstance(self.guis[event.chamber], SequenceGUI):
-                                    elements = self.guis[event.chamber].get_all_elements()
-                                else:
-                                    elements = self.guis[event.chamber].elements
-                                for element in elements:
-                                    if element.has_updated():
-                                        element.draw()
-                                        self.gui_updates.append(element.rect.move(col * self.w, row * self.h))
+                                self.mark_dirty(event.chamber)
                     elif isinstance(event, PybEvents.HeartbeatEvent) or isinstance(event, PybEvents.PygameEvent):
                         for key in self.guis.keys():
+                            # Heartbeats only apply to the chambers run by the TaskProcess that sent them
+                            if ready is not self.qui_events_queue and self.gui_queues[self.task_process(key)] is not ready:
+                                continue
                             self.guis[key].handle_event(event)
-                            col = key % self.n_col
-                            row = math.floor(key / self.n_col)
-                            if isinstance(self.guis[key], SequenceGUI):
-                                elements = self.guis[key].get_all_elements()
-                            else:
-                                elements = self.guis[key].elements
-                            for element in elements:
-                                if element.has_updated():
-                                    element.draw()
-                                    self.gui_updates.append(element.rect.move(col * self.w, row * self.h))
+                            # Idle chambers do not change on heartbeats or input so their Elements are not checked
+                            if self.guis[key].started and not self.guis[key].paused:
+                                self.mark_dirty(key)
                     elif isinstance(event, PybEvents.ErrorEvent):
                         print(event.traceback)
                         if "chamber" in event.metadata:
@@ -301,33 +600,97 @@ class Workstation:
                             self.wsg.sd.update_source_availability()
                     elif isinstance(event, PybEvents.ExitEvent):
                         return
+            if time.perf_counter() - self.last_frame >= 1 / self.fr:
+                self.composite()
 
-                    if time.perf_counter() - self.last_frame > 1 / self.fr:
-                        if len(self.gui_updates) > 0:
-                            pygame.display.update(self.gui_updates)
-                            self.gui_updates = []
-                        self.last_frame = time.perf_counter()
+    def update_subscriptions(self, chamber: int) -> None:
+        """
+        Tells the TaskProcess running a chamber which events its GUI and EventWidgets need. Called whenever either changes
+        and ignored until both exist.
+
+        Parameters
+        ----------
+        chamber : int
+            The index of the chamber
+        """
+        # Called from both the Qt and update_gui threads so the subscription is computed and sent atomically
+        with self.subscription_lock:
+            if chamber not in self.guis or chamber not in self.wsg.chambers or self.wsg.chambers[chamber].widgets is None:
+                return
+            gui = self.guis[chamber]
+            event_types = None if gui.event_types is None else set(gui.event_types)
+            for widget in self.wsg.chambers[chamber].widgets:
+                if isinstance(widget, EventWidget) and event_types is not None:
+                    if widget.event_types is None:
+                        event_types = None
+                    else:
+                        event_types.update(widget.event_types)
+            self.send_event(PybEvents.GUISubscriptionEvent(chamber, None if event_types is None else sorted(event_types),
+                                                           dict(gui.component_update_intervals)))
+
+    def mark_dirty(self, chamber: int, element: Element = None) -> None:
+        """Flags an Element, or every Element in the chamber if none is provided, to be checked on the next frame."""
+        if element is None:
+            self.dirty_chambers.add(chamber)
+        else:
+            self.dirty_elements.setdefault(chamber, set()).add(element)
+
+    def composite(self) -> None:
+        """Redraws all dirty Elements and pushes the merged changed regions to the display in a single update."""
+        for chamber in self.dirty_chambers.union(self.dirty_elements.keys()):
+            if chamber not in self.guis:
+                continue
+            marked = self.dirty_elements.get(chamber, set())
+            if chamber in self.dirty_chambers:
+                if isinstance(self.guis[chamber], SequenceGUI):
+                    elements = self.guis[chamber].get_all_elements()
+                else:
+                    elements = self.guis[chamber].elements
+            else:
+                elements = marked
+            col = chamber % self.n_col
+            row = math.floor(chamber / self.n_col)
+            for element in elements:
+                if element in marked or element.has_updated():
+                    element.draw()
+                    self.gui_updates.append(element.rect.move(col * self.w, row * self.h))
+        self.dirty_chambers.clear()
+        self.dirty_elements.clear()
+        if len(self.gui_updates) > 0:
+            pygame.display.update(merge_rects(self.gui_updates))
+            self.gui_updates = []
+        self.last_frame = time.perf_counter()
 
     def exit(self, stop_tasks=False):
         """
             Callback for when PyBehave is closed.
-            - Sends an Exit event to the main q and joins the TaskProcess.
-            - The TP tells all sources to close, and the source processes are joined here.
+            - Sends an Exit event to each TaskProcess and joins them.
+            - The TPs tell all sources to close, and the source processes are joined here.
             - Joins the update_gui and gui_event_loop threads.
             - Quits pygame.
         """
         if stop_tasks:
-            for chamber, gui in self.guis.items():
-                if gui.started and not gui.paused:
-                    self.mainq.send_bytes(self.encoder.encode(PybEvents.StopEvent(chamber)))
+            running = {chamber for chamber, gui in self.guis.items() if gui.started and not gui.paused}
+            with self.status_cond:
+                running.update(chamber for chamber, status in self.chamber_status.items() if status == "running")
+            # A chamber can be running according to both its GUI and its status so each is only stopped once
+            for chamber in sorted(running):
+                self.send_event(PybEvents.StopEvent(chamber))
 
-        self.mainq.send_bytes(self.encoder.encode(PybEvents.ExitEvent()))
-        self.tp.join()
+        self.send_event(PybEvents.ExitEvent())
+        for tp in self.tps:
+            tp.join()
 
         # Join source processes. Assumes all source have terminated
         for source in self.sources.values():
             source.join()
 
+        if self.headless:
+            if self.control_server is not None:
+                self.control_server.shutdown()
+                self.control_server.server_close()
+            return
+
         self.gui_stop_event.set()
 
         # Join event threads
@@ -116,6 +116,7 @@ class WorkstationGUI(QWidget):
             try:
                 self.chambers[int(chamber_index) - 1] = ChamberWidget.create_widget(self, chamber_index, task_index, subject, afp, pfp, prompt, event_loggers, widgets, widget_params)
                 self.chamber_container.insertWidget(self.n_active, self.chambers[int(chamber_index) - 1])
+                self.workstation.update_subscriptions(int(chamber_index) - 1)
             except AddTaskError:
                 self.remove_task(int(chamber_index) - 1)
             self.n_active += 1  # Increment the number of active chambers
@@ -1,12 +1,25 @@
+def raise_priority():
+    import os
+    import sys
+    import psutil
+
+    p = psutil.Process(os.getpid())
+    if sys.platform == "win32":
+        p.nice(psutil.REALTIME_PRIORITY_CLASS)
+    else:
+        try:
+            p.nice(-10)
+        except psutil.AccessDenied:  # Raising the priority requires elevated permissions outside Windows
+            pass
+
+
 def pybehave():
     import multiprocessing
     from pybehave.Workstation.Workstation import Workstation
     import faulthandler
-    import psutil
     import os
 
-    p = psutil.Process(os.getpid())
-    p.nice(psutil.REALTIME_PRIORITY_CLASS)
+    raise_priority()
 
     faulthandler.enable()
     multiprocessing.allow_connection_pickling()
@@ -15,3 +28,25 @@ def pybehave():
         os.mkdir("{}\\py-behav\\".format(desktop))
     ws = Workstation()
     ws.start_workstation()
+
+
+def pybehave_headless():
+    import argparse
+    import multiprocessing
+    from pybehave.Workstation.Workstation import Workstation
+    import faulthandler
+    import os
+
+    parser = argparse.ArgumentParser(description="Run pybehave without the GUI")
+    parser.add_argument("configurations", nargs="*", help="configuration CSVs for the chambers to load on startup")
+    parser.add_argument("--port", type=int, default=5557, help="localhost port for the control socket")
+    args = parser.parse_args()
+
+    raise_priority()
+
+    faulthandler.enable()
+    multiprocessing.allow_connection_pickling()
+    desktop = os.path.join(os.path.join(os.path.expanduser('~')), 'Desktop')
+    os.makedirs(os.path.join(desktop, "py-behav"), exist_ok=True)
+    ws = Workstation(headless=True)
+    ws.start_headless(args.configurations, args.port)
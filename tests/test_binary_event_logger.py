@@ -0,0 +1,72 @@
+import math
+import os
+import struct
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from pybehave.Events import PybEvents
+from pybehave.Events.BinaryEventLogger import EVENT_DTYPE, EVENT_RECORD, BinaryEventLogger
+from pybehave.Utilities.load_binary_events import load_binary_events
+
+
+def test_record_layout():
+    assert EVENT_RECORD.format == "<QdIqIQI" and EVENT_RECORD.size == 44
+    assert EVENT_DTYPE.itemsize == struct.calcsize("<QdIqIQI")
+    assert EVENT_DTYPE.names == ("trial", "time", "type", "code", "state", "metadata_offset", "metadata_length")
+    # Each field must sit where struct packs it so the memory-mapped records read back what was written
+    record = EVENT_RECORD.pack(1, 2.5, 3, -4, 5, 6, 7)
+    assert np.frombuffer(record, dtype=EVENT_DTYPE)[0].tolist() == (1, 2.5, 3, -4, 5, 6, 7)
+
+
+@pytest.mark.parametrize("buffer_size", [0, 8])
+def test_round_trip(tmp_path, buffer_size):
+    task = SimpleNamespace(metadata={"subject": "rat1", "chamber": 0, "protocol": "", "address_file": "rig.py"},
+                           initial_constants={"reward": 1}, reward=2)
+    logger = BinaryEventLogger("binary", buffer_size=buffer_size)
+    logger.set_task(task)
+    logger.output_folder = str(tmp_path) + "/"
+    logger.start_()
+    events = [PybEvents.StateEnterEvent(0, name="ITI", value=1, timestamp=0.5, metadata={"count": np.int64(3)}),
+              PybEvents.TimeoutEvent(0, name="iti_timeout", timestamp=1.25),
+              PybEvents.StateExitEvent(0, name="ITI", value=1, timestamp=1.25),
+              PybEvents.GUIEvent(0, name="dispense", value=-2, metadata={"levels": np.arange(3)}),
+              PybEvents.StateEnterEvent(0, name="Response", value=2, timestamp=2.0, metadata={"note": "two\nlines"})]
+    logger.log_events(events[:2])
+    logger.log_events(events[2:])
+    logger.stop()
+    path = logger.log_file.name
+
+    info, records, names, metadata = load_binary_events(path)
+    assert info == {"Subject": "rat1", "Task": "SimpleNamespace", "Chamber": 1, "Protocol": "", "AddressFile": "rig.py",
+                    "SubjectConfiguration": {"reward": "2"}}
+    assert records.dtype == EVENT_DTYPE and len(records) == len(events) == len(metadata)
+    assert records["trial"].tolist() == [1, 2, 3, 4, 5]
+    np.testing.assert_array_equal(records["time"], [0.5, 1.25, 1.25, math.nan, 2.0])
+    assert [names[i] for i in records["type"]] == [type(event).__name__ for event in events]
+    assert [names[i] for i in records["state"]] == ["ITI", "iti_timeout", "ITI", "dispense", "Response"]
+    assert records["code"].tolist() == [1, 0, 1, -2, 2]
+    # Names are interned so each appears once in the table
+    assert len(names) == len(set(names)) == 8
+    assert [metadata[i] for i in range(len(events))] == [{"count": 3}, {}, {}, {"levels": [0, 1, 2]},
+                                                         {"note": "two\nlines"}]
+    assert records["metadata_offset"][-1] + records["metadata_length"][-1] == \
+        os.path.getsize(os.path.splitext(path)[0] + ".metadata")
+    # The loader accepts any of the session's files or their shared name
+    assert load_binary_events(os.path.splitext(path)[0])[2] == load_binary_events(path[:-7] + ".names")[2] == names
+
+
+def test_partial_record_is_ignored(tmp_path):
+    task = SimpleNamespace(metadata={"subject": "rat1", "chamber": 0, "protocol": "", "address_file": ""},
+                           initial_constants={})
+    logger = BinaryEventLogger("binary")
+    logger.set_task(task)
+    logger.output_folder = str(tmp_path) + "/"
+    logger.start_()
+    logger.log_events([PybEvents.TimeoutEvent(0, name="a", timestamp=1.0)])
+    logger.stop()
+    with open(logger.log_file.name, "ab") as f:
+        f.write(b"\x00" * 10)
+    _, records, names, _ = load_binary_events(logger.log_file.name)
+    assert len(records) == 1 and names[records["state"][0]] == "a"
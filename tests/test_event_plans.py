@@ -0,0 +1,151 @@
+from enum import Enum
+from types import SimpleNamespace
+
+import pytest
+
+from pybehave.Events import PybEvents
+from pybehave.Tasks.Task import Task
+from pybehave.Tasks.TaskProcess import ACKNOWLEDGED_EVENTS, TaskProcess
+
+
+class PlanTask(Task):
+    class States(Enum):
+        WAIT = 0
+        RESPOND = 1
+
+    def init_state(self):
+        return self.States.WAIT
+
+    def WAIT(self, event):
+        self.handled.append(("WAIT", type(event)))
+
+    def RESPOND(self, event):
+        self.handled.append(("RESPOND", type(event)))
+
+
+class OtherTask(Task):
+    class States(Enum):
+        ONLY = 5
+
+    def init_state(self):
+        return self.States.ONLY
+
+
+def baseline_main_loop(task: Task, event: PybEvents.PybEvent) -> None:
+    """Task.main_loop before event plans were cached per Task class."""
+    if isinstance(event, PybEvents.StateEnterEvent):
+        task.state = task.States(event.value)
+    elif isinstance(event, PybEvents.StateExitEvent):
+        if task.state in task.state_timeouts:
+            for tm in task.state_timeouts[task.state].values():
+                if tm[1]:
+                    task.cancel_timeout(tm[0].name)
+    elif isinstance(event, PybEvents.TimeoutEvent):
+        del task.timeouts[event.name]
+    all_handled = task.all_states(event)
+    if not all_handled and not task.route_event(event):
+        if task.state.name in task.state_methods:
+            task.state_methods[task.state.name](event)
+    if task.is_complete_():
+        task.task_complete()
+
+
+def make_task(cls):
+    task = cls()
+    task.initialize(SimpleNamespace(), {"protocol": None, "address_file": None, "chamber": 0})
+    task.handled = []
+    task.cancelled = []
+    task.cancel_timeout = task.cancelled.append
+    task.start__()
+    task.timeouts = {"reward": None, "iti": None}
+    task.state_timeouts = {PlanTask.States.RESPOND: {"iti": (SimpleNamespace(name="iti"), True)}}
+    return task
+
+
+TASK_EVENTS = [
+    PybEvents.GUIEvent(0, "button", 1),
+    PybEvents.StateExitEvent(0, "WAIT", 0),
+    PybEvents.StateEnterEvent(0, "RESPOND", 1),
+    PybEvents.TimeoutEvent(0, "reward"),
+    PybEvents.ComponentUpdateEvent(0, "lever-0-0", True),
+    PybEvents.StateExitEvent(0, "RESPOND", 1),
+    PybEvents.StateEnterEvent(0, "WAIT", 0),
+    PybEvents.TimeoutEvent(0, "iti"),
+    PybEvents.HeartbeatEvent(),
+]
+
+
+def test_task_main_loop_matches_isinstance_chain():
+    cached, baseline = make_task(PlanTask), make_task(PlanTask)
+    for event in TASK_EVENTS:
+        cached.main_loop(event)
+        baseline_main_loop(baseline, event)
+        assert cached.state is baseline.state
+        assert cached.timeouts == baseline.timeouts
+    assert cached.handled == baseline.handled
+    assert cached.cancelled == baseline.cancelled == ["iti"]
+
+
+def test_task_classes_do_not_share_plans():
+    make_task(PlanTask).main_loop(PybEvents.StateEnterEvent(0, "RESPOND", 1))
+    other = make_task(OtherTask)
+    assert PybEvents.StateEnterEvent not in OtherTask.event_plans
+    other.main_loop(PybEvents.StateEnterEvent(0, "ONLY", 5))
+    assert other.state is OtherTask.States.ONLY
+    assert PlanTask.state_values[1] is PlanTask.States.RESPOND
+
+
+def baseline_handle_event(tp: TaskProcess, event: PybEvents.PybEvent) -> None:
+    """TaskProcess.handle_event with each check made against the event rather than a cached plan."""
+    if not isinstance(event, (PybEvents.ErrorEvent, PybEvents.GUISubscriptionEvent)):
+        tp.log_gui_event(event)
+    if type(event) in tp.event_responses:
+        tp.event_responses[type(event)](event)
+    elif isinstance(event, PybEvents.StatefulEvent):
+        task = tp.tasks[event.chamber]
+        if task.started and not task.paused:
+            tp.tasks[task.metadata["chamber"]].main_loop(event)
+    if isinstance(event, PybEvents.Loggable):
+        task = tp.tasks[event.chamber]
+        if task.started and not task.paused:
+            tp.log_event(event)
+    if tp.guiq is None and isinstance(event, ACKNOWLEDGED_EVENTS):
+        tp.mainq.send_bytes(tp.encoder.encode(event))
+
+
+def make_task_process(guiq) -> TaskProcess:
+    calls = []
+    tp = TaskProcess(SimpleNamespace(send_bytes=lambda msg: calls.append(("ack", msg))), guiq, {})
+    tp.encoder = SimpleNamespace(encode=lambda event: type(event))
+    tp.log_gui_event = lambda event: calls.append(("gui", type(event)))
+    tp.log_event = lambda event: calls.append(("log", type(event)))
+    tp.event_responses = {PybEvents.StartEvent: lambda event: calls.append(("start", type(event))),
+                          PybEvents.PauseEvent: lambda event: calls.append(("pause", type(event)))}
+    tp.tasks = {0: SimpleNamespace(started=True, paused=False, metadata={"chamber": 0},
+                                   main_loop=lambda event: calls.append(("task", type(event))))}
+    tp.calls = calls
+    return tp
+
+
+TASK_PROCESS_EVENTS = [
+    PybEvents.StartEvent(0),
+    PybEvents.PauseEvent(0),
+    PybEvents.ResumeEvent(0),
+    PybEvents.InitEvent(0),
+    PybEvents.StateEnterEvent(0, "WAIT", 0),
+    PybEvents.InfoEvent(0, "info", 1),
+    PybEvents.ComponentUpdateEvent(0, "lever-0-0", 1.5),
+    PybEvents.ErrorEvent("KeyError", ""),
+    PybEvents.GUISubscriptionEvent(0),
+    PybEvents.StateEnterEvent(0, "RESPOND", 1),
+]
+
+
+@pytest.mark.parametrize("guiq", [object(), None], ids=["gui", "headless"])
+def test_task_process_plans_match_isinstance_checks(guiq):
+    cached, baseline = make_task_process(guiq), make_task_process(guiq)
+    for event in TASK_PROCESS_EVENTS:
+        cached.handle_event(event)
+        baseline_handle_event(baseline, event)
+    assert cached.calls == baseline.calls
+    assert set(cached.event_plans) == {type(event) for event in TASK_PROCESS_EVENTS}
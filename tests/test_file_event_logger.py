@@ -0,0 +1,113 @@
+import errno
+import threading
+import time
+
+import pytest
+
+from pybehave.Events.FileEventLogger import FileEventLogger
+
+
+class FailingFile:
+    """Wraps a file so writes can be made to fail like they would on a full disk."""
+
+    def __init__(self, file):
+        self.file = file
+        self.fail = False
+        self.name = file.name
+
+    def write(self, data):
+        if self.fail:
+            raise OSError(errno.ENOSPC, "No space left on device")
+        return self.file.write(data)
+
+    def flush(self):
+        self.file.flush()
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+    @property
+    def closed(self):
+        return self.file.closed
+
+
+class TextLogger(FileEventLogger):
+
+    def get_file_path(self) -> str:
+        return "{}log.txt".format(self.output_folder)
+
+    def log_events(self, events) -> None:
+        for event in events:
+            self.write(event)
+        super().log_events(events)
+
+    def start(self) -> None:
+        super().start()
+        self.log_file = FailingFile(self.log_file)
+
+
+def make_logger(tmp_path, **kwargs) -> TextLogger:
+    logger = TextLogger("text", **kwargs)
+    logger.output_folder = str(tmp_path) + "/"
+    logger.start()
+    return logger
+
+
+def run(target, *args):
+    """Calls target on another thread so a write that blocks forever fails the test rather than hanging it."""
+    result = {}
+
+    def call():
+        try:
+            target(*args)
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=call, daemon=True)
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive()
+    return result.get("error")
+
+
+@pytest.mark.parametrize("buffer_size", [0, 4])
+def test_writes_reach_the_file(tmp_path, buffer_size):
+    logger = make_logger(tmp_path, buffer_size=buffer_size, flush_count=3)
+    lines = ["{}\n".format(i) for i in range(100)]
+    logger.log_events(lines)
+    logger.stop()
+    logger.stop()
+    assert logger.log_file.closed
+    assert (tmp_path / "log.txt").read_text() == "".join(lines)
+
+
+def test_failed_writer_does_not_block_writes(tmp_path):
+    logger = make_logger(tmp_path, buffer_size=2)
+    logger.write("before\n")
+    deadline = time.perf_counter() + 5
+    while (tmp_path / "log.txt").read_text() != "before\n" and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    logger.log_file.fail = True
+    errors = [run(logger.write, "{}\n".format(i)) for i in range(10)]
+    raised = [error for error in errors if error is not None]
+    assert len(raised) > 0 and raised[0].errno == errno.ENOSPC
+    assert logger.writer is None and logger.write_error is None
+    logger.log_file.fail = False
+    logger.write("after\n")
+    assert run(logger.stop) is None
+    assert (tmp_path / "log.txt").read_text().startswith("before\n")
+    assert (tmp_path / "log.txt").read_text().endswith("after\n")
+
+
+def test_stop_raises_the_writer_error_and_closes_the_file(tmp_path):
+    logger = make_logger(tmp_path, buffer_size=2)
+    logger.log_file.fail = True
+    logger.write("lost\n")
+    logger.writer.join(5)
+    logger.log_file.fail = False
+    error = run(logger.stop)
+    assert isinstance(error, OSError) and error.errno == errno.ENOSPC
+    assert logger.log_file.closed
@@ -0,0 +1,32 @@
+from pybehave.Events import PybEvents
+from pybehave.Tasks.TaskProcess import TaskProcess
+from pybehave.Utilities.component_name import component_name
+
+
+def make_task_process() -> TaskProcess:
+    # Only the presence of a GUI connection matters as the events sent to it are collected in gui_out
+    tp = TaskProcess(None, object(), {})
+    tp.event_responses = {PybEvents.GUISubscriptionEvent: tp.update_subscription}
+    return tp
+
+
+def test_component_name():
+    assert component_name("lever-0-1") == "lever"
+    assert component_name("food_light-12-0") == "food_light"
+
+
+def test_subscriptions_are_not_sent_back_to_the_gui():
+    tp = make_task_process()
+    tp.handle_event(PybEvents.GUISubscriptionEvent(0, ["StateEnterEvent"], {"lever": 0.5}))
+    assert tp.gui_out == []
+    assert 0 in tp.gui_filters
+
+
+def test_updates_are_rate_limited_by_component_name():
+    tp = make_task_process()
+    tp.handle_event(PybEvents.GUISubscriptionEvent(0, None, {"lever": 60}))
+    for value in (True, False, True):
+        tp.log_gui_event(PybEvents.ComponentUpdateEvent(0, "lever-0-1", value, timestamp=1))
+    tp.log_gui_event(PybEvents.ComponentUpdateEvent(0, "poke-0-0", True, timestamp=1))
+    assert [(event.comp_id, event.value) for event in tp.gui_out] == [("lever-0-1", True), ("poke-0-0", True)]
+    assert tp.latest_updates["lever-0-1"].value is True
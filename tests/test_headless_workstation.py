@@ -0,0 +1,88 @@
+import multiprocessing
+import threading
+from types import SimpleNamespace
+
+import msgspec
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from pybehave.Events import PybEvents
+from pybehave.Workstation.Workstation import Workstation
+
+
+def fake_task_process(tpq, responses):
+    """Plays the part of a headless TaskProcess, replying to each event with the result of responses for its type."""
+    decoder = msgspec.msgpack.Decoder(type=PybEvents.subclass_union(PybEvents.PybEvent), dec_hook=PybEvents.dec_hook)
+    encoder = msgspec.msgpack.Encoder(enc_hook=PybEvents.enc_hook)
+    while True:
+        event = decoder.decode(tpq.recv_bytes())
+        if isinstance(event, PybEvents.ExitEvent):
+            tpq.close()
+            return
+        reply = responses.get(type(event), lambda e: e)(event)
+        if reply is not None:
+            tpq.send_bytes(encoder.encode(reply))
+
+
+@pytest.fixture
+def workstation():
+    mainq, tpq = multiprocessing.Pipe()
+    responses = {}
+    ws = Workstation.__new__(Workstation)
+    ws.mainqs, ws.n_tp, ws.tp_assignment, ws.sources = [mainq], 1, {}, {}
+    ws.send_lock = threading.Lock()
+    ws.status_cond = threading.Condition()
+    ws.chamber_status = {0: "loaded"}
+    ws.ack_timeout = 0.5
+    ws.encoder = msgspec.msgpack.Encoder(enc_hook=PybEvents.enc_hook)
+    tp = threading.Thread(target=fake_task_process, args=(tpq, responses), daemon=True)
+    tp.start()
+    threading.Thread(target=ws.read_task_processes, daemon=True).start()
+    yield ws, responses
+    ws.send_event(PybEvents.ExitEvent())
+    tp.join()
+
+
+def test_status_follows_acknowledgements(workstation):
+    ws, _ = workstation
+    assert ws.handle_command("start 1") == "ok"
+    assert ws.handle_command("status") == "ok 1:running"
+    assert ws.handle_command("pause 1") == "ok"
+    assert ws.handle_command("status") == "ok 1:paused"
+    assert ws.handle_command("resume 1") == "ok"
+    assert ws.handle_command("stop 1") == "ok"
+    assert ws.handle_command("status") == "ok 1:stopped"
+    assert ws.handle_command("clear 1") == "ok"
+    assert ws.handle_command("status") == "ok "
+    assert ws.handle_command("start 1") == "error chamber 1 is empty"
+
+
+def test_errors_and_missing_acknowledgements_are_reported(workstation):
+    ws, responses = workstation
+    responses[PybEvents.StartEvent] = lambda e: PybEvents.ErrorEvent("KeyError", "", metadata={"chamber": e.chamber})
+    responses[PybEvents.StopEvent] = lambda e: None
+    assert ws.handle_command("start 1") == "error chamber 1 failed to start"
+    assert ws.handle_command("status") == "ok 1:error"
+    assert ws.handle_command("stop 1") == "error chamber 1 did not respond"
+    assert ws.handle_command("status") == "ok 1:stopping"
+
+
+def test_sub_task_starts_do_not_change_status(workstation):
+    ws, responses = workstation
+    responses[PybEvents.PauseEvent] = lambda e: PybEvents.StartEvent(e.chamber, metadata={"sub_task": "Task"})
+    assert ws.handle_command("start 1") == "ok"
+    assert ws.handle_command("pause 1") == "error chamber 1 did not respond"
+
+
+def test_exit_stops_each_running_chamber_once():
+    ws = Workstation.__new__(Workstation)
+    ws.guis = {0: SimpleNamespace(started=True, paused=False), 1: SimpleNamespace(started=True, paused=True),
+               2: SimpleNamespace(started=False, paused=False)}
+    ws.status_cond = threading.Condition()
+    ws.chamber_status = {0: "running", 2: "running", 3: "stopped"}
+    ws.tps, ws.sources, ws.headless, ws.control_server = [], {}, True, None
+    sent = []
+    ws.send_event = sent.append
+    ws.exit(stop_tasks=True)
+    assert sent == [PybEvents.StopEvent(0), PybEvents.StopEvent(2), PybEvents.ExitEvent()]
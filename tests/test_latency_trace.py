@@ -0,0 +1,93 @@
+import multiprocessing
+import threading
+from types import SimpleNamespace
+from typing import List
+
+import msgspec
+import pytest
+
+from pybehave.Events import PybEvents
+from pybehave.Sources.Source import Source
+from pybehave.Tasks.Task import Task
+from pybehave.Tasks.TaskProcess import TaskProcess
+from pybehave.Utilities.LatencyTracer import LatencyTracer
+
+
+@pytest.fixture
+def source():
+    source = Source()
+    conn, source_conn = multiprocessing.Pipe()
+    source.component_chambers["lever-0-0"] = 0
+    source.component_queues["lever-0-0"] = source_conn
+    source.send_lock = threading.Lock()
+    source.encoder = msgspec.msgpack.Encoder(enc_hook=PybEvents.enc_hook)
+    source.decoder = msgspec.msgpack.Decoder(type=List[PybEvents.subclass_union(PybEvents.PybEvent)],
+                                             dec_hook=PybEvents.dec_hook)
+    yield source, conn
+    conn.close()
+    source_conn.close()
+
+
+def test_untraced_updates_carry_no_trace(source):
+    source, conn = source
+    metadata = {"port": 1}
+    source.update_component("lever-0-0", True, metadata=metadata, timestamp=1)
+    msg = conn.recv_bytes()
+    event = source.decoder.decode(msg)[0]
+    assert event.metadata == {"port": 1}
+    assert msg == source.encoder.encode([PybEvents.ComponentUpdateEvent(0, "lever-0-0", True, acquisition_time=1,
+                                                                    metadata={"port": 1})])
+
+
+def test_traced_updates_are_stamped_without_changing_metadata(source):
+    source, conn = source
+    source.trace = True
+    metadata = {"port": 1}
+    source.update_component("lever-0-0", True, metadata=metadata)
+    assert metadata == {"port": 1}
+    event = source.decoder.decode(conn.recv_bytes())[0]
+    assert len(event.metadata["trace"]) == 2
+    # Writing a traced output completes the trace and returns it to the TaskProcess
+    source.write_component = lambda cid, value: None
+    source.queue = source.component_queues["lever-0-0"]
+    source.handle_events([event])
+    trace_event = source.decoder.decode(conn.recv_bytes())[0]
+    assert isinstance(trace_event, PybEvents.TraceEvent)
+    assert len(trace_event.trace) == 3
+
+
+def test_task_process_does_not_log_traces(tmp_path):
+    tp = TaskProcess(None, None, {})
+    tp.tracer = LatencyTracer(str(tmp_path))
+    logged = []
+    tp.log_event = logged.append
+    lever = SimpleNamespace(id="lever-0-0", update=lambda value: True, state=True)
+    task = SimpleNamespace(components={"lever-0-0": (lever, 0, "source")}, started=True, paused=False,
+                           metadata={"chamber": 0}, task_time=lambda t: t, main_loop=lambda event: None)
+    tp.tasks[0] = task
+    event = PybEvents.ComponentUpdateEvent(0, "lever-0-0", True, acquisition_time=1.0, metadata={"trace": [1.0, 1.1]})
+    tp.trace_events([event])
+    tp.update_component(event)
+    assert "trace" not in logged[0].metadata
+    assert tp.active_trace is None
+    assert tp.tracer.histograms[0]["input"].sum() == 1
+
+
+def test_gui_is_sent_updates_without_traces(tmp_path):
+    tp = TaskProcess(None, object(), {"source": None})
+    tp.tracer = LatencyTracer(str(tmp_path))
+    tp.source_buffers["source"] = []
+    task = Task()
+    task.tp = tp
+    task.metadata = {"chamber": 0}
+    task.components = {"light-0-0": (None, 0, "source")}
+    tp.tasks[0] = task
+    tp.active_trace = [1.0, 1.1]
+    task.write_component("light-0-0", True, metadata={"port": 1})
+    tp.active_trace = None
+    event = PybEvents.ComponentUpdateEvent(0, "lever-0-0", True, timestamp=1, metadata={"trace": [1.0], "port": 2})
+    tp.log_gui_event(event)
+    assert [gui_event.metadata for gui_event in tp.gui_out] == [{"port": 1}, {"port": 2}]
+    # The Sources still receive the trace
+    assert tp.source_buffers["source"][0].metadata == {"port": 1, "trace": [1.0, 1.1]}
+    assert event.metadata == {"trace": [1.0], "port": 2}
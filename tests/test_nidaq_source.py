@@ -0,0 +1,235 @@
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+import pytest
+
+from pybehave.Components.Toggle import Toggle
+from pybehave.Components.WaveformStim import WaveformStim
+from pybehave.Utilities.Exceptions import ComponentRegisterError
+
+
+class FakeChannels:
+    def __init__(self, task):
+        self.task = task
+
+    def add_ao_voltage_chan(self, name):
+        self.task.channels.append(name)
+
+    def add_do_chan(self, name, line_grouping=None):
+        self.task.channels.append(name)
+
+
+class FakeTask:
+    """Stands in for nidaqmx.Task recording what is done to it."""
+
+    def __init__(self):
+        self.channels = []
+        self.calls = []
+        self.clock = []
+        self.regen_mode = None
+        self.ao_channels = self.do_channels = FakeChannels(self)
+        self.timing = types.SimpleNamespace(cfg_samp_clk_timing=lambda rate, sample_mode, samps_per_chan:
+                                            self.clock.append((rate, sample_mode, samps_per_chan)))
+        self.out_stream = self
+
+    def start(self):
+        self.calls.append("start")
+
+    def stop(self):
+        self.calls.append("stop")
+
+    def close(self):
+        self.calls.append("close")
+
+    def write(self, value):
+        self.calls.append(("write", value))
+
+    def is_task_done(self):
+        return True
+
+
+class FakeWriter:
+    """Records written samples. Writes from the streaming thread wait for a permit like they would for room on the DAQ."""
+
+    def __init__(self, out_stream):
+        self.task = out_stream
+        self.written = []
+        self.streamed = []
+        self.permits = threading.Semaphore(0)
+        self.waiting = 0
+        self.free = threading.Event()
+
+    def write_many_sample(self, output):
+        if threading.current_thread() is threading.main_thread():
+            self.written.append(output.copy())
+            self.task.calls.append(("write_many_sample", output.shape))
+        else:
+            self.waiting += 1
+            while not self.free.is_set() and not self.permits.acquire(timeout=0.01):
+                pass
+            self.streamed.append(output.copy())
+
+
+@pytest.fixture
+def nidaq(monkeypatch):
+    # nidaqmx is an optional dependency so a stand-in is installed in its place
+    nidaqmx = types.ModuleType("nidaqmx")
+    nidaqmx.Task = FakeTask
+    constants = types.ModuleType("nidaqmx.constants")
+    constants.LineGrouping = types.SimpleNamespace(CHAN_FOR_ALL_LINES=0)
+    constants.AcquisitionType = types.SimpleNamespace(FINITE=0, CONTINUOUS=1)
+    constants.RegenerationMode = types.SimpleNamespace(DONT_ALLOW_REGENERATION=0)
+    stream_writers = types.ModuleType("nidaqmx.stream_writers")
+    stream_writers.AnalogMultiChannelWriter = FakeWriter
+    system = types.ModuleType("nidaqmx.system")
+    system.system = types.SimpleNamespace(Device=lambda dev: types.SimpleNamespace(reset_device=lambda: None))
+    nidaqmx.constants, nidaqmx.stream_writers, nidaqmx.system = constants, stream_writers, system
+    for name, module in (("nidaqmx", nidaqmx), ("nidaqmx.constants", constants),
+                         ("nidaqmx.stream_writers", stream_writers), ("nidaqmx.system", system)):
+        monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.delitem(sys.modules, "pybehave.Sources.NIDAQSource", raising=False)
+    from pybehave.Sources import NIDAQSource
+    yield NIDAQSource
+    monkeypatch.delitem(sys.modules, "pybehave.Sources.NIDAQSource", raising=False)
+
+
+def add_stim(source, i: int, sr: float = 1000) -> WaveformStim:
+    stim = WaveformStim(None, "stim-0-{}".format(i), "ao{}".format(i))
+    stim.sr = sr
+    source.components[stim.id] = stim
+    source.register_component(stim, {})
+    return stim
+
+
+@pytest.fixture
+def source(nidaq):
+    source = nidaq.NIDAQSource("Dev1/")
+    for i in range(2):
+        add_stim(source, i)
+    return source
+
+
+@pytest.fixture
+def streaming(nidaq):
+    # 10 sample blocks at 1 kHz
+    source = nidaq.NIDAQSource("Dev1/", ao_rate="1000", ao_block="0.01")
+    for i in range(2):
+        add_stim(source, i)
+    yield source
+    if source.ao_stream is not None:
+        source.ao_stream.free.set()
+    source.close_source()
+
+
+def test_finite_writes_only_reconfigure_timing_when_needed(source):
+    first = np.arange(1, 11, dtype=float).reshape(1, 10)
+    second = np.full((1, 10), 5.0)
+    source.write_component("stim-0-1", first)
+    source.write_component("stim-0-0", second)
+    np.testing.assert_array_equal(source.ao_stream.written[0], np.vstack((np.zeros(10), first[0])))
+    np.testing.assert_array_equal(source.ao_stream.written[1], np.vstack((second[0], np.zeros(10))))
+    assert source.ao_task.clock == [(1000, 0, 10)]
+    source.write_component("stim-0-0", np.ones((1, 20)))
+    assert source.ao_task.clock == [(1000, 0, 10), (1000, 0, 20)]
+    assert source.ao_task.channels == ["Dev1/ao0", "Dev1/ao1"]
+
+
+def test_adding_a_channel_resets_timing(source):
+    source.write_component("stim-0-0", np.ones((1, 10)))
+    add_stim(source, 2)
+    assert source.ao_timing is None
+    source.write_component("stim-0-2", np.ones((1, 10)))
+    assert source.ao_stream.written[-1].shape == (3, 10)
+    assert len(source.ao_task.clock) == 2
+
+
+def stream(source, n_blocks: int) -> np.ndarray:
+    """Lets the streaming thread hand n_blocks more blocks to the DAQ and returns everything it has streamed."""
+    writer = source.ao_stream
+    expected = len(writer.streamed) + n_blocks
+    writer.permits.release(n_blocks)
+    deadline = time.perf_counter() + 5
+    # The thread has taken the following block once it waits to write it
+    while (len(writer.streamed) < expected or writer.waiting <= expected) and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    assert len(writer.streamed) >= expected and writer.waiting > expected
+    return np.hstack(writer.streamed)
+
+
+def test_streaming_mixes_channels_into_one_output(streaming):
+    first = np.arange(1, 26, dtype=float).reshape(1, 25)
+    second = np.full((1, 5), -1.0)
+    streaming.write_component("stim-0-0", first)
+    task = streaming.ao_task
+    # The clock is set up once and the task starts after a block of silence is written for each prefilled block
+    assert task.clock == [(1000, 1, 20)] and task.regen_mode == 0
+    assert task.calls == [("write_many_sample", (2, 20)), "start"]
+    assert np.all(streaming.ao_stream.written[0] == 0)
+    output = stream(streaming, 1)
+    # The streaming thread has already taken the next block so the second channel is mixed in after it without
+    # affecting the first channel
+    streaming.write_component("stim-0-1", second)
+    output = stream(streaming, 3)
+    expected = np.zeros((2, 40))
+    expected[0, :25] = first[0]
+    expected[1, 20:25] = second[0]
+    np.testing.assert_array_equal(output[:, :40], expected)
+    assert task.clock == [(1000, 1, 20)] and task.calls.count("start") == 1
+
+
+def test_streaming_replaces_queued_output(streaming):
+    streaming.write_component("stim-0-0", np.ones((1, 50)))
+    output = stream(streaming, 1)
+    streaming.write_component("stim-0-0", np.full((1, 5), 2.0))
+    output = stream(streaming, 4)
+    expected = np.zeros(50)
+    expected[:20] = 1
+    expected[20:25] = 2
+    np.testing.assert_array_equal(output[0, :50], expected)
+    assert np.all(output[1] == 0)
+
+
+def test_streaming_queue_grows_for_long_waveforms(streaming, nidaq):
+    streaming.write_component("stim-0-1", np.ones((1, 5)))
+    stream(streaming, 1)
+    n = nidaq.AO_QUEUE_BLOCKS * 10 * 3 + 7
+    waveform = np.arange(1, n + 1, dtype=float).reshape(1, n)
+    streaming.write_component("stim-0-0", waveform)
+    output = stream(streaming, n // 10 + 3)
+    np.testing.assert_array_equal(output[0, 20:20 + n], waveform[0])
+    assert np.all(output[0, 20 + n:] == 0) and np.all(output[0, :20] == 0)
+    assert streaming.ao_queue.shape[1] % 10 == 0
+
+
+def test_streaming_restarts_when_a_channel_is_added(streaming):
+    streaming.write_component("stim-0-0", np.ones((1, 10)))
+    stream(streaming, 1)
+    streaming.ao_stream.free.set()
+    add_stim(streaming, 2)
+    assert not streaming.ao_streaming and streaming.ao_thread is None
+    assert streaming.ao_task.calls[-1] == "stop"
+    streaming.write_component("stim-0-2", np.ones((1, 10)))
+    assert streaming.ao_queue.shape[0] == 3 and streaming.ao_streaming
+
+
+def test_streaming_requires_a_shared_sample_rate(nidaq):
+    source = nidaq.NIDAQSource("Dev1/", ao_rate="1000")
+    with pytest.raises(ComponentRegisterError):
+        add_stim(source, 0, sr=2000)
+
+
+def test_digital_outputs_and_close(source):
+    light = Toggle(None, "light-0-0", "port0/line0")
+    source.components[light.id] = light
+    source.register_component(light, {})
+    source.write_component(light.id, True)
+    task = source.tasks[light.id]
+    assert task.channels == ["Dev1/port0/line0"]
+    assert task.calls == ["start", ("write", True)]
+    ao_task = source.ao_task
+    source.close_source()
+    assert task.calls[-1] == "close" and ao_task.calls[-1] == "close"
+    assert source.ao_task is None
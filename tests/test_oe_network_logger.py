@@ -0,0 +1,101 @@
+import collections
+import threading
+import time
+
+import pytest
+
+zmq = pytest.importorskip("zmq")
+
+from pybehave.Events import PybEvents
+from pybehave.Events.OENetworkLogger import OENetworkLogger
+
+
+class StubNetworkEvents:
+    """Stands in for the OpenEphys NetworkEvents plugin, recording every request and optionally replying to it."""
+
+    def __init__(self, reply: bool = True):
+        self.context = zmq.Context()
+        self.socket = self.context.socket(zmq.REP if reply else zmq.ROUTER)
+        self.port = self.socket.bind_to_random_port("tcp://127.0.0.1")
+        self.reply = reply
+        self.received = []
+        self.running = True
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self) -> None:
+        while self.running:
+            if self.socket.poll(50):
+                frames = self.socket.recv_multipart()
+                self.received.append(frames[-1].decode("utf-8"))
+                if self.reply:
+                    self.socket.send(b"ok")
+
+    def wait_for(self, count: int, timeout: float = 5) -> None:
+        end = time.perf_counter() + timeout
+        while len(self.received) < count and time.perf_counter() < end:
+            time.sleep(0.01)
+
+    def close(self) -> None:
+        self.running = False
+        self.thread.join()
+        self.socket.close(0)
+        self.context.term()
+
+
+@pytest.fixture
+def server():
+    stub = StubNetworkEvents()
+    yield stub
+    stub.close()
+
+
+def test_messages_arrive_in_order_with_replies(server):
+    logger = OENetworkLogger("oe", "127.0.0.1", server.port, max_in_flight=4)
+    messages = ["message {}".format(i) for i in range(200)] + [""]
+    for msg in messages:
+        logger.send_string(msg)
+    server.wait_for(len(messages))
+    end = time.perf_counter() + 5
+    while logger.replies < len(messages) and time.perf_counter() < end:
+        time.sleep(0.01)
+    logger.close()
+    assert server.received == messages
+    assert logger.sent == logger.replies == len(messages)
+    assert logger.in_flight == 0
+
+
+def test_raw_events_are_formatted(server):
+    logger = OENetworkLogger("oe", "127.0.0.1", server.port)
+    events = collections.deque([PybEvents.StateEnterEvent(0, "REWARD", 1, timestamp=1.5, metadata={"trial": 2}),
+                                OENetworkLogger.OEEvent(0, "startAcquisition", timestamp=2)])
+    logger.log_events(events)
+    server.wait_for(2)
+    logger.close()
+    assert server.received == ["1,1.5,StateEnterEvent,1,REWARD,\"{'trial': 2}\"\n", "startAcquisition"]
+
+
+def test_timed_ttl_turns_off(server):
+    logger = OENetworkLogger("oe", "127.0.0.1", server.port)
+    logger.send_ttl_event(3, 0.05)
+    server.wait_for(2)
+    logger.close()
+    assert server.received == ["TTL Channel=3 on=1", "TTL Channel=3 on=0"]
+
+
+def test_messages_are_dropped_when_openephys_stalls():
+    stub = StubNetworkEvents(reply=False)
+    try:
+        logger = OENetworkLogger("oe", "127.0.0.1", stub.port, max_in_flight=1, max_pending=10)
+        logger.send_string("0")
+        stub.wait_for(1)
+        for i in range(1, 100):
+            logger.send_string(str(i))
+        logger.close()
+        # One message is awaiting a reply, ten are held and the rest are dropped. Held messages are sent on close.
+        assert logger.dropped == 89
+        assert logger.sent == 11
+        stub.wait_for(11)
+        assert stub.received == [str(i) for i in range(11)]
+    finally:
+        stub.close()
@@ -0,0 +1,82 @@
+import gc
+import multiprocessing
+import os
+import threading
+from multiprocessing import resource_tracker
+
+import msgspec
+import numpy as np
+import pytest
+
+from pybehave.Events import PybEvents
+from pybehave.Utilities.SharedArrayRing import SharedArrayRing, open_shared_array
+
+
+@pytest.fixture
+def ring():
+    ring = SharedArrayRing(capacity=1024 * 1024, threshold=1024)
+    yield ring
+    ring.close()
+
+
+def test_arrays_are_copied_out_by_default(ring):
+    array = np.arange(4096, dtype=np.float64)
+    received = open_shared_array(ring.put(array))
+    assert received.flags.writeable
+    received[0] = -1
+    np.testing.assert_array_equal(received[1:], array[1:])
+    # The slot was released when the array was copied so the next array reuses it
+    assert ring.put(array).offset == 0
+
+
+def test_views_are_read_only_until_collected(ring):
+    array = np.arange(4096, dtype=np.float64)
+    view = open_shared_array(ring.put(array), copy=False)
+    assert not view.flags.writeable
+    np.testing.assert_array_equal(view, array)
+    assert ring.put(array).offset != 0
+    del view
+    gc.collect()
+    ring.put(array)
+    assert ring.outstanding[0][0] != 0
+
+
+def test_concurrent_puts_use_distinct_slots(ring):
+    descriptors = []
+    lock = threading.Lock()
+
+    def put(value: int) -> None:
+        for _ in range(20):
+            descriptor = ring.put(np.full(1024, value, dtype=np.int64))
+            if descriptor is not None:
+                with lock:
+                    descriptors.append((descriptor, value))
+
+    threads = [threading.Thread(target=put, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({descriptor.offset for descriptor, _ in descriptors}) == len(descriptors)
+    for descriptor, value in descriptors:
+        assert (open_shared_array(descriptor, copy=False) == value).all()
+
+
+def read(conn) -> None:
+    decoder = msgspec.msgpack.Decoder(type=PybEvents.subclass_union(PybEvents.PybEvent), dec_hook=PybEvents.dec_hook,
+                                      ext_hook=PybEvents.ext_hook)
+    conn.send(decoder.decode(conn.recv_bytes()).value.sum())
+
+
+def test_segment_outlives_readers(ring):
+    if os.name != "nt":
+        resource_tracker.ensure_running()
+    encoder = msgspec.msgpack.Encoder(enc_hook=PybEvents.shared_enc_hook(ring))
+    array = np.arange(4096, dtype=np.float64)
+    for _ in range(2):
+        conn, child = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=read, args=(child,))
+        process.start()
+        conn.send_bytes(encoder.encode(PybEvents.ComponentUpdateEvent(0, "camera-0-0", array)))
+        assert conn.recv() == array.sum()
+        process.join()
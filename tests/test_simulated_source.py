@@ -0,0 +1,61 @@
+import threading
+import time
+
+import numpy as np
+
+from pybehave.Components.BinaryInput import BinaryInput
+from pybehave.Sources.SimulatedSource import SimulatedSource
+
+
+def make_source() -> SimulatedSource:
+    source = SimulatedSource(latency="0.001", seed="0")
+    source.schedule_cv = threading.Condition()
+    source.rng = np.random.default_rng(source.seed)
+    component = BinaryInput(None, "lever-0-0", "0")
+    source.components[component.id] = component
+    source.register_component(component, {})
+    return source
+
+
+def test_writes_can_be_scheduled_while_an_action_sends():
+    source = make_source()
+    scheduled = threading.Event()
+    updates = []
+    blocked = []
+
+    def update_component(cid, value, metadata=None, timestamp=None):
+        updates.append(value)
+        if value == "first":
+            # Stands in for the reader thread handling a write while this update is blocked sending to the TaskProcess
+            writer = threading.Thread(target=source.write_component, args=(cid, "second"))
+            writer.start()
+            writer.join(1)
+            blocked.append(writer.is_alive())
+            scheduled.set()
+
+    source.update_component = update_component
+    source.write_component("lever-0-0", "first")
+    scheduler = threading.Thread(target=source.initialize, daemon=True)
+    scheduler.start()
+    assert scheduled.wait(2)
+    deadline = time.perf_counter() + 2
+    while len(updates) < 2 and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    source.close_source()
+    scheduler.join(2)
+    assert blocked == [False]
+    assert updates == ["first", "second"] and not scheduler.is_alive()
+
+
+def test_actions_for_closed_components_are_dropped():
+    source = make_source()
+    updates = []
+    source.update_component = lambda cid, value, metadata=None, timestamp=None: updates.append(value)
+    source.write_component("lever-0-0", "dropped")
+    source.close_component("lever-0-0")
+    scheduler = threading.Thread(target=source.initialize, daemon=True)
+    scheduler.start()
+    time.sleep(0.05)
+    source.close_source()
+    scheduler.join(2)
+    assert updates == [] and not scheduler.is_alive()
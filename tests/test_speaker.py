@@ -0,0 +1,78 @@
+import math
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+from pybehave.Components import Speaker as speaker_module
+from pybehave.Components.Speaker import MAX_SAMPLE, SAMPLE_RATE, Speaker, ToneWorker, make_tone
+
+
+@pytest.fixture(scope="module")
+def mixer():
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    speaker_module.init_mixer(SAMPLE_RATE)
+    yield
+    make_tone.cache_clear()
+
+
+def baseline_tone(frequency: float, sample_rate: int) -> np.ndarray:
+    """Samples synthesized by Speaker before make_tone was vectorized."""
+    buf = np.zeros((sample_rate, 2), dtype=np.int16)
+    for s in range(sample_rate):
+        t = float(s) / sample_rate
+        buf[s][0] = int(round(MAX_SAMPLE * math.sin(2 * math.pi * float(frequency) * t)))
+        buf[s][1] = int(round(MAX_SAMPLE * math.sin(2 * math.pi * float(frequency) * t)))
+    return buf
+
+
+@pytest.mark.parametrize("frequency", [440.0, 1000.0, 2750.5, 8000.0])
+def test_tones_match_baseline(mixer, frequency):
+    sound = make_tone(frequency, 0.5, SAMPLE_RATE)
+    np.testing.assert_array_equal(pygame.sndarray.array(sound), baseline_tone(frequency, SAMPLE_RATE))
+    assert sound.get_volume() == pytest.approx(0.5, abs=0.01)
+
+
+def test_tones_are_cached(mixer):
+    make_tone.cache_clear()
+    speaker = Speaker(None, "speaker-0-0", "0")
+    speaker.preload(500, 0.8)
+    assert make_tone(500.0, 0.8, SAMPLE_RATE) is make_tone(500.0, 0.8, SAMPLE_RATE)
+    assert make_tone(500.0, 0.4, SAMPLE_RATE) is not make_tone(500.0, 0.8, SAMPLE_RATE)
+    assert make_tone.cache_info().hits == 3 and make_tone.cache_info().misses == 2
+
+
+class FakeSound:
+    def __init__(self):
+        self.plays = []
+
+    def play(self, loops, maxtime):
+        self.plays.append(maxtime)
+
+
+def test_speakers_share_one_worker(monkeypatch):
+    sound = FakeSound()
+    monkeypatch.setattr(speaker_module, "init_mixer", lambda sample_rate: None)
+    monkeypatch.setattr(speaker_module, "make_tone", lambda frequency, volume, sample_rate: sound)
+    worker = ToneWorker()
+    monkeypatch.setattr(speaker_module, "tone_worker", worker)
+    threads = threading.active_count()
+    speakers = [Speaker(None, "speaker-0-{}".format(i), str(i)) for i in range(3)]
+    for i, speaker in enumerate(speakers):
+        speaker.play_sound(1000, 0.5, 0.05 * (i + 1))
+    deadline = time.perf_counter() + 2
+    while not all(speaker.state for speaker in speakers) and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    assert threading.active_count() == threads + 1
+    assert sound.plays == [50, 100, 150]
+    # Each Speaker's state is cleared when its own tone ends
+    while speakers[0].state and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    assert not speakers[0].state and speakers[2].state
+    while speakers[2].state and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    assert not any(speaker.state for speaker in speakers)
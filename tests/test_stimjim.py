@@ -0,0 +1,192 @@
+import re
+
+import numpy as np
+import pytest
+
+from pybehave.Components.StimJim import StimJim
+
+
+class BaselineStimJim(StimJim):
+    """StimJim with the response parser used before records were parsed incrementally."""
+
+    def __init__(self, task, component_id: str, component_address: str):
+        super().__init__(task, component_id, component_address)
+        self.in_buffer = ""
+
+    def update(self, value) -> bool:
+        if value is not None:
+            if isinstance(value, int):
+                self.state = value
+            else:
+                if isinstance(value, str):
+                    pass
+                else:
+                    dec_val = value.decode('utf-8')
+                    segs = dec_val.split('\n')
+                    segs[0] = self.in_buffer + segs[0]
+                    self.in_buffer = ''
+                    if not dec_val.endswith('\n'):
+                        self.in_buffer = segs[-1]
+                        del segs[-1]
+                    self.commands = []
+                    for line in segs:
+                        if len(line) > 0:
+                            if 'Parameters' in line:
+                                if self.cur_command is not None:
+                                    self.commands.append(self.cur_command)
+                                self.cur_command = {"command": "P", "id": int(line.split("[")[1].split("]")[0])}
+                            elif self.cur_command is not None and self.cur_command["command"] == "P":
+                                l_segs = re.split(" +", line)
+                                if "mode" in line:
+                                    if "mode" in self.cur_command:
+                                        self.cur_command["mode"].append(int(l_segs[2]))
+                                    else:
+                                        self.cur_command["mode"] = [int(l_segs[2])]
+                                elif "period:" in line:
+                                    self.cur_command["period"] = int(l_segs[2])
+                                elif "duration:" in line:
+                                    self.cur_command["duration"] = int(l_segs[2])
+                                elif len(l_segs) > 1 and l_segs[1].isnumeric():
+                                    if "stages" in self.cur_command:
+                                        self.cur_command["stages"].append([l_segs[2], l_segs[4], l_segs[5][:-1]])
+                                    else:
+                                        self.cur_command["stages"] = [[l_segs[2], l_segs[4], l_segs[5][:-1]]]
+                                elif line[0] == '-':
+                                    self.commands.append(self.cur_command)
+                                    self.configs[self.cur_command["id"]] = self.cur_command
+                                    self.cur_command = None
+                            elif 'Started' in line:
+                                self.state = int(line[line.rindex(' ')+1:-1])
+                                if self.cur_command is not None:
+                                    self.commands.append(self.cur_command)
+                                self.cur_command = None
+                            elif 'complete' in line:
+                                if self.cur_command is not None:
+                                    self.commands.append(self.cur_command)
+                                self.cur_command = {"command": "C", "id": self.state}
+                                self.state = None
+                                l_segs = line.split(" ")
+                                self.cur_command["n_pulse"] = int(l_segs[3])
+                            elif self.cur_command is not None and self.cur_command["command"] == "C" and "Stage" in line:
+                                l_segs = re.split(" +", line)
+                                if "stages" in self.cur_command:
+                                    self.cur_command["stages"].append([l_segs[2][:-1], l_segs[3][:-1]])
+                                else:
+                                    self.cur_command["stages"] = [[l_segs[2][:-1], l_segs[3][:-1]]]
+                                if len(self.cur_command["stages"]) == len(self.configs[self.cur_command["id"]]["stages"]):
+                                    self.commands.append(self.cur_command)
+                                    self.cur_command = None
+        return len(self.commands) > 0
+
+
+def transcript(n_trains: int, n_runs: int, seed: int = 0) -> bytes:
+    """Builds StimJim output defining n_trains pulse trains and reporting n_runs of them being started and completed."""
+    rng = np.random.default_rng(seed)
+    lines = []
+    n_stages = {}
+    for train in range(n_trains):
+        n_stages[train] = int(rng.integers(1, 5))
+        lines += ["Parameters [{}]:".format(train), "  mode: {}".format(rng.integers(0, 3)),
+                  "  mode: {}".format(rng.integers(0, 3)), "  period: {}".format(rng.integers(1000, 100000)),
+                  "  duration: {}".format(rng.integers(100000, 1000000))]
+        for stage in range(n_stages[train]):
+            lines.append("  {}  {}mV  x  {}mV  {}us".format(stage, rng.integers(-5000, 5000), rng.integers(-5000, 5000),
+                                                            rng.integers(10, 1000)))
+        lines.append("-----")
+    for _ in range(n_runs):
+        train = int(rng.integers(0, n_trains))
+        lines += ["Started train {}.".format(train), "Train {} complete {} pulses".format(train, rng.integers(1, 100))]
+        for stage in range(n_stages[train]):
+            lines.append("  Stage {}: {}, {},".format(stage, rng.integers(0, 100000), rng.integers(0, 100000)))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def feed(stim: StimJim, data: bytes, seed: int = 0) -> list:
+    """Passes data to the StimJim in random chunks returning the records completed by each update."""
+    rng = np.random.default_rng(seed)
+    records = []
+    start = 0
+    while start < len(data):
+        end = start + int(rng.integers(1, 200))
+        if stim.update(data[start:end]):
+            records.append(stim.commands)
+        start = end
+    return records
+
+
+def as_dict(record) -> dict:
+    return {key: record[key] for key in ("command", "id", "mode", "period", "duration", "n_pulse", "stages")
+            if key in record}
+
+
+def stim_configs(data: bytes) -> dict:
+    baseline = BaselineStimJim(None, "stim-0-0", "0")
+    baseline.update(data)
+    return baseline.configs
+
+
+def test_records_match_baseline():
+    data = transcript(8, 500)
+    expected = feed(BaselineStimJim(None, "stim-0-0", "0"), data)
+    stim = StimJim(None, "stim-0-0", "0")
+    records = feed(stim, data)
+    assert len(expected) > 100
+    assert [[as_dict(record) for record in update] for update in records] == expected
+    assert {pnum: as_dict(config) for pnum, config in stim.configs.items()} == stim_configs(data)
+
+
+def test_records_from_earlier_updates_are_kept():
+    stim = StimJim(None, "stim-0-0", "0")
+    lines = transcript(1, 2).split(b"\n")
+    definition = b"\n".join(lines[:lines.index(b"-----") + 1]) + b"\n"
+    assert stim.update(definition)
+    held = stim.commands
+    stim.update(b"\n".join(lines[lines.index(b"-----") + 1:]))
+    assert len(held) == 1 and held[0]["command"] == "P" and held[0].get("period") == held[0].period
+    assert "missing" not in held[0]
+
+
+def baseline_stages(amps: np.ndarray, durs: list) -> str:
+    """Stage formatting used by parametrize and update_parameters before it was done in one pass."""
+    stimulus = ""
+    for i in range(amps.shape[1]):
+        stimulus += "; "
+        for j in range(amps.shape[0]):
+            stimulus += "{},".format(amps[j, i])
+        stimulus += "{}".format(durs[i])
+    return stimulus
+
+
+def random_amps(rng: np.random.Generator, dtype: str) -> np.ndarray:
+    shape = (int(rng.integers(1, 5)), int(rng.integers(1, 9)))
+    if dtype.startswith("int"):
+        return rng.integers(-10000, 10000, size=shape).astype(dtype)
+    return (rng.standard_normal(shape) * 1000).astype(dtype)
+
+
+@pytest.mark.parametrize("dtype", ["int64", "int32", "float64", "float32"])
+def test_commands_match_baseline(dtype):
+    rng = np.random.default_rng(0)
+    stim = StimJim(None, "stim-0-0", "0")
+    written = []
+    stim.write = written.append
+    for _ in range(500):
+        amps = random_amps(rng, dtype)
+        durs = [int(d) for d in rng.integers(0, 10000, size=amps.shape[1])]
+        stim.parametrize(3, [0, 1], 1000, 50000, amps, durs)
+        stim.update_parameters(2000, amps, durs)
+        assert written[-2] == "S3,0,1,1000,50000" + baseline_stages(amps, durs)
+        assert written[-1] == "F2000" + baseline_stages(amps, durs)
+
+
+def test_upload_joins_commands():
+    stim = StimJim(None, "stim-0-0", "0")
+    written = []
+    stim.write = written.append
+    amps = np.array([[100, -100], [50, -50]])
+    programs = [(pnum, [0, 1], 1000, 50000, amps, [200, 200]) for pnum in range(3)]
+    stim.upload(programs)
+    stim.terminator = "\r"
+    stim.upload(programs)
+    commands = ["S{},0,1,1000,50000; 100,50,200; -100,-50,200".format(pnum) for pnum in range(3)]
+    assert written == ["\n".join(commands), "\r".join(commands)]
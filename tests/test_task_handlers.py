@@ -0,0 +1,76 @@
+from enum import Enum
+from types import SimpleNamespace
+
+import pytest
+
+from pybehave.Events import PybEvents
+from pybehave.Tasks.Task import Task, on
+from pybehave.Tasks.TaskSequence import TaskSequence
+
+
+class HandlerTask(Task):
+    class States(Enum):
+        WAIT = 0
+        RESPOND = 1
+
+    def init_state(self):
+        return self.States.WAIT
+
+    def WAIT(self, event):
+        self.handled.append(("WAIT", event))
+
+    @on(PybEvents.GUIEvent, state=States.RESPOND)
+    def respond(self, event):
+        self.handled.append(("respond", event))
+
+
+class HandlerSequence(TaskSequence):
+    # No state methods are defined so every event not handled with on only reaches the current task
+    class States(Enum):
+        RUN = 0
+
+    @staticmethod
+    def get_tasks():
+        return [HandlerTask]
+
+    def init_sequence(self):
+        return HandlerTask, None
+
+    def init_state(self):
+        return self.States.RUN
+
+
+def make_task(cls, state):
+    task = cls()
+    task.initialize(SimpleNamespace(), {"protocol": None, "address_file": None, "chamber": 0})
+    task.handled = []
+    task.state = state
+    return task
+
+
+def test_handlers_replace_state_methods():
+    task = make_task(HandlerTask, HandlerTask.States.RESPOND)
+    event = PybEvents.GUIEvent(0, "button", 1)
+    task.main_loop(event)
+    task.state = HandlerTask.States.WAIT
+    task.main_loop(event)
+    assert task.handled == [("respond", event), ("WAIT", event)]
+
+
+def test_task_without_state_method_ignores_unhandled_events():
+    task = make_task(HandlerTask, HandlerTask.States.RESPOND)
+    task.main_loop(PybEvents.InfoEvent(0, "info", 1))
+    assert task.handled == []
+
+
+def test_sequence_without_state_methods_forwards_events():
+    sequence = make_task(HandlerSequence, HandlerSequence.States.RUN)
+    sequence.cur_task = make_task(HandlerTask, HandlerTask.States.WAIT)
+    event = PybEvents.GUIEvent(0, "button", 1)
+    sequence.main_loop(event)
+    assert sequence.cur_task.handled == [("WAIT", event)]
+
+
+def test_component_filter_requires_component_event():
+    with pytest.raises(TypeError):
+        on(PybEvents.GUIEvent, comp="lever")
@@ -0,0 +1,55 @@
+import multiprocessing
+import threading
+from types import SimpleNamespace
+from typing import List
+
+import msgspec
+import psutil
+
+from pybehave.Events import PybEvents
+from pybehave.Tasks import TaskProcess as task_process_module
+from pybehave.Tasks.TaskProcess import TaskProcess
+
+
+class Lever:
+    def __init__(self, cid: str, fail: bool = False):
+        self.id = cid
+        self.state = None
+        self.fail = fail
+
+    def update(self, value) -> bool:
+        if self.fail:
+            raise ValueError(self.id)
+        self.state = value
+        return True
+
+
+def test_error_in_batched_update_does_not_drop_the_rest(monkeypatch):
+    # The loop runs on a thread of the test process so its priority is left alone
+    monkeypatch.setattr(task_process_module.psutil, "Process",
+                        lambda pid: SimpleNamespace(nice=lambda value: (_ for _ in ()).throw(psutil.AccessDenied())))
+    main, tp_main = multiprocessing.Pipe()
+    source, tp_source = multiprocessing.Pipe()
+    tp = TaskProcess(tp_main, None, {"source": tp_source})
+    handled = []
+    levers = {cid: Lever(cid, fail=cid == "lever-0-1") for cid in ("lever-0-0", "lever-0-1", "lever-0-2")}
+    tp.tasks[0] = SimpleNamespace(components={cid: (lever, 0, "source") for cid, lever in levers.items()},
+                                  started=True, paused=False, metadata={"chamber": 0}, heartbeat_interval=None,
+                                  task_time=lambda t: t, time_elapsed=lambda: 0.0,
+                                  main_loop=lambda event: handled.append(event.comp.id))
+    tp.task_event_loggers[0] = {}
+    thread = threading.Thread(target=tp.run, daemon=True)
+    thread.start()
+    encoder = msgspec.msgpack.Encoder(enc_hook=PybEvents.enc_hook)
+    source.send_bytes(encoder.encode([PybEvents.ComponentUpdateEvent(0, cid, True) for cid in levers]))
+    decoder = msgspec.msgpack.Decoder(type=PybEvents.subclass_union(PybEvents.PybEvent), dec_hook=PybEvents.dec_hook)
+    assert main.poll(5)
+    error = decoder.decode(main.recv_bytes())
+    main.send_bytes(encoder.encode(PybEvents.ExitEvent()))
+    thread.join(5)
+    assert isinstance(error, PybEvents.ErrorEvent) and error.error == "ValueError"
+    assert error.metadata == {"chamber": 0}
+    assert handled == ["lever-0-0", "lever-0-2"]
+    assert not thread.is_alive()
+    assert msgspec.msgpack.Decoder(type=List[PybEvents.subclass_union(PybEvents.PybEvent)]).decode(
+        source.recv_bytes())[0] == PybEvents.CloseSourceEvent()
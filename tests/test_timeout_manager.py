@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from pybehave.Tasks.TimeoutManager import Timeout, TimeoutManager
+
+
+@pytest.fixture
+def manager():
+    tm = TimeoutManager()
+    tm.start()
+    yield tm
+    tm.quit()
+    tm.join()
+
+
+class Recorder:
+
+    def __init__(self, expected: int):
+        self.fired = []
+        self.expected = expected
+        self.done = threading.Event()
+
+    def __call__(self, name: str) -> None:
+        self.fired.append(name)
+        if len(self.fired) >= self.expected:
+            self.done.set()
+
+    def timeout(self, name: str, duration: float) -> Timeout:
+        return Timeout(name, 0, duration, self, (name,))
+
+
+def test_timeouts_fire_in_deadline_order(manager):
+    recorder = Recorder(5)
+    for name, duration in (("c", 0.15), ("a", 0.05), ("e", 0.25), ("b", 0.1), ("d", 0.2)):
+        manager.add_timeout(recorder.timeout(name, duration))
+    assert recorder.done.wait(2)
+    assert recorder.fired == ["a", "b", "c", "d", "e"]
+
+
+def test_cancelled_timeout_does_not_fire(manager):
+    recorder = Recorder(2)
+    for name, duration in (("a", 0.05), ("b", 0.1), ("c", 0.15)):
+        manager.add_timeout(recorder.timeout(name, duration))
+    manager.cancel_timeout("0/b")
+    assert recorder.done.wait(2)
+    time.sleep(0.1)
+    assert recorder.fired == ["a", "c"]
+
+
+def test_extend_and_reset_reorder_timeouts(manager):
+    recorder = Recorder(3)
+    a = recorder.timeout("a", 0.05)
+    for timeout in (a, recorder.timeout("b", 0.1), recorder.timeout("c", 0.15)):
+        manager.add_timeout(timeout)
+    manager.extend_timeout("0/a", 0.15)
+    assert recorder.done.wait(2)
+    assert recorder.fired == ["b", "c", "a"]
+
+    recorder = Recorder(2)
+    b = recorder.timeout("b", 0.1)
+    manager.add_timeout(recorder.timeout("a", 0.15))
+    manager.add_timeout(b)
+    b.duration = 0.3
+    manager.reset_timeout(b)
+    assert recorder.done.wait(2)
+    assert recorder.fired == ["a", "b"]
+
+
+def test_paused_timeout_fires_after_resume(manager):
+    recorder = Recorder(2)
+    manager.add_timeout(recorder.timeout("a", 0.05))
+    manager.add_timeout(recorder.timeout("b", 0.1))
+    manager.pause_timeout("0/a")
+    time.sleep(0.2)
+    assert recorder.fired == ["b"]
+    manager.resume_timeout("0/a")
+    assert recorder.done.wait(2)
+    assert recorder.fired == ["b", "a"]
+
+
+def test_stale_entries_are_compacted(manager):
+    recorder = Recorder(1)
+    for i in range(500):
+        manager.add_timeout(recorder.timeout("t{}".format(i), 60))
+        manager.cancel_timeout("0/t{}".format(i))
+    manager.add_timeout(recorder.timeout("last", 0.01))
+    assert recorder.done.wait(2)
+    time.sleep(0.05)
+    assert recorder.fired == ["last"]
+    assert len(manager.heap) <= 2 * len(manager.scheduled) + 64
@@ -0,0 +1,75 @@
+import math
+
+import numpy as np
+import pytest
+
+from pybehave.Components.WaveformStim import WaveformStim
+
+
+def baseline_parametrize(sr: float, per: int, dur: int, amps: np.ndarray, durs: list) -> np.ndarray:
+    """WaveformStim.parametrize before it was vectorized."""
+    waveforms = np.zeros((amps.shape[0], math.ceil(dur/1000000*sr) + 1))
+    ns = 0
+    while ns < math.ceil(dur/1000000*sr):
+        sw = 0
+        for i in range(amps.shape[1]):
+            for j in range(math.floor(durs[i] / 1000000 * sr)):
+                for k in range(amps.shape[0]):
+                    waveforms[k, ns] = amps[k, i]
+                ns += 1
+            sw += math.floor(durs[i] / 1000000 * sr)
+        ns += math.ceil(per / 1000000 * sr) - sw
+    for i in range(amps.shape[0]):
+        waveforms[i, -1] = 0
+    return waveforms
+
+
+def make_stim(sr: float) -> WaveformStim:
+    stim = WaveformStim(None, "stim-0-0", "0")
+    stim.sr = sr
+    return stim
+
+
+def test_matches_baseline():
+    rng = np.random.default_rng(0)
+    compared = 0
+    for _ in range(3000):
+        sr = float(rng.choice([1000, 5000, 10000, 20000, 30000]))
+        amps = rng.integers(-100, 100, size=(rng.integers(1, 4), rng.integers(1, 5))).astype(float)
+        durs = [int(d) for d in rng.integers(0, 2000, size=amps.shape[1])]
+        per = int(rng.integers(50, 5000))
+        dur = int(rng.integers(0, 20000))
+        try:
+            expected = baseline_parametrize(sr, per, dur, amps, durs)
+        except IndexError:
+            # The old loop failed when the final pulse was cut off by the end of the train
+            continue
+        stim = make_stim(sr)
+        stim.parametrize(0, None, per, dur, amps, durs)
+        np.testing.assert_array_equal(stim.configs[0], expected)
+        compared += 1
+    assert compared > 1000
+
+
+def test_configs_are_independent_copies():
+    stim = make_stim(10000)
+    amps = np.array([[1.0, -1.0]])
+    stim.parametrize(0, None, 1000, 10000, amps, [200, 200])
+    stim.parametrize(1, None, 1000, 10000, amps, [200, 200])
+    stim.configs[0] *= 2
+    assert stim.configs[0].flags.writeable
+    np.testing.assert_array_equal(stim.configs[1], baseline_parametrize(10000, 1000, 10000, amps, [200, 200]))
+    stim.parametrize(2, None, 1000, 10000, amps, [200, 200])
+    np.testing.assert_array_equal(stim.configs[2], stim.configs[1])
+
+
+def test_final_pulse_is_truncated():
+    stim = make_stim(1000)
+    stim.parametrize(0, None, 5000, 7000, np.array([[1.0]]), [4000])
+    np.testing.assert_array_equal(stim.configs[0], [[1, 1, 1, 1, 0, 1, 1, 0]])
+
+
+def test_period_shorter_than_a_sample_is_rejected():
+    stim = make_stim(1000)
+    with pytest.raises(ValueError):
+        stim.parametrize(0, None, 0, 1000, np.array([[1.0]]), [100])